@@ -14,65 +14,199 @@
 
 """LiveKit RTC SDK"""
 
-from ._proto import stats_pb2 as stats
-from ._proto.e2ee_pb2 import EncryptionState, EncryptionType
-from ._proto.participant_pb2 import ParticipantKind
-from ._proto.room_pb2 import (
-    ConnectionQuality,
-    ConnectionState,
-    ContinualGatheringPolicy,
-    DataPacketKind,
-    IceServer,
-    IceTransportType,
-    TrackPublishOptions,
-    VideoEncoding,
-)
-from ._proto.track_pb2 import StreamState, TrackKind, TrackSource
-from ._proto.video_frame_pb2 import VideoBufferType, VideoCodec, VideoRotation
-from .audio_frame import AudioFrame
-from .audio_source import AudioSource
-from .audio_stream import AudioFrameEvent, AudioStream
-from .chat import ChatManager, ChatMessage
-from .e2ee import (
-    E2EEManager,
-    E2EEOptions,
-    FrameCryptor,
-    KeyProvider,
-    KeyProviderOptions,
-)
-from .participant import (
-    LocalParticipant,
-    Participant,
-    RemoteParticipant,
-)
-from .room import ConnectError, DataPacket, Room, RoomOptions, RtcConfiguration, SipDTMF
-from .track import (
-    AudioTrack,
-    LocalAudioTrack,
-    LocalTrack,
-    LocalVideoTrack,
-    RemoteAudioTrack,
-    RemoteTrack,
-    RemoteVideoTrack,
-    Track,
-    VideoTrack,
-)
-from .event_emitter import EventEmitter
-from .track_publication import (
-    LocalTrackPublication,
-    RemoteTrackPublication,
-    TrackPublication,
-)
-from .transcription import Transcription, TranscriptionSegment
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
 from .version import __version__
-from .video_frame import (
-    VideoFrame,
-)
-from .video_source import VideoSource
-from .video_stream import VideoFrameEvent, VideoStream
-from .audio_resampler import AudioResampler, AudioResamplerQuality
-from .utils import combine_audio_frames
-from .rpc import RpcError, RpcInvocationData
+
+if TYPE_CHECKING:
+    from ._proto import stats_pb2 as stats
+    from ._proto.e2ee_pb2 import EncryptionState, EncryptionType
+    from ._proto.participant_pb2 import ParticipantKind
+    from ._proto.room_pb2 import (
+        ConnectionQuality,
+        ConnectionState,
+        ContinualGatheringPolicy,
+        DataPacketKind,
+        IceServer,
+        IceTransportType,
+        TrackPublishOptions,
+        VideoEncoding,
+    )
+    from ._proto.track_pb2 import StreamState, TrackKind, TrackSource
+    from ._proto.video_frame_pb2 import VideoBufferType, VideoCodec, VideoRotation
+    from .audio_frame import AudioFrame
+    from .audio_source import AudioSource
+    from .audio_stream import AudioFrameEvent, AudioStream
+    from .chat import ChatManager, ChatMessage
+    from .e2ee import (
+        E2EEManager,
+        E2EEOptions,
+        FrameCryptor,
+        KeyProvider,
+        KeyProviderOptions,
+    )
+    from .participant import (
+        LocalParticipant,
+        Participant,
+        RemoteParticipant,
+    )
+    from .room import (
+        CoalescedRoomEvents,
+        ConnectError,
+        DataPacket,
+        Room,
+        RoomOptions,
+        RtcConfiguration,
+        SipDTMF,
+    )
+    from .track import (
+        AudioTrack,
+        LocalAudioTrack,
+        LocalTrack,
+        LocalVideoTrack,
+        RemoteAudioTrack,
+        RemoteTrack,
+        RemoteVideoTrack,
+        Track,
+        VideoTrack,
+    )
+    from .event_emitter import EventEmitter
+    from .track_publication import (
+        LocalTrackPublication,
+        RemoteTrackPublication,
+        TrackPublication,
+    )
+    from .transcription import Transcription, TranscriptionSegment
+    from .video_frame import (
+        VideoFrame,
+    )
+    from .video_source import VideoSource
+    from .video_stream import VideoFrameEvent, VideoStream
+    from .audio_resampler import AudioResampler, AudioResamplerQuality
+    from .utils import combine_audio_frames
+    from .audio_dsp import (
+        apply_gain,
+        downmix_to_mono,
+        mix_audio_frames,
+        upmix_to_stereo,
+    )
+    from .rpc import RpcError, RpcInvocationData
+    from .subscription_manager import SubscriptionManager
+    from .event_recording import (
+        EventRecorder,
+        EventReplayer,
+        RecordedEvent,
+        read_events,
+    )
+    from ._ffi_client import FfiBackend
+    from .audio_frame_pool import AudioFramePool, AudioFramePoolStats
+    from .fake_ffi import FakeFfiBackend, FakeFfiStats, FakeParticipant
+    from .worker_pool import RoomJob, RoomJobHandle, RoomWorkerPool, SharedFrameRing
+
+# the public names are imported on first access, so that `import livekit.rtc` doesn't
+# load every submodule and protobuf module upfront (name -> (module, attribute))
+_LAZY_ATTRS: Dict[str, Tuple[str, Optional[str]]] = {
+    "stats": ("._proto.stats_pb2", None),
+    "EncryptionState": ("._proto.e2ee_pb2", "EncryptionState"),
+    "EncryptionType": ("._proto.e2ee_pb2", "EncryptionType"),
+    "ParticipantKind": ("._proto.participant_pb2", "ParticipantKind"),
+    "ConnectionQuality": ("._proto.room_pb2", "ConnectionQuality"),
+    "ConnectionState": ("._proto.room_pb2", "ConnectionState"),
+    "ContinualGatheringPolicy": ("._proto.room_pb2", "ContinualGatheringPolicy"),
+    "DataPacketKind": ("._proto.room_pb2", "DataPacketKind"),
+    "IceServer": ("._proto.room_pb2", "IceServer"),
+    "IceTransportType": ("._proto.room_pb2", "IceTransportType"),
+    "TrackPublishOptions": ("._proto.room_pb2", "TrackPublishOptions"),
+    "VideoEncoding": ("._proto.room_pb2", "VideoEncoding"),
+    "StreamState": ("._proto.track_pb2", "StreamState"),
+    "TrackKind": ("._proto.track_pb2", "TrackKind"),
+    "TrackSource": ("._proto.track_pb2", "TrackSource"),
+    "VideoBufferType": ("._proto.video_frame_pb2", "VideoBufferType"),
+    "VideoCodec": ("._proto.video_frame_pb2", "VideoCodec"),
+    "VideoRotation": ("._proto.video_frame_pb2", "VideoRotation"),
+    "AudioFrame": (".audio_frame", "AudioFrame"),
+    "AudioSource": (".audio_source", "AudioSource"),
+    "AudioFrameEvent": (".audio_stream", "AudioFrameEvent"),
+    "AudioStream": (".audio_stream", "AudioStream"),
+    "ChatManager": (".chat", "ChatManager"),
+    "ChatMessage": (".chat", "ChatMessage"),
+    "E2EEManager": (".e2ee", "E2EEManager"),
+    "E2EEOptions": (".e2ee", "E2EEOptions"),
+    "FrameCryptor": (".e2ee", "FrameCryptor"),
+    "KeyProvider": (".e2ee", "KeyProvider"),
+    "KeyProviderOptions": (".e2ee", "KeyProviderOptions"),
+    "LocalParticipant": (".participant", "LocalParticipant"),
+    "Participant": (".participant", "Participant"),
+    "RemoteParticipant": (".participant", "RemoteParticipant"),
+    "CoalescedRoomEvents": (".room", "CoalescedRoomEvents"),
+    "ConnectError": (".room", "ConnectError"),
+    "DataPacket": (".room", "DataPacket"),
+    "Room": (".room", "Room"),
+    "RoomOptions": (".room", "RoomOptions"),
+    "RtcConfiguration": (".room", "RtcConfiguration"),
+    "SipDTMF": (".room", "SipDTMF"),
+    "AudioTrack": (".track", "AudioTrack"),
+    "LocalAudioTrack": (".track", "LocalAudioTrack"),
+    "LocalTrack": (".track", "LocalTrack"),
+    "LocalVideoTrack": (".track", "LocalVideoTrack"),
+    "RemoteAudioTrack": (".track", "RemoteAudioTrack"),
+    "RemoteTrack": (".track", "RemoteTrack"),
+    "RemoteVideoTrack": (".track", "RemoteVideoTrack"),
+    "Track": (".track", "Track"),
+    "VideoTrack": (".track", "VideoTrack"),
+    "EventEmitter": (".event_emitter", "EventEmitter"),
+    "LocalTrackPublication": (".track_publication", "LocalTrackPublication"),
+    "RemoteTrackPublication": (".track_publication", "RemoteTrackPublication"),
+    "TrackPublication": (".track_publication", "TrackPublication"),
+    "Transcription": (".transcription", "Transcription"),
+    "TranscriptionSegment": (".transcription", "TranscriptionSegment"),
+    "VideoFrame": (".video_frame", "VideoFrame"),
+    "VideoSource": (".video_source", "VideoSource"),
+    "VideoFrameEvent": (".video_stream", "VideoFrameEvent"),
+    "VideoStream": (".video_stream", "VideoStream"),
+    "AudioResampler": (".audio_resampler", "AudioResampler"),
+    "AudioResamplerQuality": (".audio_resampler", "AudioResamplerQuality"),
+    "combine_audio_frames": (".utils", "combine_audio_frames"),
+    "apply_gain": (".audio_dsp", "apply_gain"),
+    "mix_audio_frames": (".audio_dsp", "mix_audio_frames"),
+    "upmix_to_stereo": (".audio_dsp", "upmix_to_stereo"),
+    "downmix_to_mono": (".audio_dsp", "downmix_to_mono"),
+    "RpcError": (".rpc", "RpcError"),
+    "RpcInvocationData": (".rpc", "RpcInvocationData"),
+    "SubscriptionManager": (".subscription_manager", "SubscriptionManager"),
+    "EventRecorder": (".event_recording", "EventRecorder"),
+    "EventReplayer": (".event_recording", "EventReplayer"),
+    "RecordedEvent": (".event_recording", "RecordedEvent"),
+    "read_events": (".event_recording", "read_events"),
+    "FfiBackend": ("._ffi_client", "FfiBackend"),
+    "FakeFfiBackend": (".fake_ffi", "FakeFfiBackend"),
+    "FakeFfiStats": (".fake_ffi", "FakeFfiStats"),
+    "FakeParticipant": (".fake_ffi", "FakeParticipant"),
+    "AudioFramePool": (".audio_frame_pool", "AudioFramePool"),
+    "AudioFramePoolStats": (".audio_frame_pool", "AudioFramePoolStats"),
+    "RoomJob": (".worker_pool", "RoomJob"),
+    "RoomJobHandle": (".worker_pool", "RoomJobHandle"),
+    "RoomWorkerPool": (".worker_pool", "RoomWorkerPool"),
+    "SharedFrameRing": (".worker_pool", "SharedFrameRing"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    module = importlib.import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return list(__all__)
+
 
 __all__ = [
     "ConnectionQuality",
@@ -99,6 +233,7 @@ __all__ = [
     "ParticipantKind",
     "RemoteParticipant",
     "ConnectError",
+    "CoalescedRoomEvents",
     "Room",
     "RoomOptions",
     "RtcConfiguration",
@@ -137,5 +272,24 @@ __all__ = [
     "RpcInvocationData",
     "EventEmitter",
     "combine_audio_frames",
+    "apply_gain",
+    "mix_audio_frames",
+    "upmix_to_stereo",
+    "downmix_to_mono",
+    "SubscriptionManager",
+    "EventRecorder",
+    "EventReplayer",
+    "RecordedEvent",
+    "read_events",
+    "FfiBackend",
+    "FakeFfiBackend",
+    "FakeFfiStats",
+    "FakeParticipant",
+    "AudioFramePool",
+    "AudioFramePoolStats",
+    "RoomJob",
+    "RoomJobHandle",
+    "RoomWorkerPool",
+    "SharedFrameRing",
     "__version__",
 ]
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import signal
+from abc import ABC, abstractmethod
 import asyncio
 import sys
 from contextlib import ExitStack
@@ -24,8 +25,27 @@ import os
 import platform
 import atexit
 import threading
-from typing import Generic, List, Optional, TypeVar
+import time
+import copy
+import functools
+import itertools
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+)
 
+from ._marshal import from_ffi, to_ffi
 from ._proto import ffi_pb2 as proto_ffi
 from ._utils import Queue, classproperty
 from .log import logger
@@ -58,118 +78,1085 @@ def get_ffi_lib():
     return ctypes.CDLL(str(path))
 
 
-ffi_lib = get_ffi_lib()
 ffi_cb_fnc = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_uint8), ctypes.c_size_t)
 
-# C function types
-ffi_lib.livekit_ffi_initialize.argtypes = [
-    ffi_cb_fnc,
-    ctypes.c_bool,
-    ctypes.c_char_p,
-    ctypes.c_char_p,
-]
 
-ffi_lib.livekit_ffi_request.argtypes = [
-    ctypes.POINTER(ctypes.c_ubyte),
-    ctypes.c_size_t,
-    ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte)),
-    ctypes.POINTER(ctypes.c_size_t),
-]
-ffi_lib.livekit_ffi_request.restype = ctypes.c_uint64
+def load_ffi_lib() -> ctypes.CDLL:
+    lib = get_ffi_lib()
 
-ffi_lib.livekit_ffi_drop_handle.argtypes = [ctypes.c_uint64]
-ffi_lib.livekit_ffi_drop_handle.restype = ctypes.c_bool
+    # C function types
+    lib.livekit_ffi_initialize.argtypes = [
+        ffi_cb_fnc,
+        ctypes.c_bool,
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+    ]
 
+    lib.livekit_ffi_request.argtypes = [
+        ctypes.POINTER(ctypes.c_ubyte),
+        ctypes.c_size_t,
+        ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte)),
+        ctypes.POINTER(ctypes.c_size_t),
+    ]
+    lib.livekit_ffi_request.restype = ctypes.c_uint64
 
-ffi_lib.livekit_ffi_dispose.argtypes = []
-ffi_lib.livekit_ffi_dispose.restype = None
+    lib.livekit_ffi_drop_handle.argtypes = [ctypes.c_uint64]
+    lib.livekit_ffi_drop_handle.restype = ctypes.c_bool
+
+    lib.livekit_ffi_dispose.argtypes = []
+    lib.livekit_ffi_dispose.restype = None
+
+    return lib
+
+
+# loaded when the first FfiClient is created, so that importing the SDK stays cheap
+ffi_lib: Any = None
 
 INVALID_HANDLE = 0
 
 
+@dataclass
+class HandleStats:
+    live: int = 0
+    """Number of handles owned by the SDK and not released yet"""
+    live_by_kind: Dict[str, int] = field(default_factory=dict)
+    """Live handles, by kind of native object"""
+    pending_release: int = 0
+    """Handles dropped on the Python side and waiting to be released"""
+    released: int = 0
+    """Handles released since the start of the process"""
+    release_batches: int = 0
+    """Number of batches used to release the handles"""
+
+
+class _HandleReleaser:
+    """Releases dropped handles in batches on a background thread.
+
+    Dropping a handle from `__del__` only appends it to a list, so neither the
+    frame-processing code nor the garbage collector crosses the FFI boundary for it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: List[int] = []
+        self._thread: Optional[threading.Thread] = None
+        self._live: Dict[str, int] = {}
+        self._released = 0
+        self._batches = 0
+
+    def track(self, kind: str) -> None:
+        with self._lock:
+            self._live[kind] = self._live.get(kind, 0) + 1
+
+    def release(self, handle: int, kind: str) -> None:
+        """Drop `handle` synchronously"""
+        with self._lock:
+            self._untrack(kind)
+            self._released += 1
+            self._batches += 1
+        _drop_handle(handle)
+
+    def release_later(self, handle: int, kind: str) -> None:
+        """Queue `handle` to be dropped by the releaser thread"""
+        with self._lock:
+            self._untrack(kind)
+            self._pending.append(handle)
+            if len(self._pending) > 1:
+                return  # the releaser is already woken up
+
+            if self._thread is not None or self._start():
+                self._wakeup.set()
+                return
+
+            # the thread can't be started (e.g. during interpreter shutdown)
+            handles, self._pending = self._pending, []
+            self._released += len(handles)
+            self._batches += 1
+
+        for h in handles:
+            _drop_handle(h)
+
+    def flush(self) -> None:
+        """Drop all the pending handles on the calling thread"""
+        with self._lock:
+            handles, self._pending = self._pending, []
+            if handles:
+                self._released += len(handles)
+                self._batches += 1
+        for h in handles:
+            _drop_handle(h)
+
+    def stats(self) -> HandleStats:
+        with self._lock:
+            live_by_kind = {k: v for k, v in self._live.items() if v}
+            return HandleStats(
+                live=sum(live_by_kind.values()),
+                live_by_kind=live_by_kind,
+                pending_release=len(self._pending),
+                released=self._released,
+                release_batches=self._batches,
+            )
+
+    def _untrack(self, kind: str) -> None:
+        self._live[kind] = self._live.get(kind, 0) - 1
+
+    def _start(self) -> bool:
+        if sys.is_finalizing() or not threading.main_thread().is_alive():
+            # a thread started during shutdown would never run, and start() would hang
+            return False
+        try:
+            thread = threading.Thread(
+                target=self._run, name="livekit_ffi_releaser", daemon=True
+            )
+            thread.start()
+        except RuntimeError:
+            return False
+        self._thread = thread
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.flush()
+
+
+# buffers allocated by this process for events it made up (e.g. replayed frames),
+# under handles unknown to the backend: dropping the handle frees the buffer
+_local_buffers: Dict[int, Any] = {}
+# above the handles allocated by the native FFI, which counts up from 1
+_next_local_handle = itertools.count(1 << 63)
+
+
+def _register_local_buffer(buffer: Any) -> int:
+    """Keep `buffer` alive until the returned handle is dropped"""
+    handle = next(_next_local_handle)
+    _local_buffers[handle] = buffer
+    return handle
+
+
+def _drop_handle(handle: int) -> None:
+    if _local_buffers.pop(handle, None) is not None:
+        return
+
+    client = FfiClient._instance
+    if client is None or not client._backend.drop_handle(handle):
+        logger.error("failed to drop ffi handle %d", handle)
+
+
+_releaser = _HandleReleaser()
+
+
 class FfiHandle:
-    def __init__(self, handle: int) -> None:
+    """Owns a native handle and releases it when closed or garbage collected.
+
+    Handles that are garbage collected are released in batches on a background
+    thread. Use `close()`, or the handle as a context manager, to release it
+    deterministically.
+    """
+
+    def __init__(self, handle: int, kind: str = "unknown") -> None:
         self.handle = handle
-        self._disposed = False
+        self.kind = kind
+        self._disposed = handle == INVALID_HANDLE
+        if not self._disposed:
+            _releaser.track(kind)
 
     def __del__(self):
-        self.dispose()
+        if not self._disposed:
+            self._disposed = True
+            _releaser.release_later(self.handle, self.kind)
+
+    def __enter__(self) -> "FfiHandle":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     @property
     def disposed(self) -> bool:
         return self._disposed
 
-    def dispose(self) -> None:
-        if self.handle != INVALID_HANDLE and not self._disposed:
+    def close(self) -> None:
+        """Release the handle now"""
+        if not self._disposed:
             self._disposed = True
-            assert ffi_lib.livekit_ffi_drop_handle(ctypes.c_uint64(self.handle))
+            _releaser.release(self.handle, self.kind)
+
+    def dispose(self) -> None:
+        self.close()
 
 
 T = TypeVar("T")
 
 
-class FfiQueue(Generic[T]):
+@dataclass
+class RequestTypeStats:
+    count: int = 0
+    """Number of requests sent"""
+    total_time: float = 0.0
+    """Cumulated time spent in `FfiClient.request`, in seconds"""
+    max_time: float = 0.0
+    """Slowest request, in seconds"""
+    latency_us: Dict[int, int] = field(default_factory=dict)
+    """Histogram of the request latencies, keyed by power-of-two upper bound in µs"""
+    bytes_in: int = 0
+    """Serialized bytes sent to the FFI"""
+    bytes_out: int = 0
+    """Serialized bytes received from the FFI"""
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+@dataclass
+class FfiStats:
+    requests: Dict[str, RequestTypeStats] = field(default_factory=dict)
+    """Requests sent, by request type"""
+    events: Dict[str, int] = field(default_factory=dict)
+    """Events received, by event type"""
+    event_bytes: int = 0
+    """Serialized bytes of the events received"""
+    elapsed: float = 0.0
+    """Seconds since the statistics were enabled or last reset"""
+
+
+class _FfiRecorder:
+    """Collects the FfiStats, only exists while the instrumentation is enabled"""
+
     def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = FfiStats()
+        self._start = time.monotonic()
+
+    def record_request(
+        self, which: str, elapsed: float, bytes_in: int, bytes_out: int
+    ) -> None:
+        bucket = 1 << int(elapsed * 1e6).bit_length()
+        with self._lock:
+            stats = self._stats.requests.get(which)
+            if stats is None:
+                stats = self._stats.requests[which] = RequestTypeStats()
+            stats.count += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.latency_us[bucket] = stats.latency_us.get(bucket, 0) + 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+    def record_event(self, which: Optional[str], size: int) -> None:
+        which = which or "unknown"
+        with self._lock:
+            self._stats.events[which] = self._stats.events.get(which, 0) + 1
+            self._stats.event_bytes += size
+
+    def snapshot(self, reset: bool) -> FfiStats:
+        with self._lock:
+            stats = copy.deepcopy(self._stats)
+            stats.elapsed = time.monotonic() - self._start
+            if reset:
+                self._stats = FfiStats()
+                self._start = time.monotonic()
+        return stats
+
+
+@dataclass
+class AsyncRequestStats:
+    outstanding: int
+    """Number of async requests waiting for their callback."""
+    outstanding_by_type: Dict[str, int]
+    """Outstanding async requests by request type."""
+    peak_outstanding: int
+    """Highest number of outstanding async requests seen at once."""
+    completed: int
+    """Number of async requests that received their callback."""
+    cancelled: int
+    """Number of async requests abandoned before their callback arrived."""
+
+
+@dataclass
+class HandoffStats:
+    batches: int
+    """Number of times an event loop was woken up to drain its inbox."""
+    items: int
+    """Number of items handed off to the event loops."""
+    max_batch_size: int
+    """Largest number of items drained in a single wakeup."""
+    batch_sizes: Dict[int, int]
+    """Histogram of the drained batch sizes, keyed by power-of-two upper bound."""
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+@dataclass
+class UnclaimedStats:
+    held: int
+    """Number of items held for keys that aren't routed yet."""
+    keys: int
+    """Number of keys holding items."""
+    evicted: int
+    """Number of held items discarded because too many were held."""
+
+
+class _LoopInbox:
+    """Items posted from other threads to an event loop.
+
+    The loop is only woken up when the inbox goes from empty to non-empty, it then
+    runs every item accumulated in the meantime in a single callback.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self.stats = HandoffStats(0, 0, 0, {})
+        self._lock = threading.Lock()
+        self._items: deque[tuple[Callable[[Any, Any], None], Any, Any]] = deque()
+        self._scheduled = False
+
+    def post(self, fnc: Callable[[Any, Any], None], target: Any, item: Any) -> None:
+        with self._lock:
+            self._items.append((fnc, target, item))
+            if self._scheduled:
+                return
+
+            self._scheduled = True
+
+        try:
+            self._loop.call_soon_threadsafe(self._drain)
+        except Exception:
+            # the loop is closed, nobody will ever drain the inbox
+            with self._lock:
+                self._items.clear()
+                self._scheduled = False
+            raise
+
+    def _drain(self) -> None:
+        with self._lock:
+            items = self._items
+            self._items = deque()
+            self._scheduled = False
+
+        size = len(items)
+        stats = self.stats
+        stats.batches += 1
+        stats.items += size
+        stats.max_batch_size = max(stats.max_batch_size, size)
+        bucket = 1 << (size - 1).bit_length()
+        stats.batch_sizes[bucket] = stats.batch_sizes.get(bucket, 0) + 1
+
+        for fnc, target, item in items:
+            try:
+                fnc(target, item)
+            except Exception:
+                logger.exception("error handing off item to the event loop")
+
+
+OverflowPolicy = Literal["drop_oldest", "drop_newest", "block"]
+
+
+@dataclass
+class SubscriberStats:
+    size: int
+    """Items posted to the subscriber and not consumed yet"""
+    capacity: int
+    """Maximum number of items held by the subscriber, 0 when unbounded"""
+    high_water_mark: int
+    """Largest number of items the subscriber held at once"""
+    dropped: int
+    """Items discarded because the subscriber was full"""
+    blocked_time: float
+    """Seconds the producer spent waiting for the subscriber, with the block policy"""
+
+
+class SubscriberQueue(Queue[T]):
+    """Queue of an FfiQueue subscriber, optionally bounded.
+
+    The size accounts for the items already posted by the native thread but not
+    handed off to the event loop yet. When a bounded queue is full, the `overflow`
+    policy decides which item is discarded:
+    - "drop_oldest": the oldest item still in the queue
+    - "drop_newest": the incoming item
+    - "block": the native thread waits up to `block_timeout` seconds for the consumer,
+      then discards the incoming item. This delays the events of every other
+      subscriber too.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 0,
+        overflow: OverflowPolicy = "drop_oldest",
+        block_timeout: float = 0.1,
+    ) -> None:
+        super().__init__()
+        self._capacity = capacity
+        self._overflow = overflow
+        self._block_timeout = block_timeout
+        self._cond = threading.Condition(threading.Lock())
+        self._size = 0
+        self._high_water_mark = 0
+        self._dropped = 0
+        self._blocked_time = 0.0
+
+    def _admit(self, block: bool = True) -> bool:
+        """Reserve room for an incoming item, called before posting it.
+
+        Must not be called with the FfiQueue lock held when `block` is set, since the
+        consumer needs it to keep running while the producer waits.
+        """
+        with self._cond:
+            if self._capacity and self._size >= self._capacity:
+                if self._overflow == "drop_newest" or (
+                    self._overflow == "block" and not block
+                ):
+                    self._dropped += 1
+                    return False
+
+                if self._overflow == "block":
+                    start = time.monotonic()
+                    room = self._cond.wait_for(
+                        lambda: self._size < self._capacity, self._block_timeout
+                    )
+                    self._blocked_time += time.monotonic() - start
+                    if not room:
+                        self._dropped += 1
+                        return False
+
+            self._size += 1
+            self._high_water_mark = max(self._high_water_mark, self._size)
+            return True
+
+    def _release(self, count: int = 1, dropped: int = 0) -> None:
+        with self._cond:
+            self._size -= count
+            self._dropped += dropped
+            self._cond.notify()
+
+    def put_nowait(self, item: T) -> None:
+        super().put_nowait(item)
+        if self._capacity and self._overflow == "drop_oldest":
+            evicted = 0
+            while self.qsize() > self._capacity:
+                super().get_nowait()
+                self.task_done()
+                evicted += 1
+            if evicted:
+                self._release(evicted, dropped=evicted)
+
+    def get_nowait(self) -> T:
+        item = super().get_nowait()
+        self._release()
+        return item
+
+    def stats(self) -> SubscriberStats:
+        with self._cond:
+            return SubscriberStats(
+                size=self._size,
+                capacity=self._capacity,
+                high_water_mark=self._high_water_mark,
+                dropped=self._dropped,
+                blocked_time=self._blocked_time,
+            )
+
+
+class FfiQueue(Generic[T]):
+    """Routes items coming from the native thread to asyncio queues.
+
+    Subscribers either listen on the catch-all lane (every item is delivered) or
+    are routed to one or more keys (a handle or an async_id), in which case they
+    only receive the items published under those keys.
+
+    In sharded mode, keyed items never reach the catch-all lane: each key is bound to
+    the event loops of the queues routed to it, and its items are only posted to those
+    loops. Items published before the key is routed are held until it is.
+    """
+
+    def __init__(
+        self,
+        batched: bool = True,
+        sharded: bool = False,
+        keep: Optional[Callable[[T], bool]] = None,
+        on_evict: Optional[Callable[[T], None]] = None,
+    ) -> None:
+        """
+        Args:
+            batched (bool): Hand items off to each event loop in batches, waking up
+                the loop once per batch instead of once per item.
+            sharded (bool): Only deliver keyed items to the queues routed to their key,
+                so that rooms and streams running on different event loops don't
+                receive each other's items.
+            keep (Optional[Callable[[T], bool]]): Whether a held item must be kept
+                when too many items are held for its key. The kept items are bounded
+                by a larger limit, and discarded with their key when too many keys
+                are held.
+            on_evict (Optional[Callable[[T], None]]): Called with each held item
+                discarded because too many items are held.
+        """
         self._lock = threading.RLock()
+        self._batched = batched
+        self._sharded = sharded
+        self._keep = keep
+        self._on_evict = on_evict
+        self._evicted = 0
+        self._inboxes: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopInbox
+        ] = weakref.WeakKeyDictionary()
         self._subscribers: List[tuple[Queue[T], asyncio.AbstractEventLoop]] = []
+        self._routes: Dict[int, List[tuple[Queue[T], asyncio.AbstractEventLoop]]] = {}
+        self._keys: Dict[Queue[T], List[int]] = {}
+        self._loops: Dict[Queue[T], asyncio.AbstractEventLoop] = {}
+        # items that arrived before their key was routed (only async callbacks,
+        # unless sharded)
+        self._unclaimed: OrderedDict[int, Deque[T]] = OrderedDict()
+        # futures of the async requests waiting for their callback
+        self._pending: Dict[int, tuple[asyncio.Future[T], str]] = {}
+        self._outstanding_by_type: Dict[str, int] = {}
+        self._peak_outstanding = 0
+        self._completed = 0
+        self._cancelled = 0
+        # async requests cancelled before their callback arrived, so that their late
+        # callbacks are dropped instead of held for a waiter that won't come
+        self._cancelled_ids: OrderedDict[int, None] = OrderedDict()
+
+    def put(self, item: T, key: Optional[int] = None, *, retain: bool = False) -> None:
+        """Deliver an item to the subscribers routed to `key` and to the catch-all lane.
 
-    def put(self, item: T) -> None:
+        When `retain` is set, the item completes the async request `key`: the future
+        returned by `wait_callback` is resolved, and if nobody waits for it yet the item
+        is kept until a waiter claims it.
+        """
         with self._lock:
-            for queue, loop in self._subscribers:
+            targets: List[tuple[Queue[T], asyncio.AbstractEventLoop]] = []
+            catch_all = True
+            if retain and key in self._pending:
+                fut, _ = self._pending[key]
+                self._resolve(fut, item)
+            elif key is not None:
+                routed = self._routes.get(key)
+                if routed:
+                    targets.extend(routed)
+                elif retain and key in self._cancelled_ids:
+                    del self._cancelled_ids[key]
+                elif retain or self._sharded:
+                    self._stash(key, item)
+                catch_all = not self._sharded
+
+            if catch_all:
+                targets.extend(self._subscribers)
+
+        # posting to a full "block" queue waits for its consumer, which must be able to
+        # subscribe, route and wait for callbacks meanwhile: don't hold the lock
+        for queue, loop in targets:
+            self._post(queue, loop, item)
+
+    def _stash(self, key: int, item: T) -> None:
+        items = self._unclaimed.get(key)
+        if items is None:
+            items = self._unclaimed[key] = deque()
+            if len(self._unclaimed) > _MAX_UNCLAIMED:
+                # the key held the longest is the least likely to be routed, discard
+                # all of its items, even the ones that are kept otherwise
+                _, old_items = self._unclaimed.popitem(last=False)
+                self._evict(old_items, len(old_items), force=True)
+        items.append(item)
+
+        if len(items) > _MAX_UNCLAIMED_PER_KEY:
+            self._evict(items, len(items) - _MAX_UNCLAIMED_PER_KEY)
+            if len(items) > _MAX_KEPT_UNCLAIMED_PER_KEY:
+                self._evict(items, len(items) - _MAX_KEPT_UNCLAIMED_PER_KEY, force=True)
+
+    def _evict(self, items: Deque[T], count: int, force: bool = False) -> None:
+        """Discard up to `count` of the oldest held items.
+
+        The items that must be kept are skipped, unless `force` is set.
+        """
+        kept: List[T] = []
+        evicted = 0
+        while items and evicted < count:
+            item = items.popleft()
+            if not force and self._keep is not None and self._keep(item):
+                kept.append(item)
+                continue
+
+            evicted += 1
+            if self._on_evict is not None:
                 try:
-                    loop.call_soon_threadsafe(queue.put_nowait, item)
-                except Exception as e:
-                    # this could happen if user closes the runloop without unsubscribing first
-                    # it's not good when it does occur, but we should not fail the entire runloop
-                    logger.error("error putting to queue: %s", e)
+                    self._on_evict(item)
+                except Exception:
+                    logger.exception("error releasing an unclaimed item")
+        items.extendleft(reversed(kept))
+
+        if evicted and not self._evicted:
+            logger.warning(
+                "too many items published before their key was routed, discarding "
+                "the oldest ones"
+            )
+        self._evicted += evicted
+
+    def unclaimed_stats(self) -> UnclaimedStats:
+        """Items held until their key is routed, and how many were discarded"""
+        with self._lock:
+            return UnclaimedStats(
+                held=sum(len(items) for items in self._unclaimed.values()),
+                keys=len(self._unclaimed),
+                evicted=self._evicted,
+            )
+
+    def _post(
+        self,
+        queue: Queue[T],
+        loop: asyncio.AbstractEventLoop,
+        item: T,
+        block: bool = True,
+    ) -> None:
+        if isinstance(queue, SubscriberQueue) and not queue._admit(block):
+            return
+
+        try:
+            self._handoff(loop, _put_item, queue, item)
+        except Exception as e:
+            if isinstance(queue, SubscriberQueue):
+                queue._release()
+            # this could happen if user closes the runloop without unsubscribing first
+            # it's not good when it does occur, but we should not fail the entire runloop
+            logger.error("error putting to queue: %s", e)
+
+    def put_lazy(
+        self,
+        build: Callable[[], T],
+        key: Optional[int] = None,
+        *,
+        retain: bool = False,
+    ) -> None:
+        """Like `put`, but the item is built by `build` on the event loop consuming it.
+
+        The item is built at most once, and never if nobody subscribed to it.
+        """
+        self.put(_Deferred(build), key, retain=retain)  # type: ignore
+
+    def _resolve(self, fut: asyncio.Future[T], item: T) -> None:
+        try:
+            self._handoff(fut.get_loop(), _set_future_result, fut, item)
+        except Exception as e:
+            logger.error("error resolving future: %s", e)
+
+    def _handoff(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        fnc: Callable[[Any, Any], None],
+        target: Any,
+        item: Any,
+    ) -> None:
+        if not self._batched:
+            loop.call_soon_threadsafe(fnc, target, item)
+            return
+
+        with self._lock:
+            inbox = self._inboxes.get(loop)
+            if inbox is None:
+                inbox = self._inboxes[loop] = _LoopInbox(loop)
+        inbox.post(fnc, target, item)
+
+    def handoff_stats(self) -> HandoffStats:
+        """Statistics about how items are coalesced when handed off to the event loops"""
+        total = HandoffStats(0, 0, 0, {})
+        with self._lock:
+            inboxes = list(self._inboxes.values())
+
+        for inbox in inboxes:
+            stats = inbox.stats
+            total.batches += stats.batches
+            total.items += stats.items
+            total.max_batch_size = max(total.max_batch_size, stats.max_batch_size)
+            for bucket, count in list(stats.batch_sizes.items()):
+                total.batch_sizes[bucket] = total.batch_sizes.get(bucket, 0) + count
+
+        return total
 
-    def subscribe(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Queue[T]:
+    def wait_callback(
+        self,
+        async_id: int,
+        request_type: str,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> asyncio.Future[T]:
+        """Return a future resolved with the callback of the async request `async_id`"""
         with self._lock:
-            queue = Queue[T]()
             loop = loop or asyncio.get_event_loop()
-            self._subscribers.append((queue, loop))
+            fut: asyncio.Future[T] = loop.create_future()
+
+            items = self._unclaimed.pop(async_id, None)
+            if items:
+                self._completed += 1
+                fut.set_result(_unwrap(items[0]))
+                return fut
+
+            self._pending[async_id] = (fut, request_type)
+            count = self._outstanding_by_type.get(request_type, 0) + 1
+            self._outstanding_by_type[request_type] = count
+            self._peak_outstanding = max(self._peak_outstanding, len(self._pending))
+
+        fut.add_done_callback(lambda _: self._complete(async_id))
+        return fut
+
+    def _complete(self, async_id: int) -> None:
+        with self._lock:
+            entry = self._pending.pop(async_id, None)
+            if entry is None:
+                return
+
+            fut, request_type = entry
+            count = self._outstanding_by_type[request_type] - 1
+            if count:
+                self._outstanding_by_type[request_type] = count
+            else:
+                del self._outstanding_by_type[request_type]
+
+            if fut.cancelled():
+                self._cancelled += 1
+                self._cancelled_ids[async_id] = None
+                if len(self._cancelled_ids) > _MAX_CANCELLED:
+                    self._cancelled_ids.popitem(last=False)
+            else:
+                self._completed += 1
+
+    def async_stats(self) -> AsyncRequestStats:
+        """Counters of the async requests waiting for their callback"""
+        with self._lock:
+            return AsyncRequestStats(
+                outstanding=len(self._pending),
+                outstanding_by_type=dict(self._outstanding_by_type),
+                peak_outstanding=self._peak_outstanding,
+                completed=self._completed,
+                cancelled=self._cancelled,
+            )
+
+    def subscribe(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        *,
+        key: Optional[int] = None,
+        capacity: int = 0,
+        overflow: OverflowPolicy = "drop_oldest",
+        block_timeout: float = 0.1,
+    ) -> SubscriberQueue[T]:
+        """Create a new subscriber queue.
+
+        Without a `key` the queue starts on the catch-all lane, which is needed when the
+        key is only known after the request creating it (e.g. a stream handle or an
+        async_id). Call `route` once the key is known to stop receiving unrelated items.
+
+        Args:
+            capacity (int): Maximum number of items held by the queue, 0 for unbounded.
+            overflow (OverflowPolicy): What to do when a bounded queue is full, see
+                `SubscriberQueue`.
+            block_timeout (float): How long the "block" policy waits for the consumer.
+        """
+        with self._lock:
+            queue = SubscriberQueue[T](capacity, overflow, block_timeout)
+            loop = loop or asyncio.get_event_loop()
+            if key is None:
+                self._subscribers.append((queue, loop))
+            else:
+                self._add_route(queue, loop, key)
+                self._claim(queue, loop, key)
             return queue
 
+    def route(self, queue: Queue[T], key: int) -> None:
+        """Route the items published under `key` to `queue`.
+
+        A queue on the catch-all lane leaves it the first time it gets routed, so it no
+        longer receives the items meant for other subscribers.
+        """
+        with self._lock:
+            for i, (q, loop) in enumerate(self._subscribers):
+                if q is queue:
+                    self._subscribers.pop(i)
+                    if self._sharded:
+                        self._claim(queue, loop, key)
+                    else:
+                        # the queue already received everything published until now
+                        self._unclaimed.pop(key, None)
+                    break
+            else:
+                loop = self._loops[queue]
+                self._claim(queue, loop, key)
+
+            self._add_route(queue, loop, key)
+
+    def unroute(self, queue: Queue[T], key: int) -> None:
+        """Stop routing the items published under `key` to `queue`"""
+        with self._lock:
+            keys = self._keys.get(queue, [])
+            if key not in keys:
+                return
+
+            keys.remove(key)
+            routed = self._routes[key]
+            routed[:] = [(q, loop) for q, loop in routed if q is not queue]
+            if not routed:
+                del self._routes[key]
+
+    def _add_route(
+        self, queue: Queue[T], loop: asyncio.AbstractEventLoop, key: int
+    ) -> None:
+        self._routes.setdefault(key, []).append((queue, loop))
+        self._keys.setdefault(queue, []).append(key)
+        self._loops[queue] = loop
+
+    def _claim(
+        self, queue: Queue[T], loop: asyncio.AbstractEventLoop, key: int
+    ) -> None:
+        # called by the consumer with the lock held, waiting for room would stall it
+        for item in self._unclaimed.pop(key, ()):
+            self._post(queue, loop, item, block=False)
+
+    def subscriber_stats(self) -> List[SubscriberStats]:
+        """Fill level and drop counters of every subscriber queue"""
+        with self._lock:
+            queues = [q for q, _ in self._subscribers] + list(self._loops)
+        return [q.stats() for q in queues if isinstance(q, SubscriberQueue)]
+
     def unsubscribe(self, queue: Queue[T]) -> None:
         with self._lock:
-            # looping here is ok, since we don't expect a lot of subscribers
+            for key in list(self._keys.get(queue, [])):
+                self.unroute(queue, key)
+            self._keys.pop(queue, None)
+            self._loops.pop(queue, None)
+
+            # looping here is ok, since we don't expect a lot of catch-all subscribers
             for i, (q, _) in enumerate(self._subscribers):
                 if q == queue:
                     self._subscribers.pop(i)
                     break
 
 
+class _Deferred(Generic[T]):
+    """An item only built when the first consumer needs it"""
+
+    __slots__ = ("_build", "_item")
+
+    def __init__(self, build: Callable[[], T]) -> None:
+        self._build: Optional[Callable[[], T]] = build
+        self._item: Optional[T] = None
+
+    def get(self) -> T:
+        build = self._build
+        if build is not None:
+            # consumers on different loops may race here, building twice is harmless
+            self._item = build()
+            self._build = None
+        return self._item  # type: ignore
+
+
+def _unwrap(item: Any) -> Any:
+    return item.get() if isinstance(item, _Deferred) else item
+
+
+def _put_item(queue: Queue[T], item: Any) -> None:
+    queue.put_nowait(_unwrap(item))
+
+
+def _set_future_result(fut: asyncio.Future[T], item: Any) -> None:
+    if not fut.done():
+        fut.set_result(_unwrap(item))
+
+
+# the FfiEvent fields carrying the handle that owns the event
+_HANDLE_FIELDS = {
+    "room_event": "room_handle",
+    "audio_stream_event": "stream_handle",
+    "video_stream_event": "stream_handle",
+    "rpc_method_invocation": "local_participant_handle",
+}
+
+# the FfiEvent fields completing an async request
+_ASYNC_CALLBACKS = frozenset(
+    f.name
+    for f in proto_ffi.FfiEvent.DESCRIPTOR.oneofs_by_name["message"].fields
+    if "async_id" in f.message_type.fields_by_name
+)
+
+_MAX_UNCLAIMED = 256
+_MAX_UNCLAIMED_PER_KEY = 64
+# the items that are kept are only discarded past this limit, or with their key
+_MAX_KEPT_UNCLAIMED_PER_KEY = 1024
+# cancelled async requests whose callback didn't arrive yet
+_MAX_CANCELLED = 1024
+
+# events that are kept while they wait for their key to be routed, so that the room and
+# the streams see their whole lifecycle, see FfiQueue._stash for the limits
+_ROOM_LIFECYCLE_EVENTS = frozenset(
+    {
+        "participant_connected",
+        "participant_disconnected",
+        "local_track_published",
+        "local_track_unpublished",
+        "local_track_subscribed",
+        "track_published",
+        "track_unpublished",
+        "track_subscribed",
+        "track_unsubscribed",
+        "track_subscription_failed",
+        "room_sid_changed",
+        "connection_state_changed",
+        "disconnected",
+        "reconnecting",
+        "reconnected",
+        "eos",
+    }
+)
+
+
+def _keep_unclaimed(item: Any) -> bool:
+    event: proto_ffi.FfiEvent = _unwrap(item)
+    which = event.WhichOneof("message")
+    if which == "room_event":
+        return event.room_event.WhichOneof("message") in _ROOM_LIFECYCLE_EVENTS
+    if which in ("audio_stream_event", "video_stream_event"):
+        return getattr(event, which).HasField("eos")
+    return False
+
+
+def _release_unclaimed(item: Any) -> None:
+    """Release the native buffer of a discarded frame event.
+
+    The handles are garbage collected right away, and dropped by the releaser thread
+    rather than from the FFI callback.
+    """
+    event: proto_ffi.FfiEvent = _unwrap(item)
+    which = event.WhichOneof("message")
+    if which == "audio_stream_event":
+        if event.audio_stream_event.HasField("frame_received"):
+            frame = event.audio_stream_event.frame_received.frame
+            FfiHandle(frame.handle.id, "audio_frame")
+    elif which == "video_stream_event":
+        if event.video_stream_event.HasField("frame_received"):
+            buffer = event.video_stream_event.frame_received.buffer
+            FfiHandle(buffer.handle.id, "video_frame")
+
+
+def _routing_key(event: proto_ffi.FfiEvent) -> tuple[Optional[int], bool]:
+    """Return the key used to route the event, and whether it completes an async request"""
+    which = event.WhichOneof("message")
+    field = _HANDLE_FIELDS.get(which)  # type: ignore
+    if field is not None:
+        return getattr(getattr(event, which), field), False  # type: ignore
+
+    if which in _ASYNC_CALLBACKS:
+        return getattr(event, which).async_id, True  # type: ignore
+
+    return None, False
+
+
+def _key_field_number(field: Any) -> Optional[int]:
+    name = _HANDLE_FIELDS.get(field.name)
+    if name is None and field.name in _ASYNC_CALLBACKS:
+        name = "async_id"
+    if name is None:
+        return None
+    return field.message_type.fields_by_name[name].number
+
+
+# FfiEvent field number -> (field name, number of the routing key in the message)
+_EVENT_FIELDS = {
+    f.number: (f.name, _key_field_number(f))
+    for f in proto_ffi.FfiEvent.DESCRIPTOR.oneofs_by_name["message"].fields
+}
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _peek_event(data: bytes) -> tuple[Optional[str], Optional[int]]:
+    """Read the message type and routing key of a serialized FfiEvent without parsing it"""
+    try:
+        tag, pos = _read_varint(data, 0)
+        which, key_number = _EVENT_FIELDS.get(tag >> 3, (None, None))
+        if key_number is None or tag & 0x7 != 2:
+            return which, None
+
+        length, pos = _read_varint(data, pos)
+        end = pos + length
+        while pos < end:
+            tag, pos = _read_varint(data, pos)
+            number, wire_type = tag >> 3, tag & 0x7
+            if wire_type == 0:
+                value, pos = _read_varint(data, pos)
+                if number == key_number:
+                    return which, value
+            elif wire_type == 1:
+                pos += 8
+            elif wire_type == 2:
+                length, pos = _read_varint(data, pos)
+                pos += length
+            elif wire_type == 5:
+                pos += 4
+            else:
+                break
+
+        return which, 0  # unset, same as the parsed default
+    except IndexError:
+        return None, None
+
+
+def _parse_event(data: bytes) -> proto_ffi.FfiEvent:
+    event = proto_ffi.FfiEvent()
+    event.ParseFromString(data)
+    return event
+
+
 @ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_uint8), ctypes.c_size_t)
 def ffi_event_callback(
     data_ptr: ctypes.POINTER(ctypes.c_uint8),  # type: ignore
     data_len: ctypes.c_size_t,
 ) -> None:
-    event_data = bytes(data_ptr[: int(data_len)])
-    event = proto_ffi.FfiEvent()
-    event.ParseFromString(event_data)
+    dispatch_event(from_ffi(data_ptr, int(data_len)))
 
-    which = event.WhichOneof("message")
-    if which == "logs":
-        for record in event.logs.records:
-            level = to_python_level(record.level)
-            debug_env = os.environ.get("LIVEKIT_RTC_DEBUG", "").strip().lower()
-            rtc_debug = debug_env in ("true", "1")
 
-            if level == logging.DEBUG and not rtc_debug:
-                # ignore the rtc debug logs by default
-                if record.target == "libwebrtc" or record.target.startswith("livekit"):
-                    continue
+def dispatch_event(event_data: bytes) -> None:
+    """Dispatch a serialized FfiEvent to the subscribers of the FfiClient queue"""
+    client = FfiClient.instance
+
+    event_tap = client._event_tap
+    if event_tap is not None:
+        event_tap(event_data)
 
-            if level is not None:
-                logger.log(
-                    level,
-                    "%s:%s:%s - %s",
-                    record.target,
-                    record.line,
-                    record.module_path,
-                    record.message,
-                )
+    recorder = client._recorder
+
+    if client._defer_parse:
+        # only peek at the header here, the event is parsed by the loop consuming it
+        which, key = _peek_event(event_data)
+        if recorder is not None:
+            recorder.record_event(which, len(event_data))
+        if which == "logs" and not client._log_forwarder.enabled():
+            return  # none of the records would be emitted, don't even parse them
+        if which is not None and which not in ("logs", "panic"):
+            client.queue.put_lazy(
+                functools.partial(_parse_event, event_data),
+                key,
+                retain=which in _ASYNC_CALLBACKS,
+            )
+            return
+
+    event = _parse_event(event_data)
+
+    which = event.WhichOneof("message")
+    if recorder is not None and not client._defer_parse:
+        recorder.record_event(which, len(event_data))
 
+    if which == "logs":
+        client._log_forwarder.forward(event.logs.records)
         return  # no need to queue the logs
     elif which == "panic":
         print("FFI Panic: ", event.panic.message, file=sys.stderr, flush=True)
@@ -177,7 +1164,8 @@ def ffi_event_callback(
         os.kill(os.getpid(), signal.SIGTERM)
         return
 
-    FfiClient.instance.queue.put(event)
+    key, retain = _routing_key(event)
+    client.queue.put(event, key, retain=retain)
 
 
 def to_python_level(level: proto_ffi.LogLevel.ValueType) -> Optional[int]:
@@ -198,6 +1186,115 @@ def to_python_level(level: proto_ffi.LogLevel.ValueType) -> Optional[int]:
     return None
 
 
+class _LogForwarder:
+    """Forwards the native log records to the `livekit` logger.
+
+    The configuration is resolved once, and the level checks rely on the logger's own
+    cache, which is invalidated whenever a level changes.
+    """
+
+    def __init__(self) -> None:
+        debug_env = os.environ.get("LIVEKIT_RTC_DEBUG", "").strip().lower()
+        self._rtc_debug = debug_env in ("true", "1")
+        self._levels: Dict[int, int] = {}
+        for level in proto_ffi.LogLevel.values():
+            py_level = to_python_level(level)
+            if py_level is not None:
+                self._levels[level] = py_level
+        self._most_severe = max(self._levels.values())
+
+    def enabled(self) -> bool:
+        """Whether at least some of the native records can be emitted"""
+        return logger.isEnabledFor(self._most_severe)
+
+    def forward(self, records: Iterable[proto_ffi.LogRecord]) -> None:
+        if not self.enabled():
+            return
+
+        for record in records:
+            level = self._levels.get(record.level)
+            if level is None or not logger.isEnabledFor(level):
+                continue
+
+            if level == logging.DEBUG and not self._rtc_debug:
+                # ignore the rtc debug logs by default
+                if record.target == "libwebrtc" or record.target.startswith("livekit"):
+                    continue
+
+            logger.log(
+                level,
+                "%s:%s:%s - %s",
+                record.target,
+                record.line,
+                record.module_path,
+                record.message,
+            )
+
+
+class FfiBackend(ABC):
+    """Implementation of the FFI protocol behind the FfiClient.
+
+    A backend receives the serialized FfiRequests and delivers the serialized
+    FfiEvents, so the SDK code above it runs unchanged. The default backend is the
+    native liblivekit_ffi library, see `install` to use another one.
+    """
+
+    def install(self) -> None:
+        """Use this backend for the whole SDK, see `FfiClient.install_backend`"""
+        FfiClient.install_backend(self)
+
+    @abstractmethod
+    def initialize(self, on_event: Callable[[bytes], None]) -> None:
+        """Start the backend, `on_event` must be called with every serialized FfiEvent"""
+
+    @abstractmethod
+    def request(self, data: bytes) -> tuple[int, bytes]:
+        """Handle a serialized FfiRequest.
+
+        Returns:
+            tuple[int, bytes]: The handle owning the response, or INVALID_HANDLE, and
+                the serialized FfiResponse.
+        """
+
+    @abstractmethod
+    def drop_handle(self, handle: int) -> bool:
+        """Release a handle, return False if it doesn't exist"""
+
+    @abstractmethod
+    def dispose(self) -> None:
+        """Stop the backend and release its resources"""
+
+
+class _NativeBackend(FfiBackend):
+    def initialize(self, on_event: Callable[[bytes], None]) -> None:
+        # the native events always go through ffi_event_callback -> dispatch_event
+        global ffi_lib
+        if ffi_lib is None:
+            ffi_lib = load_ffi_lib()
+
+        ffi_lib.livekit_ffi_initialize(
+            ffi_event_callback, True, b"python", __version__.encode("ascii")
+        )
+
+    def request(self, data: bytes) -> tuple[int, bytes]:
+        resp_ptr = ctypes.POINTER(ctypes.c_ubyte)()
+        resp_len = ctypes.c_size_t()
+        handle = ffi_lib.livekit_ffi_request(
+            to_ffi(data),
+            len(data),
+            ctypes.byref(resp_ptr),
+            ctypes.byref(resp_len),
+        )
+        assert handle != INVALID_HANDLE
+        return handle, from_ffi(resp_ptr, resp_len.value)
+
+    def drop_handle(self, handle: int) -> bool:
+        return ffi_lib.livekit_ffi_drop_handle(ctypes.c_uint64(handle))
+
+    def dispose(self) -> None:
+        ffi_lib.livekit_ffi_dispose()
+
+
 class FfiClient:
     _instance: Optional["FfiClient"] = None
 
@@ -207,37 +1304,124 @@ class FfiClient:
             cls._instance = FfiClient()
         return cls._instance
 
-    def __init__(self) -> None:
-        self._lock = threading.RLock()
-        self._queue = FfiQueue[proto_ffi.FfiEvent]()
+    @classmethod
+    def install_backend(cls, backend: FfiBackend) -> "FfiClient":
+        """Use `backend` instead of the native library, e.g. `FakeFfiBackend`.
 
-        ffi_lib.livekit_ffi_initialize(
-            ffi_event_callback, True, b"python", __version__.encode("ascii")
+        It must be called before anything else in the SDK uses the FFI.
+
+        Raises:
+            RuntimeError: If the FfiClient is already initialized.
+        """
+        if cls._instance is not None:
+            raise RuntimeError("the FfiClient is already initialized")
+        cls._instance = FfiClient(backend)
+        return cls._instance
+
+    def __init__(self, backend: Optional[FfiBackend] = None) -> None:
+        self._lock = threading.RLock()
+        # only post the events of a handle to the event loop it is routed to
+        sharded_env = os.environ.get("LIVEKIT_FFI_SHARDED", "").strip().lower()
+        self._queue = FfiQueue[proto_ffi.FfiEvent](
+            sharded=sharded_env in ("true", "1"),
+            keep=_keep_unclaimed,
+            on_evict=_release_unclaimed,
         )
 
+        # parse the events on the loops consuming them instead of the native thread
+        defer_env = os.environ.get("LIVEKIT_FFI_DEFER_PARSE", "").strip().lower()
+        self._defer_parse = defer_env in ("true", "1")
+        self._log_forwarder = _LogForwarder()
+
+        stats_env = os.environ.get("LIVEKIT_FFI_STATS", "").strip().lower()
+        self._recorder: Optional[_FfiRecorder] = None
+        if stats_env in ("true", "1"):
+            self._recorder = _FfiRecorder()
+        # receives every serialized event before it is dispatched, see EventRecorder
+        self._event_tap: Optional[Callable[[bytes], None]] = None
+
+        self._backend = backend or _NativeBackend()
+        self._backend.initialize(dispatch_event)
+
         @atexit.register
         def _dispose_lk_ffi():
-            ffi_lib.livekit_ffi_dispose()
+            _releaser.flush()
+            self._backend.dispose()
 
     @property
     def queue(self) -> FfiQueue[proto_ffi.FfiEvent]:
         return self._queue
 
+    def handle_stats(self) -> HandleStats:
+        """Live and released FFI handles"""
+        return _releaser.stats()
+
+    def enable_stats(self, enabled: bool = True) -> None:
+        """Enable or disable the instrumentation of the FFI requests and events.
+
+        Disabling it discards the statistics collected so far. It can also be enabled
+        at startup with the LIVEKIT_FFI_STATS environment variable.
+        """
+        if not enabled:
+            self._recorder = None
+        elif self._recorder is None:
+            self._recorder = _FfiRecorder()
+
+    def stats(self, reset: bool = False) -> FfiStats:
+        """Statistics about the FFI requests and events, see `enable_stats`.
+
+        Args:
+            reset (bool): Start a new sampling interval after reading the statistics.
+        """
+        recorder = self._recorder
+        if recorder is None:
+            return FfiStats()
+        return recorder.snapshot(reset)
+
+    def request_async(
+        self,
+        req: proto_ffi.FfiRequest,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> asyncio.Future[proto_ffi.FfiEvent]:
+        """Send an async request and return a future resolved with its callback event"""
+        resp = self.request(req)
+        which = req.WhichOneof("message")
+        async_id = getattr(resp, which).async_id  # type: ignore
+        return self._queue.wait_callback(async_id, which, loop)  # type: ignore
+
+    def request_routed(
+        self, req: proto_ffi.FfiRequest, queue: Queue[proto_ffi.FfiEvent]
+    ) -> proto_ffi.FfiResponse:
+        """Send an async request and route its callback to `queue`.
+
+        The queue lock is held until the route exists, so the callback can't be
+        delivered before it is routed, and reaches `queue` in order with the events
+        published after it. Unroute the async_id once the callback is handled.
+        """
+        with self._queue._lock:
+            resp = self.request(req)
+            which = req.WhichOneof("message")
+            self._queue.route(queue, getattr(resp, which).async_id)  # type: ignore
+        return resp
+
     def request(self, req: proto_ffi.FfiRequest) -> proto_ffi.FfiResponse:
-        proto_data = req.SerializeToString()
-        proto_len = len(proto_data)
-        data = (ctypes.c_ubyte * proto_len)(*proto_data)
+        recorder = self._recorder
+        if recorder is not None:
+            start = time.perf_counter()
 
-        resp_ptr = ctypes.POINTER(ctypes.c_ubyte)()
-        resp_len = ctypes.c_size_t()
-        handle = ffi_lib.livekit_ffi_request(
-            data, proto_len, ctypes.byref(resp_ptr), ctypes.byref(resp_len)
-        )
-        assert handle != INVALID_HANDLE
+        proto_data = req.SerializeToString()
+        handle, resp_data = self._backend.request(proto_data)
 
-        resp_data = bytes(resp_ptr[: resp_len.value])
         resp = proto_ffi.FfiResponse()
         resp.ParseFromString(resp_data)
 
-        FfiHandle(handle)
+        FfiHandle(handle, "response")
+
+        if recorder is not None:
+            recorder.record_request(
+                req.WhichOneof("message"),  # type: ignore
+                time.perf_counter() - start,
+                len(proto_data),
+                len(resp_data),
+            )
         return resp
@@ -0,0 +1,105 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Moves serialized messages and payloads across the FFI boundary.
+
+Every helper works on buffer-protocol objects and copies the data at most once
+(a single memcpy), never element by element.
+"""
+
+import ctypes
+from typing import Any, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_ubyte_p = ctypes.POINTER(ctypes.c_ubyte)
+
+
+def to_ffi(data: bytes) -> Any:
+    """Pointer to the content of `data` to pass to the FFI, without copying it.
+
+    The FFI must only read from the pointer, and `data` must be kept alive for as
+    long as the pointer is used.
+    """
+    return ctypes.cast(ctypes.c_char_p(data), _ubyte_p)
+
+
+def from_ffi(ptr: Any, length: int) -> bytes:
+    """Copy `length` bytes owned by the FFI into a new bytes object"""
+    if length == 0:
+        return b""
+
+    return ctypes.string_at(ptr, length)
+
+
+class _PyBuffer(ctypes.Structure):
+    # Py_buffer, see https://docs.python.org/3/c-api/buffer.html
+    _fields_ = [
+        ("buf", ctypes.c_void_p),
+        ("obj", ctypes.c_void_p),
+        ("len", ctypes.c_ssize_t),
+        ("itemsize", ctypes.c_ssize_t),
+        ("readonly", ctypes.c_int),
+        ("ndim", ctypes.c_int),
+        ("format", ctypes.c_char_p),
+        ("shape", ctypes.c_void_p),
+        ("strides", ctypes.c_void_p),
+        ("suboffsets", ctypes.c_void_p),
+        ("internal", ctypes.c_void_p),
+    ]
+
+
+class _BufferExport:
+    """Keeps the memory of a read-only buffer in place until it is garbage collected"""
+
+    def __init__(self, view: memoryview) -> None:
+        self._buffer = _PyBuffer()
+        _get_buffer(ctypes.py_object(view), ctypes.byref(self._buffer), 0)
+        self.address: int = self._buffer.buf or 0
+
+    def __del__(self) -> None:
+        if self._buffer.obj:
+            _release_buffer(ctypes.byref(self._buffer))
+
+
+_pythonapi = getattr(ctypes, "pythonapi", None)
+if _pythonapi is not None:
+    _get_buffer = _pythonapi.PyObject_GetBuffer
+    _get_buffer.argtypes = [ctypes.py_object, ctypes.POINTER(_PyBuffer), ctypes.c_int]
+    _get_buffer.restype = ctypes.c_int
+    _release_buffer = _pythonapi.PyBuffer_Release
+    _release_buffer.argtypes = [ctypes.POINTER(_PyBuffer)]
+    _release_buffer.restype = None
+
+
+def buffer_address(data: Buffer) -> Tuple[int, Any]:
+    """Address of the content of `data`, and the object to keep alive while it is used.
+
+    Contiguous buffers are shared with the FFI without copying, read-only ones
+    included. They are only copied (once) on interpreters without the C buffer API.
+    """
+    if isinstance(data, bytes):
+        return ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value or 0, data
+
+    view = memoryview(data).cast("B")
+    if not view.readonly:
+        cdata = (ctypes.c_ubyte * view.nbytes).from_buffer(view)
+        return ctypes.addressof(cdata), cdata
+
+    if _pythonapi is not None:
+        export = _BufferExport(view)
+        return export.address, export
+
+    cdata = (ctypes.c_ubyte * view.nbytes).from_buffer_copy(view)
+    return ctypes.addressof(cdata), cdata
@@ -17,7 +17,7 @@ import logging
 from collections import deque
 import ctypes
 import random
-from typing import Callable, Generic, List, TypeVar
+from typing import Callable, Generic, TypeVar
 
 logger = logging.getLogger("livekit")
 
@@ -89,35 +89,6 @@ class Queue(asyncio.Queue[T]):
             self.task_done()
 
 
-class BroadcastQueue(Generic[T]):
-    """Queue with multiple subscribers."""
-
-    def __init__(self) -> None:
-        self._lock = asyncio.Lock()
-        self._subscribers: List[Queue[T]] = []
-
-    def len_subscribers(self) -> int:
-        return len(self._subscribers)
-
-    def put_nowait(self, item: T) -> None:
-        for queue in self._subscribers:
-            queue.put_nowait(item)
-
-    def subscribe(self) -> Queue[T]:
-        queue = Queue[T]()
-        self._subscribers.append(queue)
-        return queue
-
-    def unsubscribe(self, queue: Queue[T]) -> None:
-        self._subscribers.remove(queue)
-
-    async def join(self) -> None:
-        async with self._lock:
-            subs = self._subscribers.copy()
-            for queue in subs:
-                await queue.join()
-
-
 _base62_characters = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 
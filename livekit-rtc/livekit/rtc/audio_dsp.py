@@ -0,0 +1,199 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorized processing of the int16 samples of audio frames.
+
+The functions work on NumPy views of the frame buffers and saturate to the int16
+range instead of wrapping around. They return a new frame, or write to `out`, an
+existing frame of the output format, e.g. one acquired from an `AudioFramePool`.
+Passing the input frame as `out` processes it in place, when the input and
+output formats are the same.
+
+NumPy must be installed to use this module.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from .audio_frame import AudioFrame, _import_numpy
+
+if TYPE_CHECKING:
+    import numpy as np
+
+__all__ = [
+    "apply_gain",
+    "mix_audio_frames",
+    "upmix_to_stereo",
+    "downmix_to_mono",
+]
+
+_INT16_MIN = -32768
+_INT16_MAX = 32767
+
+
+def apply_gain(
+    frame: AudioFrame, gain: float, out: Optional[AudioFrame] = None
+) -> AudioFrame:
+    """
+    Multiplies the samples of a frame by `gain`, rounding and saturating to int16.
+
+    Args:
+        frame (AudioFrame): The input frame.
+        gain (float): The linear gain, e.g. 0.5 for -6 dB.
+        out (Optional[AudioFrame]): The frame to write to, of the same format as
+            `frame`. Pass `frame` to apply the gain in place.
+
+    Returns:
+        AudioFrame: `out`, or a new frame if `out` is None.
+
+    Raises:
+        ValueError: If `out` doesn't have the format of `frame`.
+    """
+    np = _import_numpy()
+    out = _output(frame, frame.num_channels, out)
+    dst = out.to_ndarray()
+
+    scaled = np.multiply(frame.to_ndarray(), np.float32(gain), dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    _saturate(scaled, dst)
+    return out
+
+
+def mix_audio_frames(
+    frames: Sequence[AudioFrame], out: Optional[AudioFrame] = None
+) -> AudioFrame:
+    """
+    Sums several frames of the same format, saturating to int16.
+
+    The samples are accumulated in int32, so only the final sum is clipped, not
+    the intermediate ones.
+
+    Args:
+        frames (Sequence[AudioFrame]): The frames to mix, e.g. one per participant.
+        out (Optional[AudioFrame]): The frame to write to, of the same format as the
+            inputs. It can be one of `frames` to mix in place.
+
+    Returns:
+        AudioFrame: `out`, or a new frame if `out` is None.
+
+    Raises:
+        ValueError: If `frames` is empty or the formats of the frames differ.
+    """
+    if not frames:
+        raise ValueError("no frames to mix")
+
+    np = _import_numpy()
+    first = frames[0]
+    for frame in frames[1:]:
+        if (
+            frame.sample_rate != first.sample_rate
+            or frame.num_channels != first.num_channels
+            or frame.samples_per_channel != first.samples_per_channel
+        ):
+            raise ValueError(f"cannot mix {frame!r} with {first!r}")
+
+    out = _output(first, first.num_channels, out)
+    dst = out.to_ndarray()
+
+    acc = first.to_ndarray().astype(np.int32)
+    for frame in frames[1:]:
+        np.add(acc, frame.to_ndarray(), out=acc)
+    _saturate(acc, dst)
+    return out
+
+
+def upmix_to_stereo(frame: AudioFrame, out: Optional[AudioFrame] = None) -> AudioFrame:
+    """
+    Duplicates the channel of a mono frame to both channels of a stereo frame.
+
+    Args:
+        frame (AudioFrame): The mono input frame.
+        out (Optional[AudioFrame]): The stereo frame to write to.
+
+    Returns:
+        AudioFrame: `out`, or a new frame if `out` is None.
+
+    Raises:
+        ValueError: If `frame` isn't mono or `out` isn't stereo.
+    """
+    if frame.num_channels != 1:
+        raise ValueError(f"expected a mono frame, got {frame.num_channels} channels")
+
+    out = _output(frame, 2, out)
+    # broadcasts the (samples_per_channel, 1) input to both columns
+    out.to_ndarray()[:] = frame.to_ndarray()
+    return out
+
+
+def downmix_to_mono(frame: AudioFrame, out: Optional[AudioFrame] = None) -> AudioFrame:
+    """
+    Averages the channels of a frame into a mono frame.
+
+    The average can't exceed the int16 range, so it doesn't need to saturate. It is
+    rounded towards negative infinity.
+
+    Args:
+        frame (AudioFrame): The input frame, with any number of channels.
+        out (Optional[AudioFrame]): The mono frame to write to.
+
+    Returns:
+        AudioFrame: `out`, or a new frame if `out` is None.
+
+    Raises:
+        ValueError: If `out` isn't a mono frame of the format of `frame`.
+    """
+    np = _import_numpy()
+    out = _output(frame, 1, out)
+    dst = out.to_ndarray()
+
+    src = frame.to_ndarray()
+    if frame.num_channels == 1:
+        np.copyto(dst, src)
+        return out
+
+    # summing column by column is much faster than reducing along the rows
+    acc = src[:, :1].astype(np.int32)
+    for channel in range(1, frame.num_channels):
+        np.add(acc, src[:, channel : channel + 1], out=acc)
+    np.floor_divide(acc, frame.num_channels, out=acc)
+    np.copyto(dst, acc, casting="unsafe")
+    return out
+
+
+def _output(
+    frame: AudioFrame, num_channels: int, out: Optional[AudioFrame]
+) -> AudioFrame:
+    if out is None:
+        return AudioFrame.create(
+            frame.sample_rate, num_channels, frame.samples_per_channel
+        )
+
+    if (
+        out.sample_rate != frame.sample_rate
+        or out.num_channels != num_channels
+        or out.samples_per_channel != frame.samples_per_channel
+    ):
+        raise ValueError(
+            f"expected an output frame of {num_channels} channels, "
+            f"{frame.samples_per_channel} samples per channel at "
+            f"{frame.sample_rate} Hz, got {out!r}"
+        )
+    return out
+
+
+def _saturate(samples: np.ndarray, dst: np.ndarray) -> None:
+    np = _import_numpy()
+    np.clip(samples, _INT16_MIN, _INT16_MAX, out=samples)
+    np.copyto(dst, samples, casting="unsafe")
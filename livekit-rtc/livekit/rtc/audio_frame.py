@@ -13,11 +13,18 @@
 # limitations under the License.
 
 import ctypes
+import pickle
+import sys
 from ._ffi_client import FfiHandle, FfiClient
+from ._marshal import buffer_address
 from ._proto import audio_frame_pb2 as proto_audio
 from ._proto import ffi_pb2 as proto_ffi
-from ._utils import get_address
-from typing import Union
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+AudioLayout = Literal["interleaved", "planar"]
 
 
 class AudioFrame:
@@ -48,17 +55,77 @@ class AudioFrame:
         Raises:
             ValueError: If the length of `data` is smaller than the required size.
         """
-        if len(data) < num_channels * samples_per_channel * ctypes.sizeof(
-            ctypes.c_int16
-        ):
-            raise ValueError(
-                "data length must be >= num_channels * samples_per_channel * sizeof(int16)"
-            )
+        _check_size(memoryview(data).nbytes, num_channels, samples_per_channel)
 
-        self._data = bytearray(data)
+        self._data: Union[bytearray, memoryview] = bytearray(data)
         self._sample_rate = sample_rate
         self._num_channels = num_channels
         self._samples_per_channel = samples_per_channel
+        self._keepalive: Any = None
+        self._ffi_handle: Optional[FfiHandle] = None
+        # the view of the native buffer of a zero-copy frame, see `release`
+        self._native_view: Optional[memoryview] = None
+        # the AudioFramePool the frame was acquired from, until it is given back
+        self._pool: Any = None
+
+    @staticmethod
+    def from_buffer(
+        data: Any,
+        sample_rate: int,
+        num_channels: int,
+        samples_per_channel: int,
+    ) -> "AudioFrame":
+        """
+        Create an AudioFrame over the memory of `data`, without copying it.
+
+        The frame borrows `data`: it keeps a reference to it, and reads and writes go
+        to the caller's memory. Changes made to `data` are visible in the frame, and
+        `data` can't be resized while the frame is alive. The only copy left on the
+        publish path is the one into the native audio source, made by `capture_frame`
+        before it returns, so `data` can be reused as soon as it returns.
+
+        Args:
+            data: Any C-contiguous buffer holding interleaved int16 samples, e.g. a
+                bytearray, a memoryview or an int16 numpy array. Read-only buffers are
+                accepted, the frame data is read-only then.
+            sample_rate (int): The sample rate of the audio in Hz.
+            num_channels (int): The number of audio channels.
+            samples_per_channel (int): The number of samples per channel.
+
+        Returns:
+            AudioFrame: A frame sharing the memory of `data`.
+
+        Raises:
+            ValueError: If `data` is not contiguous, holds items other than int16
+                samples or bytes, or is smaller than the required size.
+        """
+        view = memoryview(data)
+        _check_format(view.format)
+        try:
+            view = view.cast("B")
+        except (TypeError, ValueError, NotImplementedError) as e:
+            raise ValueError("data must be a C-contiguous buffer") from e
+        _check_size(view.nbytes, num_channels, samples_per_channel)
+        return AudioFrame._wrap(view, sample_rate, num_channels, samples_per_channel)
+
+    @staticmethod
+    def _wrap(
+        data: Union[bytearray, memoryview],
+        sample_rate: int,
+        num_channels: int,
+        samples_per_channel: int,
+    ) -> "AudioFrame":
+        # a bytearray is adopted by the frame, a memoryview is borrowed
+        frame = AudioFrame.__new__(AudioFrame)
+        frame._data = data
+        frame._sample_rate = sample_rate
+        frame._num_channels = num_channels
+        frame._samples_per_channel = samples_per_channel
+        frame._keepalive = None
+        frame._ffi_handle = None
+        frame._native_view = None
+        frame._pool = None
+        return frame
 
     @staticmethod
     def create(
@@ -78,16 +145,36 @@ class AudioFrame:
         """
         size = num_channels * samples_per_channel * ctypes.sizeof(ctypes.c_int16)
         data = bytearray(size)
-        return AudioFrame(data, sample_rate, num_channels, samples_per_channel)
+        return AudioFrame._wrap(data, sample_rate, num_channels, samples_per_channel)
 
     @staticmethod
-    def _from_owned_info(owned_info: proto_audio.OwnedAudioFrameBuffer) -> "AudioFrame":
+    def _from_owned_info(
+        owned_info: proto_audio.OwnedAudioFrameBuffer, borrow: bool = False
+    ) -> "AudioFrame":
         info = owned_info.info
         size = info.num_channels * info.samples_per_channel
-        cdata = (ctypes.c_int16 * size).from_address(info.data_ptr)
-        data = bytearray(cdata)
-        FfiHandle(owned_info.handle.id)
-        return AudioFrame(
+        if borrow:
+            nbytes = size * ctypes.sizeof(ctypes.c_int16)
+            cdata = (ctypes.c_uint8 * nbytes).from_address(info.data_ptr)
+            # the native buffer lives as long as its handle, which is attached to the
+            # exported array: views of the data keep it alive after the frame is gone
+            handle = FfiHandle(owned_info.handle.id, "audio_frame")
+            cdata._ffi_handle = handle  # type: ignore[attr-defined]
+            native_view = memoryview(cdata).cast("B")
+            frame = AudioFrame._wrap(
+                _export(native_view),
+                info.sample_rate,
+                info.num_channels,
+                info.samples_per_channel,
+            )
+            frame._ffi_handle = handle
+            frame._native_view = native_view
+            return frame
+
+        samples = (ctypes.c_int16 * size).from_address(info.data_ptr)
+        data = bytearray(samples)
+        FfiHandle(owned_info.handle.id, "audio_frame")
+        return AudioFrame._wrap(
             data, info.sample_rate, info.num_channels, info.samples_per_channel
         )
 
@@ -102,7 +189,9 @@ class AudioFrame:
         req.new_audio_resampler.CopyFrom(proto_audio.NewAudioResamplerRequest())
 
         resp = FfiClient.instance.request(req)
-        resampler_handle = FfiHandle(resp.new_audio_resampler.resampler.handle.id)
+        resampler_handle = FfiHandle(
+            resp.new_audio_resampler.resampler.handle.id, "audio_resampler"
+        )
 
         resample_req = proto_ffi.FfiRequest()
         resample_req.remix_and_resample.resampler_handle = resampler_handle.handle
@@ -115,7 +204,8 @@ class AudioFrame:
 
     def _proto_info(self) -> proto_audio.AudioFrameBufferInfo:
         audio_info = proto_audio.AudioFrameBufferInfo()
-        audio_info.data_ptr = get_address(memoryview(self._data))
+        # the address stays valid as long as the frame, which keeps the export alive
+        audio_info.data_ptr, self._keepalive = buffer_address(self._data)
         audio_info.sample_rate = self.sample_rate
         audio_info.num_channels = self.num_channels
         audio_info.samples_per_channel = self.samples_per_channel
@@ -126,11 +216,65 @@ class AudioFrame:
         """
         Returns a memory view of the audio data as 16-bit signed integers.
 
+        The view is read-only if the frame was created with `from_buffer` over a
+        read-only buffer.
+
         Returns:
             memoryview: A memory view of the audio data.
         """
         return memoryview(self._data).cast("h")
 
+    @property
+    def owns_data(self) -> bool:
+        """Whether the frame owns its memory, False if it borrows it (see `from_buffer`)"""
+        return isinstance(self._data, bytearray)
+
+    def copy(self) -> "AudioFrame":
+        """
+        Returns a frame owning a copy of the audio data.
+
+        Frames received from an `AudioStream` created with `zero_copy=True` point to
+        native memory released with the frame, copy them to keep their data around.
+
+        Returns:
+            AudioFrame: A new frame with the same properties and its own data.
+        """
+        return AudioFrame._wrap(
+            bytearray(self._data),
+            self.sample_rate,
+            self.num_channels,
+            self.samples_per_channel,
+        )
+
+    def release(self) -> None:
+        """
+        Releases the native memory of a frame received with `zero_copy=True` now,
+        instead of when the frame is garbage collected.
+
+        The frame is empty afterwards. It does nothing for the other frames.
+
+        Raises:
+            BufferError: If views of the data, returned by `data` or `to_ndarray`, are
+                still alive. The frame is left unchanged then.
+        """
+        if self._ffi_handle is None or self._native_view is None:
+            return
+
+        # the views of the data are all exports of the native view, through
+        # self._data, which can only be released once they are all gone
+        self._data = bytearray()
+        self._keepalive = None
+        try:
+            self._native_view.release()
+        except BufferError:
+            self._data = _export(self._native_view)
+            raise
+
+        self._native_view = None
+        self._samples_per_channel = 0
+        self._ffi_handle.close()
+        self._ffi_handle = None
+
     @property
     def sample_rate(self) -> int:
         """
@@ -171,6 +315,119 @@ class AudioFrame:
         """
         return self.samples_per_channel / self.sample_rate
 
+    def to_ndarray(
+        self, dtype: Any = "int16", layout: AudioLayout = "interleaved"
+    ) -> "np.ndarray":
+        """
+        Returns the audio data as a NumPy array.
+
+        int16 arrays are views of the frame data, without any copy: writing to them
+        writes to the frame. Float arrays are converted in a single vectorized pass,
+        scaled to [-1.0, 1.0).
+
+        Args:
+            dtype: `int16`, or a float dtype such as `float32`.
+            layout (AudioLayout): "interleaved" for an array of shape
+                (samples_per_channel, num_channels), "planar" for an array of shape
+                (num_channels, samples_per_channel). Planar int16 arrays are
+                transposed views, use `np.ascontiguousarray` if a contiguous copy
+                is needed.
+
+        Returns:
+            np.ndarray: The audio samples.
+
+        Raises:
+            ValueError: If the dtype or the layout isn't supported.
+        """
+        np = _import_numpy()
+        dtype = np.dtype(dtype)
+        _check_layout(layout)
+
+        samples = np.frombuffer(
+            self._data,
+            dtype=np.int16,
+            count=self.samples_per_channel * self.num_channels,
+        ).reshape(self.samples_per_channel, self.num_channels)
+        if layout == "planar":
+            samples = samples.T
+
+        if dtype == np.int16:
+            return samples
+        if dtype.kind != "f":
+            raise ValueError(f"unsupported dtype {dtype}, use int16 or a float dtype")
+
+        out = np.empty(samples.shape, dtype=dtype)
+        np.multiply(samples, dtype.type(1 / 32768), out=out)
+        return out
+
+    @staticmethod
+    def from_ndarray(
+        array: "np.ndarray",
+        sample_rate: int,
+        layout: AudioLayout = "interleaved",
+        copy: bool = False,
+    ) -> "AudioFrame":
+        """
+        Creates an AudioFrame from a NumPy array.
+
+        A C-contiguous interleaved int16 array is shared with the frame without
+        copying, like `from_buffer`, unless `copy` is True. Other arrays are converted
+        into a new buffer owned by the frame, float samples in [-1.0, 1.0] are scaled
+        to int16 and clipped.
+
+        Args:
+            array (np.ndarray): The samples, of shape (samples_per_channel,
+                num_channels) for the "interleaved" layout, (num_channels,
+                samples_per_channel) for the "planar" one, or a 1-D mono array.
+            sample_rate (int): The sample rate of the audio in Hz.
+            layout (AudioLayout): The layout of `array`.
+            copy (bool): Always copy the samples into a buffer owned by the frame.
+
+        Returns:
+            AudioFrame: The audio frame.
+
+        Raises:
+            ValueError: If the shape, dtype or layout of `array` isn't supported.
+        """
+        np = _import_numpy()
+        _check_layout(layout)
+
+        if array.ndim == 1:
+            samples = array.reshape(-1, 1)
+        elif array.ndim == 2:
+            samples = array.T if layout == "planar" else array
+        else:
+            raise ValueError(
+                f"expected a 1-D or 2-D array, got {array.ndim} dimensions"
+            )
+
+        samples_per_channel, num_channels = samples.shape
+        if (
+            not copy
+            and samples.dtype == np.int16
+            and samples.flags.c_contiguous
+            and samples.dtype.isnative
+        ):
+            return AudioFrame.from_buffer(
+                samples, sample_rate, num_channels, samples_per_channel
+            )
+
+        is_int16 = samples.dtype.kind == "i" and samples.dtype.itemsize == 2
+        if not is_int16 and samples.dtype.kind != "f":
+            raise ValueError(f"unsupported dtype {samples.dtype}, use int16 or floats")
+
+        data = bytearray(samples.size * ctypes.sizeof(ctypes.c_int16))
+        out = np.frombuffer(data, dtype=np.int16).reshape(samples.shape)
+        if not is_int16:
+            scaled = np.multiply(samples, samples.dtype.type(32768))
+            np.rint(scaled, out=scaled)
+            np.clip(scaled, -32768, 32767, out=scaled)
+            np.copyto(out, scaled, casting="unsafe")
+        else:
+            np.copyto(out, samples, casting="unsafe")
+
+        return AudioFrame._wrap(data, sample_rate, num_channels, samples_per_channel)
+
     def to_wav_bytes(self) -> bytes:
         """
         Convert the audio frame data to a WAV-formatted byte stream.
@@ -197,3 +454,46 @@ class AudioFrame:
             f"samples_per_channel={self.samples_per_channel}, "
             f"duration={self.duration:.3f})"
         )
+
+
+def _check_size(nbytes: int, num_channels: int, samples_per_channel: int) -> None:
+    if nbytes < num_channels * samples_per_channel * ctypes.sizeof(ctypes.c_int16):
+        raise ValueError(
+            "data length must be >= num_channels * samples_per_channel * sizeof(int16)"
+        )
+
+
+def _export(view: memoryview) -> memoryview:
+    """A view of `view` counted as an export of it, unlike `memoryview(view)`.
+
+    The views derived from the result keep the export alive, so `view.release()`
+    raises BufferError as long as any of them exists.
+    """
+    return memoryview(pickle.PickleBuffer(view))
+
+
+# native int16 samples, or raw bytes
+_SAMPLE_FORMATS = ("h", "B", "b", "c")
+_NATIVE_ORDER = ("@", "=", "<" if sys.byteorder == "little" else ">")
+
+
+def _check_format(fmt: str) -> None:
+    item = fmt[1:] if fmt[:1] in _NATIVE_ORDER else fmt
+    if item not in _SAMPLE_FORMATS:
+        raise ValueError(
+            f"unsupported buffer format {fmt!r}, data must hold native int16 samples "
+            "or bytes"
+        )
+
+
+def _check_layout(layout: str) -> None:
+    if layout not in ("interleaved", "planar"):
+        raise ValueError(f"unsupported layout {layout!r}, use interleaved or planar")
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("numpy is required to convert audio frames to arrays") from e
+    return np
@@ -0,0 +1,138 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ctypes
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .audio_frame import AudioFrame
+
+# (sample_rate, num_channels, samples_per_channel)
+_FrameFormat = Tuple[int, int, int]
+
+
+@dataclass
+class AudioFramePoolStats:
+    hits: int = 0
+    """Frames handed out from the pool"""
+    misses: int = 0
+    """Frames allocated because the pool had none of the requested format"""
+    returned: int = 0
+    """Frames given back to the pool"""
+    discarded: int = 0
+    """Frames given back while the pool was full, left to the garbage collector"""
+    pooled: int = 0
+    """Frames currently available in the pool"""
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class AudioFramePool:
+    """Recycles the buffers of the audio frames of a publisher.
+
+    Frames are acquired from the pool, filled, and captured with
+    `AudioSource.capture_frame`, which gives them back to the pool once the capture
+    has completed. In the steady state, publishing doesn't allocate any buffer.
+
+    A frame must not be used anymore once it has been captured or released, since
+    it can be handed out again by the next `acquire`.
+
+    Example:
+        ```python
+        pool = rtc.AudioFramePool()
+        while True:
+            frame = pool.acquire(48000, 1, 480)
+            fill(frame.data)
+            await source.capture_frame(frame)  # returns the frame to the pool
+        ```
+
+    Args:
+        max_frames_per_format (int): Maximum number of free frames kept for each
+            (sample_rate, num_channels, samples_per_channel) format.
+    """
+
+    def __init__(self, max_frames_per_format: int = 16) -> None:
+        self._max_frames = max_frames_per_format
+        self._lock = threading.Lock()
+        self._free: Dict[_FrameFormat, List[AudioFrame]] = {}
+        self._stats = AudioFramePoolStats()
+
+    def acquire(
+        self,
+        sample_rate: int,
+        num_channels: int,
+        samples_per_channel: int,
+        zeroed: bool = False,
+    ) -> AudioFrame:
+        """Get a frame of the given format, recycled if possible.
+
+        Args:
+            sample_rate (int): The sample rate of the audio in Hz.
+            num_channels (int): The number of audio channels.
+            samples_per_channel (int): The number of samples per channel.
+            zeroed (bool): Clear the content of a recycled frame, new frames are
+                always zeroed.
+
+        Returns:
+            AudioFrame: A frame owned by the caller until it is captured or released.
+        """
+        key = (sample_rate, num_channels, samples_per_channel)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                frame = free.pop()
+                self._stats.hits += 1
+                self._stats.pooled -= 1
+            else:
+                frame = None
+                self._stats.misses += 1
+
+        if frame is None:
+            frame = AudioFrame.create(sample_rate, num_channels, samples_per_channel)
+        elif zeroed:
+            data = frame._data
+            ctypes.memset((ctypes.c_char * len(data)).from_buffer(data), 0, len(data))
+
+        frame._pool = self
+        return frame
+
+    def release(self, frame: AudioFrame) -> None:
+        """Give a frame acquired from this pool back, it must not be used afterwards"""
+        if frame._pool is not self:
+            return  # not acquired from this pool, or already released
+        frame._pool = None
+
+        key = (frame.sample_rate, frame.num_channels, frame.samples_per_channel)
+        with self._lock:
+            self._stats.returned += 1
+            free = self._free.setdefault(key, [])
+            if len(free) >= self._max_frames:
+                self._stats.discarded += 1
+                return
+            free.append(frame)
+            self._stats.pooled += 1
+
+    def clear(self) -> None:
+        """Drop all the free frames"""
+        with self._lock:
+            self._free.clear()
+            self._stats.pooled = 0
+
+    def stats(self) -> AudioFramePoolStats:
+        with self._lock:
+            return AudioFramePoolStats(**vars(self._stats))
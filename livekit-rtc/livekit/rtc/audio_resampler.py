@@ -6,7 +6,7 @@ from enum import Enum, unique
 from ._proto import audio_frame_pb2 as proto_audio_frame
 from ._ffi_client import FfiClient, FfiHandle
 from ._proto import ffi_pb2 as proto_ffi
-from ._utils import get_address
+from ._marshal import buffer_address
 from .audio_frame import AudioFrame
 
 
@@ -73,7 +73,9 @@ class AudioResampler:
         if resp.new_sox_resampler.error:
             raise Exception(resp.new_sox_resampler.error)
 
-        self._ffi_handle = FfiHandle(resp.new_sox_resampler.resampler.handle.id)
+        self._ffi_handle = FfiHandle(
+            resp.new_sox_resampler.resampler.handle.id, "sox_resampler"
+        )
 
     def push(self, data: bytearray | AudioFrame) -> list[AudioFrame]:
         """
@@ -97,10 +99,11 @@ class AudioResampler:
 
         req = proto_ffi.FfiRequest()
         req.push_sox_resampler.resampler_handle = self._ffi_handle.handle
-        req.push_sox_resampler.data_ptr = get_address(memoryview(bdata))
+        req.push_sox_resampler.data_ptr, keepalive = buffer_address(bdata)
         req.push_sox_resampler.size = len(bdata)
 
         resp = FfiClient.instance.request(req)
+        del keepalive
 
         if resp.push_sox_resampler.error:
             raise Exception(resp.push_sox_resampler.error)
@@ -113,7 +116,7 @@ class AudioResampler:
         )
         output_data = bytearray(cdata)
         return [
-            AudioFrame(
+            AudioFrame._wrap(
                 output_data,
                 self._output_rate,
                 self._num_channels,
@@ -149,7 +152,7 @@ class AudioResampler:
         )
         output_data = bytearray(cdata)
         return [
-            AudioFrame(
+            AudioFrame._wrap(
                 output_data,
                 self._output_rate,
                 self._num_channels,
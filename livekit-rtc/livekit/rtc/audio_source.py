@@ -65,7 +65,7 @@ class AudioSource:
 
         resp = FfiClient.instance.request(req)
         self._info = resp.new_audio_source.source
-        self._ffi_handle = FfiHandle(self._info.handle.id)
+        self._ffi_handle = FfiHandle(self._info.handle.id, "audio_source")
 
         self._last_capture = 0.0
         self._q_size = 0.0
@@ -112,7 +112,8 @@ class AudioSource:
         has been pushed.
 
         Args:
-            frame (AudioFrame): The audio frame to capture and queue.
+            frame (AudioFrame): The audio frame to capture and queue. A frame acquired
+                from an `AudioFramePool` is given back to it once captured.
 
         Raises:
             Exception: If there is an error during frame capture.
@@ -138,15 +139,11 @@ class AudioSource:
         req.capture_audio_frame.source_handle = self._ffi_handle.handle
         req.capture_audio_frame.buffer.CopyFrom(frame._proto_info())
 
-        queue = FfiClient.instance.queue.subscribe(loop=self._loop)
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.capture_audio_frame.async_id
-                == resp.capture_audio_frame.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req, self._loop)
+
+        # the native source is done with the frame, it can be recycled
+        if frame._pool is not None:
+            frame._pool.release(frame)
 
         if cb.capture_audio_frame.error:
             raise Exception(cb.capture_audio_frame.error)
@@ -54,6 +54,7 @@ class AudioStream:
         capacity: int = 0,
         sample_rate: int = 48000,
         num_channels: int = 1,
+        zero_copy: bool = False,
         **kwargs,
     ) -> None:
         """Initialize an `AudioStream` instance.
@@ -67,6 +68,10 @@ class AudioStream:
             sample_rate (int, optional): The sample rate for the audio stream in Hz.
                 Defaults to 48000.
             num_channels (int, optional): The number of audio channels. Defaults to 1.
+            zero_copy (bool, optional): Yield frames pointing to the native buffers
+                instead of copies. The native memory is held until the frame is
+                released or garbage collected, use `AudioFrame.copy()` to keep the
+                data longer than that. Defaults to False.
         Example:
             ```python
             audio_stream = AudioStream(
@@ -85,6 +90,7 @@ class AudioStream:
         self._track: Track | None = track
         self._sample_rate = sample_rate
         self._num_channels = num_channels
+        self._zero_copy = zero_copy
         self._loop = loop or asyncio.get_event_loop()
         self._ffi_queue = FfiClient.instance.queue.subscribe(self._loop)
         self._queue: RingQueue[AudioFrameEvent | None] = RingQueue(capacity)
@@ -99,7 +105,8 @@ class AudioStream:
             )
         else:
             stream = self._create_owned_stream()
-        self._ffi_handle = FfiHandle(stream.handle.id)
+        self._ffi_handle = FfiHandle(stream.handle.id, "audio_stream")
+        FfiClient.instance.queue.route(self._ffi_queue, self._ffi_handle.handle)
         self._info = stream.info
 
     @classmethod
@@ -112,6 +119,7 @@ class AudioStream:
         capacity: int = 0,
         sample_rate: int = 48000,
         num_channels: int = 1,
+        zero_copy: bool = False,
     ) -> AudioStream:
         """Create an `AudioStream` from a participant's audio track.
 
@@ -122,6 +130,8 @@ class AudioStream:
             capacity (int, optional): The capacity of the internal frame queue. Defaults to 0 (unbounded).
             sample_rate (int, optional): The sample rate for the audio stream in Hz. Defaults to 48000.
             num_channels (int, optional): The number of audio channels. Defaults to 1.
+            zero_copy (bool, optional): Yield frames pointing to the native buffers,
+                see `AudioStream`. Defaults to False.
 
         Returns:
             AudioStream: An instance of `AudioStream` that can be used to receive audio frames.
@@ -144,6 +154,7 @@ class AudioStream:
             track=None,  # type: ignore
             sample_rate=sample_rate,
             num_channels=num_channels,
+            zero_copy=zero_copy,
         )
 
     @classmethod
@@ -155,6 +166,7 @@ class AudioStream:
         capacity: int = 0,
         sample_rate: int = 48000,
         num_channels: int = 1,
+        zero_copy: bool = False,
     ) -> AudioStream:
         """Create an `AudioStream` from an existing audio track.
 
@@ -164,6 +176,8 @@ class AudioStream:
             capacity (int, optional): The capacity of the internal frame queue. Defaults to 0 (unbounded).
             sample_rate (int, optional): The sample rate for the audio stream in Hz. Defaults to 48000.
             num_channels (int, optional): The number of audio channels. Defaults to 1.
+            zero_copy (bool, optional): Yield frames pointing to the native buffers,
+                see `AudioStream`. Defaults to False.
 
         Returns:
             AudioStream: An instance of `AudioStream` that can be used to receive audio frames.
@@ -183,6 +197,7 @@ class AudioStream:
             capacity=capacity,
             sample_rate=sample_rate,
             num_channels=num_channels,
+            zero_copy=zero_copy,
         )
 
     def __del__(self) -> None:
@@ -223,7 +238,9 @@ class AudioStream:
 
             if audio_event.HasField("frame_received"):
                 owned_buffer_info = audio_event.frame_received.frame
-                frame = AudioFrame._from_owned_info(owned_buffer_info)
+                frame = AudioFrame._from_owned_info(
+                    owned_buffer_info, borrow=self._zero_copy
+                )
                 event = AudioFrameEvent(frame)
                 self._queue.put(event)
             elif audio_event.HasField("eos"):
@@ -1,18 +1,159 @@
 import inspect
 import asyncio
-from typing import Callable, Dict, Set, Optional, Generic, TypeVar
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Dict, Optional, Generic, TypeVar
 
 from .log import logger
 
 T_contra = TypeVar("T_contra", contravariant=True)
 
 
+def _positional_arity(callback: Callable) -> Optional[int]:
+    """Number of positional arguments `callback` accepts, None if it takes *args"""
+    try:
+        params = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return None  # no signature available, pass every argument
+
+    if any(p.kind == p.VAR_POSITIONAL for p in params):
+        return None
+
+    return sum(
+        1 for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    )
+
+
+@dataclass
+class EventStats:
+    queue_depth: int = 0
+    """Async handlers waiting for a free slot"""
+    max_queue_depth: int = 0
+    """Largest number of async handlers waiting at once"""
+    running: int = 0
+    """Async handlers currently running"""
+    completed: int = 0
+    """Async handlers that returned or raised"""
+    failed: int = 0
+    """Async handlers that raised an exception"""
+    dropped: int = 0
+    """Async handlers discarded because the queue was full"""
+    total_wait: float = 0.0
+    """Cumulated time the handlers spent in the queue, in seconds"""
+    total_latency: float = 0.0
+    """Cumulated run time of the handlers, in seconds"""
+    max_latency: float = 0.0
+    """Slowest handler run time, in seconds"""
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.completed if self.completed else 0.0
+
+
+class _AsyncDispatcher:
+    """Runs the async handlers of an event, at most `concurrency` at a time.
+
+    Handlers above the limit wait in a FIFO queue, which holds up to `queue_size`
+    handlers (0 for unbounded).
+    """
+
+    def __init__(self, concurrency: int, queue_size: int) -> None:
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.stats = EventStats()
+        self._queue: deque[tuple[Coroutine[Any, Any, Any], float]] = deque()
+        # the worker tasks, with the first handler they run
+        self._workers: Dict[asyncio.Task, Coroutine[Any, Any, Any]] = {}
+        # slots running a handler, or about to
+        self._busy = 0
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> bool:
+        stats = self.stats
+        if self._busy < self.concurrency:
+            # a free slot, the handler doesn't wait and doesn't count as queued
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                coro.close()
+                raise
+            self._busy += 1
+            task = loop.create_task(self._run(coro, time.monotonic()))
+            self._workers[task] = coro
+            task.add_done_callback(lambda t: self._workers.pop(t, None))
+            return True
+
+        if self.queue_size and len(self._queue) >= self.queue_size:
+            coro.close()
+            stats.dropped += 1
+            return False
+
+        self._queue.append((coro, time.monotonic()))
+        stats.queue_depth = len(self._queue)
+        stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+        return True
+
+    async def _run(self, coro: Coroutine[Any, Any, Any], queued_at: float) -> None:
+        stats = self.stats
+        try:
+            while True:
+                stats.running += 1
+                start = time.monotonic()
+                stats.total_wait += start - queued_at
+                try:
+                    await coro
+                except Exception:
+                    stats.failed += 1
+                    logger.exception("error running async event handler")
+                finally:
+                    latency = time.monotonic() - start
+                    stats.running -= 1
+                    stats.completed += 1
+                    stats.total_latency += latency
+                    stats.max_latency = max(stats.max_latency, latency)
+
+                # the slot stays busy until the queue is drained
+                if not self._queue:
+                    break
+                coro, queued_at = self._queue.popleft()
+                stats.queue_depth = len(self._queue)
+        finally:
+            self._busy -= 1
+
+    async def aclose(self) -> None:
+        """Cancel the running handlers and discard the queued ones"""
+        while self._queue:
+            coro, _ = self._queue.popleft()
+            coro.close()
+        self.stats.queue_depth = 0
+
+        workers = dict(self._workers)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # the handlers of the workers cancelled before they started never ran
+        for coro in workers.values():
+            coro.close()
+        self._busy = 0
+
+
 class EventEmitter(Generic[T_contra]):
-    def __init__(self) -> None:
+    def __init__(self, async_concurrency: int = 16, async_queue_size: int = 0) -> None:
         """
         Initialize a new instance of EventEmitter.
+
+        Args:
+            async_concurrency (int): Maximum number of async handlers of an event
+                running at the same time.
+            async_queue_size (int): Maximum number of async handlers of an event
+                waiting to run, 0 for unbounded. Handlers emitted while the queue is
+                full are dropped.
         """
-        self._events: Dict[T_contra, Set[Callable]] = dict()
+        # callbacks of each event, with the number of arguments to pass them
+        self._events: Dict[T_contra, Dict[Callable, Optional[int]]] = dict()
+        self._async_concurrency = async_concurrency
+        self._async_queue_size = async_queue_size
+        self._dispatchers: Dict[T_contra, _AsyncDispatcher] = dict()
 
     def emit(self, event: T_contra, *args) -> None:
         """
@@ -36,31 +177,56 @@ class EventEmitter(Generic[T_contra]):
             ```
         """
         if event in self._events:
-            callables = self._events[event].copy()
-            for callback in callables:
+            callables = list(self._events[event].items())
+            for callback, arity in callables:
                 try:
-                    sig = inspect.signature(callback)
-                    params = sig.parameters.values()
-
-                    has_varargs = any(p.kind == p.VAR_POSITIONAL for p in params)
-                    if has_varargs:
-                        callback(*args)
+                    if arity is None or arity >= len(args):
+                        res = callback(*args)
                     else:
-                        positional_params = [
-                            p
-                            for p in params
-                            if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
-                        ]
-                        num_params = len(positional_params)
-                        num_args = min(len(args), num_params)
-                        callback_args = args[:num_args]
-
-                        callback(*callback_args)
+                        res = callback(*args[:arity])
+
+                    if asyncio.iscoroutine(res):
+                        self._dispatcher(event).submit(res)
                 except TypeError:
                     raise
                 except Exception:
                     logger.exception(f"failed to emit event {event}")
 
+    async def _cancel_async_handlers(self) -> None:
+        """Cancel the async handlers running or waiting to run, of every event"""
+        await asyncio.gather(*(d.aclose() for d in self._dispatchers.values()))
+
+    def _dispatcher(self, event: T_contra) -> _AsyncDispatcher:
+        dispatcher = self._dispatchers.get(event)
+        if dispatcher is None:
+            dispatcher = self._dispatchers[event] = _AsyncDispatcher(
+                self._async_concurrency, self._async_queue_size
+            )
+        return dispatcher
+
+    def set_async_limits(
+        self, event: T_contra, concurrency: int, queue_size: int = 0
+    ) -> None:
+        """
+        Configure how the async handlers of an event are scheduled.
+
+        Args:
+            event (T): The event to configure.
+            concurrency (int): Maximum number of handlers running at the same time.
+            queue_size (int): Maximum number of handlers waiting to run, 0 for unbounded.
+        """
+        dispatcher = self._dispatcher(event)
+        dispatcher.concurrency = concurrency
+        dispatcher.queue_size = queue_size
+
+    def event_stats(self) -> Dict[T_contra, EventStats]:
+        """
+        Queue depth and latency of the async handlers, for each event that ran some.
+        """
+        return {
+            event: EventStats(**vars(d.stats)) for event, d in self._dispatchers.items()
+        }
+
     def once(self, event: T_contra, callback: Optional[Callable] = None) -> Callable:
         """
         Register a callback to be called only once when the event is emitted.
@@ -106,9 +272,11 @@ class EventEmitter(Generic[T_contra]):
 
             def once_callback(*args, **kwargs):
                 self.off(event, once_callback)
-                callback(*args, **kwargs)
+                return callback(*args, **kwargs)
 
-            return self.on(event, once_callback)
+            # emit passes the arguments expected by the wrapped callback
+            self._add(event, once_callback, _positional_arity(callback))
+            return once_callback
         else:
 
             def decorator(callback: Callable) -> Callable:
@@ -124,6 +292,10 @@ class EventEmitter(Generic[T_contra]):
         If a callback is provided, it registers the callback directly.
         If no callback is provided, it returns a decorator for use with function definitions.
 
+        Async callbacks are scheduled on the running event loop, with at most
+        `async_concurrency` of them running at the same time for each event (see
+        `set_async_limits`).
+
         Args:
             event (T): The event to listen for.
             callback (Callable, optional): The callback to register. Defaults to None.
@@ -157,14 +329,7 @@ class EventEmitter(Generic[T_contra]):
             ```
         """
         if callback is not None:
-            if asyncio.iscoroutinefunction(callback):
-                raise ValueError(
-                    "Cannot register an async callback with `.on()`. Use `asyncio.create_task` within your synchronous callback instead."
-                )
-
-            if event not in self._events:
-                self._events[event] = set()
-            self._events[event].add(callback)
+            self._add(event, callback, _positional_arity(callback))
             return callback
         else:
 
@@ -174,6 +339,11 @@ class EventEmitter(Generic[T_contra]):
 
             return decorator
 
+    def _add(self, event: T_contra, callback: Callable, arity: Optional[int]) -> None:
+        if event not in self._events:
+            self._events[event] = dict()
+        self._events[event][callback] = arity
+
     def off(self, event: T_contra, callback: Callable) -> None:
         """
         Unregister a callback from an event.
@@ -197,4 +367,4 @@ class EventEmitter(Generic[T_contra]):
             ```
         """
         if event in self._events:
-            self._events[event].remove(callback)
+            del self._events[event][callback]
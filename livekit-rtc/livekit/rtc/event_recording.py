@@ -0,0 +1,345 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Records the FfiEvent stream to a file and replays it without a server.
+
+A recording starts with a magic header, followed by one record per event:
+
+    <timestamp: f64> <event length: u32> <buffer length: u32> <event> <buffer>
+
+The timestamp is the number of seconds since the start of the recording, and the
+buffer holds the audio samples or the video pixels the event points to, which
+only live in the memory of the recorded process.
+"""
+
+import ctypes
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Set
+
+from ._ffi_client import (
+    _HANDLE_FIELDS,
+    FfiClient,
+    _local_buffers,
+    _parse_event,
+    _peek_event,
+    _register_local_buffer,
+    dispatch_event,
+)
+from ._proto import ffi_pb2 as proto_ffi
+from .log import logger
+from .video_frame import _get_plane_length
+
+_MAGIC = b"LKFFIEV1"
+_RECORD = struct.Struct("<dII")
+
+# the events pointing to a native buffer
+_FRAME_EVENTS = ("audio_stream_event", "video_stream_event")
+
+
+@dataclass
+class RecordedEvent:
+    timestamp: float
+    """Seconds since the start of the recording"""
+    data: bytes
+    """The serialized FfiEvent"""
+    buffer: bytes
+    """Content of the audio or video buffer referenced by the event, if any"""
+
+
+class EventRecorder:
+    """Records the FfiEvent stream received by the FfiClient to a file.
+
+    The events are written from the FFI thread as they arrive, together with the
+    content of the audio and video frames they carry. Use `EventReplayer` to feed
+    the recording back to the SDK.
+
+    Example:
+        ```python
+        with EventRecorder("session.lkev"):
+            await room.connect(url, token)
+            ...
+        ```
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._start = 0.0
+        self._events = 0
+        self._bytes = 0
+
+    @property
+    def events(self) -> int:
+        """Number of events recorded so far"""
+        return self._events
+
+    @property
+    def bytes_written(self) -> int:
+        return self._bytes
+
+    def start(self) -> None:
+        """Start recording the events of the FfiClient"""
+        with self._lock:
+            if self._file is not None:
+                return
+            self._file = open(self._path, "wb")
+            self._file.write(_MAGIC)
+            self._bytes = len(_MAGIC)
+            self._start = time.monotonic()
+
+        FfiClient.instance._event_tap = self.record
+
+    def stop(self) -> None:
+        """Stop recording and close the file"""
+        client = FfiClient._instance
+        if client is not None and client._event_tap == self.record:
+            client._event_tap = None
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "EventRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def record(self, event_data: bytes) -> None:
+        """Append a serialized FfiEvent to the recording"""
+        buffer = b""
+        which, _ = _peek_event(event_data)
+        if which in _FRAME_EVENTS:
+            buffer = _frame_buffer(_parse_event(event_data))
+
+        with self._lock:
+            if self._file is None:
+                return
+            header = _RECORD.pack(
+                time.monotonic() - self._start, len(event_data), len(buffer)
+            )
+            self._file.write(header)
+            self._file.write(event_data)
+            self._file.write(buffer)
+            self._events += 1
+            self._bytes += len(header) + len(event_data) + len(buffer)
+
+
+def read_events(path: str) -> Iterator[RecordedEvent]:
+    """Read the events of a recording, in order"""
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not an FfiEvent recording")
+
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                if header:
+                    logger.warning("truncated event recording: %s", path)
+                return
+
+            timestamp, event_len, buffer_len = _RECORD.unpack(header)
+            data = f.read(event_len)
+            buffer = f.read(buffer_len)
+            if len(data) < event_len or len(buffer) < buffer_len:
+                logger.warning("truncated event recording: %s", path)
+                return
+            yield RecordedEvent(timestamp, data, buffer)
+
+
+class EventReplayer:
+    """Feeds a recording made by `EventRecorder` to the FfiClient dispatch path.
+
+    The events reach the same queues as live events, so rooms and streams consume
+    them unchanged. The frame buffers are restored in memory owned by the replayer,
+    under new frame handles: like native buffers, each one is freed when the frame
+    built from it releases its handle.
+
+    The buffers of frames nobody consumes are never released that way, so at most
+    `max_buffers` buffers are handed out at a time: past that, the frame events are
+    dropped until some of the buffers are released. A buffer is never freed while an
+    event points to it, even after the replayer is closed.
+
+    Args:
+        path (str): The recording to replay.
+        speed (Optional[float]): Playback speed relative to the recording, e.g. 2.0
+            replays twice as fast. None replays the events as fast as possible.
+        handle_map (Optional[Dict[int, int]]): Replace the recorded room, stream
+            and participant handles with the ones of the local consumers.
+        max_buffers (int): Maximum number of frame buffers waiting to be released.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = 1.0,
+        handle_map: Optional[Dict[int, int]] = None,
+        max_buffers: int = 1024,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+
+        self._path = path
+        self._speed = speed
+        self._handle_map = handle_map or {}
+        self._max_buffers = max_buffers
+        # handles of the frame buffers handed out, some may be released already
+        self._buffer_handles: Set[int] = set()
+        self._dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def buffered(self) -> int:
+        """Number of frame buffers not released yet"""
+        return sum(1 for h in self._buffer_handles if h in _local_buffers)
+
+    @property
+    def dropped(self) -> int:
+        """Number of frame events dropped, see `max_buffers`"""
+        return self._dropped
+
+    def replay(self, dispatch: Optional[Callable[[bytes], None]] = None) -> int:
+        """Replay the recording on the calling thread.
+
+        Returns:
+            int: The number of events dispatched, without the dropped ones.
+
+        Args:
+            dispatch (Optional[Callable[[bytes], None]]): Receives each serialized
+                event, defaults to the FfiClient dispatch path.
+        """
+        dispatch = dispatch or dispatch_event
+        start = time.monotonic()
+        count = 0
+        for recorded in read_events(self._path):
+            if self._closed:
+                break
+
+            if self._speed is not None:
+                delay = start + recorded.timestamp / self._speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            data = self._restore(recorded)
+            if data is None:
+                continue
+            dispatch(data)
+            count += 1
+        return count
+
+    def start(self, dispatch: Optional[Callable[[bytes], None]] = None) -> None:
+        """Replay the recording on a background thread, like the native FFI thread"""
+        self._thread = threading.Thread(
+            target=self.replay, args=(dispatch,), name="livekit_ffi_replay", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for a replay started with `start` to finish"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def close(self) -> None:
+        """Stop the replay.
+
+        The frame buffers handed out stay alive until their frames release them.
+        """
+        self._closed = True
+        self.join()
+
+    def _restore(self, recorded: RecordedEvent) -> Optional[bytes]:
+        which, key = _peek_event(recorded.data)
+        remap = key in self._handle_map and which in _HANDLE_FIELDS
+        if not recorded.buffer and not remap:
+            return recorded.data
+
+        if recorded.buffer and not self._reserve_buffer():
+            return None
+
+        event = _parse_event(recorded.data)
+        if remap:
+            message = getattr(event, which)  # type: ignore
+            setattr(message, _HANDLE_FIELDS[which], self._handle_map[key])  # type: ignore
+
+        if recorded.buffer:
+            cdata = (ctypes.c_uint8 * len(recorded.buffer)).from_buffer_copy(
+                recorded.buffer
+            )
+            handle = _register_local_buffer(cdata)
+            self._buffer_handles.add(handle)
+            _set_frame_buffer(event, ctypes.addressof(cdata), handle)
+
+        return event.SerializePartialToString()
+
+    def _reserve_buffer(self) -> bool:
+        """Check whether another frame buffer can be handed out"""
+        handles = self._buffer_handles
+        if len(handles) < self._max_buffers:
+            return True
+
+        handles.intersection_update(_local_buffers)
+        if len(handles) < self._max_buffers:
+            return True
+
+        if not self._dropped:
+            logger.warning(
+                "replayed frames aren't consumed, dropping frame events (max_buffers=%d)",
+                self._max_buffers,
+            )
+        self._dropped += 1
+        return False
+
+
+def _frame_buffer(event: proto_ffi.FfiEvent) -> bytes:
+    """Copy the content of the buffer a frame event points to"""
+    if event.HasField("audio_stream_event"):
+        if not event.audio_stream_event.HasField("frame_received"):
+            return b""
+        info = event.audio_stream_event.frame_received.frame.info
+        size = (
+            info.num_channels * info.samples_per_channel * ctypes.sizeof(ctypes.c_int16)
+        )
+    elif event.HasField("video_stream_event"):
+        if not event.video_stream_event.HasField("frame_received"):
+            return b""
+        info = event.video_stream_event.frame_received.buffer.info  # type: ignore
+        size = _get_plane_length(info.type, info.width, info.height)  # type: ignore
+    else:
+        return b""
+
+    if size == 0 or info.data_ptr == 0:
+        return b""
+    return ctypes.string_at(info.data_ptr, size)
+
+
+def _set_frame_buffer(event: proto_ffi.FfiEvent, address: int, handle: int) -> None:
+    """Point a frame event to a buffer of this process, owned by `handle`"""
+    if event.HasField("audio_stream_event"):
+        owned = event.audio_stream_event.frame_received.frame
+        owned.info.data_ptr = address
+    else:
+        owned = event.video_stream_event.frame_received.buffer  # type: ignore
+        base = owned.info.data_ptr
+        for component in owned.info.components:  # type: ignore
+            component.data_ptr = address + (component.data_ptr - base)
+        owned.info.data_ptr = address
+
+    owned.handle.id = handle
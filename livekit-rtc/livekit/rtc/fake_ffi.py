@@ -0,0 +1,918 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A pure-Python FFI backend simulating a LiveKit server, for tests and benchmarks."""
+
+import ctypes
+import heapq
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ._ffi_client import INVALID_HANDLE, FfiBackend
+from ._proto import audio_frame_pb2 as proto_audio
+from ._proto import e2ee_pb2 as proto_e2ee
+from ._proto import ffi_pb2 as proto_ffi
+from ._proto import participant_pb2 as proto_participant
+from ._proto import room_pb2 as proto_room
+from ._proto import track_pb2 as proto_track
+from ._proto import video_frame_pb2 as proto_video
+from .log import logger
+from .video_frame import _get_plane_infos, _get_plane_length
+
+
+@dataclass
+class FakeParticipant:
+    """A remote participant simulated by `FakeFfiBackend`"""
+
+    identity: str
+    audio_tracks: int = 1
+    """Number of microphone tracks published by the participant"""
+    video_tracks: int = 0
+    """Number of camera tracks published by the participant"""
+
+
+@dataclass
+class FakeFfiStats:
+    requests: Dict[str, int] = field(default_factory=dict)
+    """Number of requests received, by request type"""
+    audio_frames_sent: int = 0
+    video_frames_sent: int = 0
+    audio_frames_captured: int = 0
+    video_frames_captured: int = 0
+    data_bytes_published: int = 0
+    live_handles: int = 0
+
+
+class _Handle:
+    __slots__ = ("id",)
+
+    def __init__(self, id: int) -> None:
+        self.id = id
+
+
+class _Room(_Handle):
+    __slots__ = ("local", "participants", "closed")
+
+    def __init__(self, id: int, local: "_Participant") -> None:
+        super().__init__(id)
+        self.local = local
+        self.participants: List[_Participant] = []
+        self.closed = False
+
+
+class _Participant(_Handle):
+    __slots__ = ("info", "room", "publications")
+
+    def __init__(self, id: int, info: proto_participant.ParticipantInfo) -> None:
+        super().__init__(id)
+        self.info = info
+        self.room: Optional[_Room] = None
+        self.publications: List[_Publication] = []
+
+
+class _Publication(_Handle):
+    __slots__ = ("info", "participant", "track")
+
+    def __init__(
+        self,
+        id: int,
+        info: proto_track.TrackPublicationInfo,
+        participant: _Participant,
+    ) -> None:
+        super().__init__(id)
+        self.info = info
+        self.participant = participant
+        self.track: Optional[_Track] = None
+
+
+class _Track(_Handle):
+    __slots__ = ("info", "publication")
+
+    def __init__(
+        self,
+        id: int,
+        info: proto_track.TrackInfo,
+        publication: Optional[_Publication] = None,
+    ) -> None:
+        super().__init__(id)
+        self.info = info
+        self.publication = publication
+
+
+class _Stream(_Handle):
+    __slots__ = ("publication", "event_field", "closed")
+
+    def __init__(self, id: int, publication: _Publication, event_field: str) -> None:
+        super().__init__(id)
+        self.publication = publication
+        self.event_field = event_field
+        self.closed = False
+
+
+class FakeFfiBackend(FfiBackend):
+    """Simulates rooms, remote participants and media streams without a server.
+
+    Connecting to any URL joins a room with the configured remote participants. Their
+    tracks are subscribed like on a real server, and the audio and video streams
+    created from them receive frames at the configured rates, from a background
+    thread standing in for the native FFI thread. Captured frames and published data
+    are accepted and counted.
+
+    Requests that aren't simulated raise a RuntimeError naming the request.
+
+    Example:
+        ```python
+        backend = FakeFfiBackend([FakeParticipant("alice"), FakeParticipant("bob")])
+        backend.install()
+
+        room = rtc.Room()
+        await room.connect("ws://fake", "token")
+        ```
+
+    Args:
+        participants (Sequence[FakeParticipant]): Remote participants of every room.
+        sample_rate (int): Sample rate of the remote audio tracks.
+        num_channels (int): Number of channels of the remote audio tracks.
+        audio_frame_ms (int): Duration of the remote audio frames.
+        video_width (int): Width of the remote video frames.
+        video_height (int): Height of the remote video frames.
+        video_fps (float): Frame rate of the remote video tracks.
+        speed (float): Emit the frames `speed` times faster than real time.
+        active_speakers_interval (Optional[float]): Rotate the active speaker among
+            the remote participants at this interval, in seconds.
+    """
+
+    def __init__(
+        self,
+        participants: Sequence[FakeParticipant] = (),
+        *,
+        sample_rate: int = 48000,
+        num_channels: int = 1,
+        audio_frame_ms: int = 10,
+        video_width: int = 320,
+        video_height: int = 240,
+        video_fps: float = 30.0,
+        speed: float = 1.0,
+        active_speakers_interval: Optional[float] = None,
+    ) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+
+        self._participants = list(participants)
+        self._sample_rate = sample_rate
+        self._num_channels = num_channels
+        self._samples_per_channel = sample_rate * audio_frame_ms // 1000
+        self._audio_interval = audio_frame_ms / 1000 / speed
+        self._video_width = video_width
+        self._video_height = video_height
+        self._video_interval = 1 / video_fps / speed
+        self._active_speakers_interval = active_speakers_interval
+
+        # the frames of every stream share the same read-only content
+        num_samples = self._samples_per_channel * num_channels
+        self._audio_buffer = (ctypes.c_int16 * num_samples)(
+            *(
+                int(
+                    3000
+                    * math.sin(2 * math.pi * 440 * (i // num_channels) / sample_rate)
+                )
+                for i in range(num_samples)
+            )
+        )
+        video_size = _get_plane_length(
+            proto_video.VideoBufferType.I420, video_width, video_height
+        )
+        self._video_buffer = (ctypes.c_uint8 * video_size)()
+
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+        self._handles: Dict[int, Any] = {}
+        # like the native FFI, handles and async ids share the same sequence, so that
+        # they can be used as routing keys together
+        self._next_id = itertools.count(1)
+        self._next_sid = itertools.count(1)
+        self._tasks: List[
+            tuple[float, int, Callable[[], List[proto_ffi.FfiEvent]]]
+        ] = []
+        self._task_seq = itertools.count()
+        self._stats = FakeFfiStats()
+        self._on_event: Optional[Callable[[bytes], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def stats(self) -> FakeFfiStats:
+        """Counters of the simulated traffic"""
+        with self._lock:
+            return FakeFfiStats(
+                requests=dict(self._stats.requests),
+                audio_frames_sent=self._stats.audio_frames_sent,
+                video_frames_sent=self._stats.video_frames_sent,
+                audio_frames_captured=self._stats.audio_frames_captured,
+                video_frames_captured=self._stats.video_frames_captured,
+                data_bytes_published=self._stats.data_bytes_published,
+                live_handles=len(self._handles),
+            )
+
+    def set_participant_attributes(
+        self, identity: str, attributes: Dict[str, str]
+    ) -> None:
+        """Simulate a remote participant changing its attributes, in every open room.
+
+        Args:
+            identity (str): Identity of the remote participant.
+            attributes (Dict[str, str]): Attributes to set, merged into the current ones.
+        """
+        with self._lock:
+            for participant in self._remote_participants(identity):
+                participant.info.attributes.update(attributes)
+                event = _room_event(participant.room)
+                changed = event.room_event.participant_attributes_changed
+                changed.participant_identity = identity
+                changed.attributes.extend(
+                    proto_room.AttributesEntry(key=key, value=value)
+                    for key, value in participant.info.attributes.items()
+                )
+                changed.changed_attributes.extend(
+                    proto_room.AttributesEntry(key=key, value=value)
+                    for key, value in attributes.items()
+                )
+                self._emit(event)
+
+    def set_connection_quality(
+        self, identity: str, quality: proto_room.ConnectionQuality.ValueType
+    ) -> None:
+        """Simulate a change of the connection quality of a remote participant"""
+        with self._lock:
+            for participant in self._remote_participants(identity):
+                event = _room_event(participant.room)
+                changed = event.room_event.connection_quality_changed
+                changed.participant_identity = identity
+                changed.quality = quality
+                self._emit(event)
+
+    def connect_participant(self, participant: FakeParticipant) -> None:
+        """Simulate a remote participant joining every open room.
+
+        The tracks of the participant are published after it joins, but they aren't
+        subscribed.
+        """
+        with self._lock:
+            for room in self._open_rooms():
+                fake = self._add_remote_participant(room, participant)
+                event = _room_event(room)
+                owned = event.room_event.participant_connected.info
+                owned.handle.id = fake.id
+                owned.info.CopyFrom(fake.info)
+                self._emit(
+                    event,
+                    *(
+                        self._track_published(publication)
+                        for publication in fake.publications
+                    ),
+                )
+
+    def disconnect_participant(self, identity: str) -> None:
+        """Simulate a remote participant leaving every open room"""
+        with self._lock:
+            for participant in self._remote_participants(identity):
+                participant.room.participants.remove(participant)  # type: ignore
+                event = _room_event(participant.room)
+                event.room_event.participant_disconnected.participant_identity = (
+                    identity
+                )
+                self._emit(event)
+
+    def publish_remote_track(
+        self,
+        identity: str,
+        kind: proto_track.TrackKind.ValueType = proto_track.TrackKind.KIND_AUDIO,
+    ) -> List[str]:
+        """Simulate a remote participant publishing a track, in every open room.
+
+        The track isn't subscribed.
+
+        Returns:
+            List[str]: The SIDs of the new publications, one per room.
+        """
+        sids = []
+        with self._lock:
+            for participant in self._remote_participants(identity):
+                publication = self._add_remote_publication(participant, kind)
+                sids.append(publication.info.sid)
+                self._emit(self._track_published(publication))
+        return sids
+
+    def unpublish_remote_track(self, identity: str, track_sid: str) -> None:
+        """Simulate a remote participant unpublishing a track"""
+        with self._lock:
+            for participant in self._remote_participants(identity):
+                for publication in participant.publications:
+                    if publication.info.sid == track_sid:
+                        participant.publications.remove(publication)
+                        event = _room_event(participant.room)
+                        unpublished = event.room_event.track_unpublished
+                        unpublished.participant_identity = identity
+                        unpublished.publication_sid = track_sid
+                        self._emit(event)
+                        break
+
+    def initialize(self, on_event: Callable[[bytes], None]) -> None:
+        self._on_event = on_event
+        self._thread = threading.Thread(
+            target=self._run, name="livekit_fake_ffi", daemon=True
+        )
+        self._thread.start()
+
+    def dispose(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def drop_handle(self, handle: int) -> bool:
+        with self._lock:
+            obj = self._handles.pop(handle, None)
+            if isinstance(obj, _Stream):
+                # like the native streams, end the stream when its handle is dropped
+                obj.closed = True
+                event = proto_ffi.FfiEvent()
+                stream_event = getattr(event, obj.event_field)
+                stream_event.stream_handle = obj.id
+                stream_event.eos.SetInParent()
+                self._emit(event)
+        return obj is not None
+
+    def request(self, data: bytes) -> tuple[int, bytes]:
+        req = proto_ffi.FfiRequest()
+        req.ParseFromString(data)
+        which = req.WhichOneof("message")
+
+        handler = getattr(self, f"_on_{which}", None)
+        if handler is None:
+            raise RuntimeError(
+                f"FakeFfiBackend doesn't simulate {which} requests, only: "
+                + ", ".join(sorted(_SIMULATED_REQUESTS))
+            )
+
+        resp = proto_ffi.FfiResponse()
+        with self._lock:
+            self._stats.requests[which] = self._stats.requests.get(which, 0) + 1  # type: ignore
+            handler(getattr(req, which), getattr(resp, which))  # type: ignore
+        return INVALID_HANDLE, resp.SerializeToString()
+
+    # scheduling
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    delay = (
+                        self._tasks[0][0] - time.monotonic() if self._tasks else None
+                    )
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._closed:
+                    return
+                _, _, task = heapq.heappop(self._tasks)
+                try:
+                    events = task()
+                except Exception:
+                    logger.exception("error running a fake FFI task")
+                    continue
+
+            # emit without holding the lock, the consumers may call back into us
+            for event in events:
+                try:
+                    self._on_event(event.SerializeToString())  # type: ignore
+                except Exception:
+                    logger.exception("error dispatching a fake FFI event")
+
+    def _schedule(
+        self, task: Callable[[], List[proto_ffi.FfiEvent]], when: float = 0.0
+    ) -> None:
+        heapq.heappush(self._tasks, (when, next(self._task_seq), task))
+        self._cond.notify()
+
+    def _emit(self, *events: proto_ffi.FfiEvent) -> None:
+        """Emit the events from the backend thread, as soon as possible and in order"""
+        events_list = list(events)
+        self._schedule(lambda: events_list)
+
+    def _register(self, obj: Any) -> Any:
+        self._handles[obj.id] = obj
+        return obj
+
+    def _new_handle(self) -> int:
+        return next(self._next_id)
+
+    def _async_id(self) -> int:
+        return next(self._next_id)
+
+    def _sid(self, prefix: str) -> str:
+        return f"{prefix}_fake{next(self._next_sid)}"
+
+    def _open_rooms(self) -> List[_Room]:
+        return [
+            room
+            for room in self._handles.values()
+            if isinstance(room, _Room) and not room.closed
+        ]
+
+    def _remote_participants(self, identity: str) -> List[_Participant]:
+        return [
+            participant
+            for room in self._open_rooms()
+            for participant in room.participants
+            if participant.info.identity == identity
+        ]
+
+    def _track_published(self, publication: _Publication) -> proto_ffi.FfiEvent:
+        event = _room_event(publication.participant.room)
+        published = event.room_event.track_published
+        published.participant_identity = publication.participant.info.identity
+        published.publication.handle.id = publication.id
+        published.publication.info.CopyFrom(publication.info)
+        return event
+
+    # rooms and participants
+
+    def _on_connect(
+        self, req: proto_room.ConnectRequest, resp: proto_room.ConnectResponse
+    ) -> None:
+        resp.async_id = self._async_id()
+
+        local = self._register(
+            _Participant(
+                self._new_handle(), _participant_info("local", self._sid("PA"))
+            )
+        )
+        room = self._register(_Room(self._new_handle(), local))
+        local.room = room
+
+        cb = proto_ffi.FfiEvent()
+        cb.connect.async_id = resp.async_id
+        result = cb.connect.result
+        result.room.handle.id = room.id
+        result.room.info.sid = self._sid("RM")
+        result.room.info.name = "fake"
+        result.room.info.metadata = ""
+        result.local_participant.handle.id = local.id
+        result.local_participant.info.CopyFrom(local.info)
+
+        subscriptions: List[proto_ffi.FfiEvent] = []
+        for config in self._participants:
+            participant = self._add_remote_participant(room, config)
+
+            owned = result.participants.add()
+            owned.participant.handle.id = participant.id
+            owned.participant.info.CopyFrom(participant.info)
+
+            for publication in participant.publications:
+                owned_publication = owned.publications.add()
+                owned_publication.handle.id = publication.id
+                owned_publication.info.CopyFrom(publication.info)
+
+                if req.options.auto_subscribe:
+                    subscriptions.append(self._subscribe(publication))
+
+        self._emit(cb, *subscriptions)
+
+        if self._active_speakers_interval and room.participants:
+            speakers = itertools.cycle(room.participants)
+            self._schedule_every(
+                self._active_speakers_interval,
+                lambda: (
+                    None if room.closed else [_active_speaker(room, next(speakers))]
+                ),
+            )
+
+    def _add_remote_participant(
+        self, room: _Room, config: FakeParticipant
+    ) -> _Participant:
+        participant = self._register(
+            _Participant(
+                self._new_handle(),
+                _participant_info(config.identity, self._sid("PA")),
+            )
+        )
+        participant.room = room
+        room.participants.append(participant)
+
+        kinds = [proto_track.TrackKind.KIND_AUDIO] * config.audio_tracks + [
+            proto_track.TrackKind.KIND_VIDEO
+        ] * config.video_tracks
+        for kind in kinds:
+            self._add_remote_publication(participant, kind)
+        return participant
+
+    def _add_remote_publication(
+        self, participant: _Participant, kind: Any
+    ) -> _Publication:
+        publication = self._register(
+            _Publication(
+                self._new_handle(),
+                _publication_info(kind, self._sid("TR"), remote=True),
+                participant,
+            )
+        )
+        participant.publications.append(publication)
+        return publication
+
+    def _on_disconnect(
+        self, req: proto_room.DisconnectRequest, resp: proto_room.DisconnectResponse
+    ) -> None:
+        resp.async_id = self._async_id()
+        room = self._handles.get(req.room_handle)
+        if isinstance(room, _Room):
+            room.closed = True
+
+        eos = proto_ffi.FfiEvent()
+        eos.room_event.room_handle = req.room_handle
+        eos.room_event.eos.SetInParent()
+        cb = proto_ffi.FfiEvent()
+        cb.disconnect.async_id = resp.async_id
+        self._emit(eos, cb)
+
+    def _on_set_subscribed(
+        self,
+        req: proto_room.SetSubscribedRequest,
+        resp: proto_room.SetSubscribedResponse,
+    ) -> None:
+        publication = self._handles.get(req.publication_handle)
+        if not isinstance(publication, _Publication):
+            return
+
+        if req.subscribe and publication.track is None:
+            self._emit(self._subscribe(publication))
+        elif not req.subscribe and publication.track is not None:
+            publication.track = None
+            event = _room_event(publication.participant.room)
+            event.room_event.track_unsubscribed.participant_identity = (
+                publication.participant.info.identity
+            )
+            event.room_event.track_unsubscribed.track_sid = publication.info.sid
+            self._emit(event)
+
+    def _subscribe(self, publication: _Publication) -> proto_ffi.FfiEvent:
+        track_info = proto_track.TrackInfo(
+            sid=publication.info.sid,
+            name=publication.info.name,
+            kind=publication.info.kind,
+            stream_state=proto_track.StreamState.STATE_ACTIVE,
+            muted=False,
+            remote=True,
+        )
+        publication.track = self._register(
+            _Track(self._new_handle(), track_info, publication)
+        )
+
+        event = _room_event(publication.participant.room)
+        subscribed = event.room_event.track_subscribed
+        subscribed.participant_identity = publication.participant.info.identity
+        subscribed.track.handle.id = publication.track.id
+        subscribed.track.info.CopyFrom(track_info)
+        return event
+
+    def _on_publish_data(
+        self, req: proto_room.PublishDataRequest, resp: proto_room.PublishDataResponse
+    ) -> None:
+        resp.async_id = self._async_id()
+        self._stats.data_bytes_published += req.data_len
+
+        cb = proto_ffi.FfiEvent()
+        cb.publish_data.async_id = resp.async_id
+        self._emit(cb)
+
+    # local tracks
+
+    def _on_new_audio_source(
+        self,
+        req: proto_audio.NewAudioSourceRequest,
+        resp: proto_audio.NewAudioSourceResponse,
+    ) -> None:
+        source = self._register(_Handle(self._new_handle()))
+        resp.source.handle.id = source.id
+        resp.source.info.type = req.type
+
+    def _on_new_video_source(
+        self,
+        req: proto_video.NewVideoSourceRequest,
+        resp: proto_video.NewVideoSourceResponse,
+    ) -> None:
+        source = self._register(_Handle(self._new_handle()))
+        resp.source.handle.id = source.id
+        resp.source.info.type = req.type
+
+    def _on_capture_audio_frame(
+        self,
+        req: proto_audio.CaptureAudioFrameRequest,
+        resp: proto_audio.CaptureAudioFrameResponse,
+    ) -> None:
+        resp.async_id = self._async_id()
+        self._stats.audio_frames_captured += 1
+
+        cb = proto_ffi.FfiEvent()
+        cb.capture_audio_frame.async_id = resp.async_id
+        self._emit(cb)
+
+    def _on_clear_audio_buffer(
+        self,
+        req: proto_audio.ClearAudioBufferRequest,
+        resp: proto_audio.ClearAudioBufferResponse,
+    ) -> None:
+        pass
+
+    def _on_capture_video_frame(
+        self,
+        req: proto_video.CaptureVideoFrameRequest,
+        resp: proto_video.CaptureVideoFrameResponse,
+    ) -> None:
+        self._stats.video_frames_captured += 1
+
+    def _on_create_audio_track(
+        self,
+        req: proto_track.CreateAudioTrackRequest,
+        resp: proto_track.CreateAudioTrackResponse,
+    ) -> None:
+        self._create_track(req.name, proto_track.TrackKind.KIND_AUDIO, resp)
+
+    def _on_create_video_track(
+        self,
+        req: proto_track.CreateVideoTrackRequest,
+        resp: proto_track.CreateVideoTrackResponse,
+    ) -> None:
+        self._create_track(req.name, proto_track.TrackKind.KIND_VIDEO, resp)
+
+    def _create_track(self, name: str, kind: Any, resp: Any) -> None:
+        info = proto_track.TrackInfo(
+            sid=self._sid("TR"),
+            name=name,
+            kind=kind,
+            stream_state=proto_track.StreamState.STATE_ACTIVE,
+            muted=False,
+            remote=False,
+        )
+        track = self._register(_Track(self._new_handle(), info))
+        resp.track.handle.id = track.id
+        resp.track.info.CopyFrom(info)
+
+    def _on_publish_track(
+        self,
+        req: proto_room.PublishTrackRequest,
+        resp: proto_room.PublishTrackResponse,
+    ) -> None:
+        resp.async_id = self._async_id()
+        participant = self._handles.get(req.local_participant_handle)
+        track = self._handles.get(req.track_handle)
+
+        cb = proto_ffi.FfiEvent()
+        cb.publish_track.async_id = resp.async_id
+        if not isinstance(participant, _Participant) or not isinstance(track, _Track):
+            cb.publish_track.error = "unknown participant or track"
+            self._emit(cb)
+            return
+
+        info = _publication_info(track.info.kind, track.info.sid, remote=False)
+        info.name = track.info.name
+        info.source = req.options.source
+        publication = self._register(
+            _Publication(self._new_handle(), info, participant)
+        )
+        participant.publications.append(publication)
+        cb.publish_track.publication.handle.id = publication.id
+        cb.publish_track.publication.info.CopyFrom(info)
+
+        event = _room_event(participant.room)
+        event.room_event.local_track_published.track_sid = info.sid
+        self._emit(cb, event)
+
+    def _on_unpublish_track(
+        self,
+        req: proto_room.UnpublishTrackRequest,
+        resp: proto_room.UnpublishTrackResponse,
+    ) -> None:
+        resp.async_id = self._async_id()
+        participant = self._handles.get(req.local_participant_handle)
+
+        cb = proto_ffi.FfiEvent()
+        cb.unpublish_track.async_id = resp.async_id
+        publication = None
+        if isinstance(participant, _Participant):
+            for publication in participant.publications:
+                if publication.info.sid == req.track_sid:
+                    participant.publications.remove(publication)
+                    break
+            else:
+                publication = None
+
+        if publication is None:
+            cb.unpublish_track.error = f"track {req.track_sid} is not published"
+            self._emit(cb)
+            return
+
+        event = _room_event(participant.room)  # type: ignore
+        event.room_event.local_track_unpublished.publication_sid = req.track_sid
+        self._emit(cb, event)
+
+    # remote media
+
+    def _on_new_audio_stream(
+        self,
+        req: proto_audio.NewAudioStreamRequest,
+        resp: proto_audio.NewAudioStreamResponse,
+    ) -> None:
+        track = self._handles.get(req.track_handle)
+        self._open_audio_stream(
+            track.publication if isinstance(track, _Track) else None, req.type, resp
+        )
+
+    def _on_audio_stream_from_participant(
+        self,
+        req: proto_audio.AudioStreamFromParticipantRequest,
+        resp: proto_audio.AudioStreamFromParticipantResponse,
+    ) -> None:
+        publication = self._find_publication(
+            req.participant_handle, proto_track.TrackKind.KIND_AUDIO, req.track_source
+        )
+        self._open_audio_stream(publication, req.type, resp)
+
+    def _on_new_video_stream(
+        self,
+        req: proto_video.NewVideoStreamRequest,
+        resp: proto_video.NewVideoStreamResponse,
+    ) -> None:
+        track = self._handles.get(req.track_handle)
+        self._open_video_stream(
+            track.publication if isinstance(track, _Track) else None, req.type, resp
+        )
+
+    def _on_video_stream_from_participant(
+        self,
+        req: proto_video.VideoStreamFromParticipantRequest,
+        resp: proto_video.VideoStreamFromParticipantResponse,
+    ) -> None:
+        publication = self._find_publication(
+            req.participant_handle, proto_track.TrackKind.KIND_VIDEO, req.track_source
+        )
+        self._open_video_stream(publication, req.type, resp)
+
+    def _find_publication(
+        self, participant_handle: int, kind: Any, source: Any
+    ) -> Optional[_Publication]:
+        participant = self._handles.get(participant_handle)
+        if not isinstance(participant, _Participant):
+            return None
+        for publication in participant.publications:
+            if publication.info.kind == kind and (
+                not source or publication.info.source == source
+            ):
+                return publication
+        return None
+
+    def _open_audio_stream(
+        self, publication: Optional[_Publication], type: Any, resp: Any
+    ) -> None:
+        if publication is None:
+            raise ValueError("no remote audio track to stream from")
+
+        stream = self._register(
+            _Stream(self._new_handle(), publication, "audio_stream_event")
+        )
+        resp.stream.handle.id = stream.id
+        resp.stream.info.type = type
+        self._schedule_every(self._audio_interval, lambda: self._audio_frame(stream))
+
+    def _open_video_stream(
+        self, publication: Optional[_Publication], type: Any, resp: Any
+    ) -> None:
+        if publication is None:
+            raise ValueError("no remote video track to stream from")
+
+        stream = self._register(
+            _Stream(self._new_handle(), publication, "video_stream_event")
+        )
+        resp.stream.handle.id = stream.id
+        resp.stream.info.type = type
+        self._schedule_every(self._video_interval, lambda: self._video_frame(stream))
+
+    def _schedule_every(
+        self, interval: float, task: Callable[[], Optional[List[proto_ffi.FfiEvent]]]
+    ) -> None:
+        """Run `task` at a fixed rate until it returns None"""
+
+        def run(when: float) -> List[proto_ffi.FfiEvent]:
+            events = task()
+            if events is None:
+                return []
+            self._schedule(lambda: run(when + interval), when + interval)
+            return events
+
+        start = time.monotonic() + interval
+        self._schedule(lambda: run(start), start)
+
+    def _audio_frame(self, stream: _Stream) -> Optional[List[proto_ffi.FfiEvent]]:
+        if stream.closed or stream.publication.participant.room.closed:  # type: ignore
+            return None
+
+        frame = self._register(_Handle(self._new_handle()))
+        event = proto_ffi.FfiEvent()
+        event.audio_stream_event.stream_handle = stream.id
+        owned = event.audio_stream_event.frame_received.frame
+        owned.handle.id = frame.id
+        owned.info.data_ptr = ctypes.addressof(self._audio_buffer)
+        owned.info.num_channels = self._num_channels
+        owned.info.sample_rate = self._sample_rate
+        owned.info.samples_per_channel = self._samples_per_channel
+        self._stats.audio_frames_sent += 1
+        return [event]
+
+    def _video_frame(self, stream: _Stream) -> Optional[List[proto_ffi.FfiEvent]]:
+        if stream.closed or stream.publication.participant.room.closed:  # type: ignore
+            return None
+
+        frame = self._register(_Handle(self._new_handle()))
+        event = proto_ffi.FfiEvent()
+        event.video_stream_event.stream_handle = stream.id
+        received = event.video_stream_event.frame_received
+        received.timestamp_us = int(time.monotonic() * 1e6)
+        received.rotation = proto_video.VideoRotation.VIDEO_ROTATION_0
+        received.buffer.handle.id = frame.id
+
+        info = received.buffer.info
+        address = ctypes.addressof(self._video_buffer)
+        info.type = proto_video.VideoBufferType.I420
+        info.width = self._video_width
+        info.height = self._video_height
+        info.data_ptr = address
+        info.stride = 0
+        info.components.extend(
+            _get_plane_infos(address, info.type, self._video_width, self._video_height)
+        )
+        self._stats.video_frames_sent += 1
+        return [event]
+
+
+def _participant_info(identity: str, sid: str) -> proto_participant.ParticipantInfo:
+    return proto_participant.ParticipantInfo(
+        sid=sid,
+        name=identity,
+        identity=identity,
+        metadata="",
+        kind=proto_participant.ParticipantKind.PARTICIPANT_KIND_STANDARD,
+    )
+
+
+def _publication_info(
+    kind: Any, sid: str, remote: bool
+) -> proto_track.TrackPublicationInfo:
+    is_audio = kind == proto_track.TrackKind.KIND_AUDIO
+    return proto_track.TrackPublicationInfo(
+        sid=sid,
+        name="microphone" if is_audio else "camera",
+        kind=kind,
+        source=proto_track.TrackSource.SOURCE_MICROPHONE
+        if is_audio
+        else proto_track.TrackSource.SOURCE_CAMERA,
+        simulcasted=False,
+        width=0,
+        height=0,
+        mime_type="audio/opus" if is_audio else "video/vp8",
+        muted=False,
+        remote=remote,
+        encryption_type=proto_e2ee.EncryptionType.NONE,
+    )
+
+
+def _room_event(room: Optional[_Room]) -> proto_ffi.FfiEvent:
+    event = proto_ffi.FfiEvent()
+    event.room_event.room_handle = room.id if room is not None else INVALID_HANDLE
+    return event
+
+
+def _active_speaker(room: _Room, speaker: _Participant) -> proto_ffi.FfiEvent:
+    event = _room_event(room)
+    event.room_event.active_speakers_changed.participant_identities.append(
+        speaker.info.identity
+    )
+    return event
+
+
+# the requests with an _on_<request> handler
+_SIMULATED_REQUESTS = frozenset(
+    name[len("_on_") :] for name in vars(FakeFfiBackend) if name.startswith("_on_")
+)
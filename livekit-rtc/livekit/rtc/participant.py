@@ -14,11 +14,11 @@
 
 from __future__ import annotations
 
-import ctypes
-from typing import List, Union, Callable, Dict, Awaitable, Optional, Mapping, cast
+from typing import Any, List, Union, Callable, Dict, Awaitable, Optional, Mapping, cast
 from abc import abstractmethod, ABC
 
 from ._ffi_client import FfiClient, FfiHandle
+from ._marshal import buffer_address
 from ._proto import ffi_pb2 as proto_ffi
 from ._proto import participant_pb2 as proto_participant
 from ._proto.room_pb2 import (
@@ -27,7 +27,7 @@ from ._proto.room_pb2 import (
 from ._proto.room_pb2 import (
     TranscriptionSegment as ProtoTranscriptionSegment,
 )
-from ._utils import BroadcastQueue
+from ._utils import Queue
 from .track import LocalTrack
 from .track_publication import (
     LocalTrackPublication,
@@ -71,7 +71,7 @@ class PublishTranscriptionError(Exception):
 class Participant(ABC):
     def __init__(self, owned_info: proto_participant.OwnedParticipant) -> None:
         self._info = owned_info.info
-        self._ffi_handle = FfiHandle(owned_info.handle.id)
+        self._ffi_handle = FfiHandle(owned_info.handle.id, "participant")
 
     @property
     @abstractmethod
@@ -113,11 +113,14 @@ class LocalParticipant(Participant):
 
     def __init__(
         self,
-        room_queue: BroadcastQueue[proto_ffi.FfiEvent],
         owned_info: proto_participant.OwnedParticipant,
+        ffi_queue: Queue[proto_ffi.FfiEvent],
     ) -> None:
         super().__init__(owned_info)
-        self._room_queue = room_queue
+        # the room's FFI queue, callbacks ordered with room events are routed to it
+        self._ffi_queue = ffi_queue
+        # handlers run by the room for those callbacks, keyed by async_id
+        self._ordered_callbacks: Dict[int, Callable[[proto_ffi.FfiEvent], None]] = {}
         self._track_publications: dict[str, LocalTrackPublication] = {}  # type: ignore
         self._rpc_handlers: Dict[
             str, Callable[[RpcInvocationData], Union[Awaitable[str], str]]
@@ -132,7 +135,7 @@ class LocalParticipant(Participant):
 
     async def publish_data(
         self,
-        payload: Union[bytes, str],
+        payload: Union[bytes, bytearray, memoryview, str],
         *,
         reliable: bool = True,
         destination_identities: List[str] = [],
@@ -142,7 +145,8 @@ class LocalParticipant(Participant):
         Publish arbitrary data to the room.
 
         Args:
-            payload (Union[bytes, str]): The data to publish.
+            payload (Union[bytes, bytearray, memoryview, str]): The data to publish. Bytes
+                and writable buffers are passed to the FFI without being copied.
             reliable (bool, optional): Whether to send reliably or not. Defaults to True.
             destination_identities (List[str], optional): List of participant identities to send to. Defaults to [].
             topic (str, optional): The topic under which to publish the data. Defaults to "".
@@ -153,25 +157,18 @@ class LocalParticipant(Participant):
         if isinstance(payload, str):
             payload = payload.encode("utf-8")
 
-        data_len = len(payload)
-        cdata = (ctypes.c_byte * data_len)(*payload)
+        # keep the payload alive until the FFI is done with it
+        data_ptr, keepalive = buffer_address(payload)
 
         req = proto_ffi.FfiRequest()
         req.publish_data.local_participant_handle = self._ffi_handle.handle
-        req.publish_data.data_ptr = ctypes.addressof(cdata)
-        req.publish_data.data_len = data_len
+        req.publish_data.data_ptr = data_ptr
+        req.publish_data.data_len = memoryview(payload).nbytes
         req.publish_data.reliable = reliable
         req.publish_data.topic = topic
         req.publish_data.destination_identities.extend(destination_identities)
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.publish_data.async_id == resp.publish_data.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req)
 
         if cb.publish_data.error:
             raise PublishDataError(cb.publish_data.error)
@@ -192,14 +189,7 @@ class LocalParticipant(Participant):
         req.publish_sip_dtmf.code = code
         req.publish_sip_dtmf.digit = digit
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.publish_sip_dtmf.async_id == resp.publish_sip_dtmf.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req)
 
         if cb.publish_sip_dtmf.error:
             raise PublishDTMFError(cb.publish_sip_dtmf.error)
@@ -232,15 +222,7 @@ class LocalParticipant(Participant):
         req.publish_transcription.segments.extend(proto_segments)
         req.publish_transcription.track_id = transcription.track_sid
         # fmt: on
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.publish_transcription.async_id
-                == resp.publish_transcription.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req)
 
         if cb.publish_transcription.error:
             raise PublishTranscriptionError(cb.publish_transcription.error)
@@ -276,14 +258,7 @@ class LocalParticipant(Participant):
         if response_timeout is not None:
             req.perform_rpc.response_timeout_ms = int(response_timeout * 1000)
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb = await queue.wait_for(
-                lambda e: (e.perform_rpc.async_id == resp.perform_rpc.async_id)
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb = await FfiClient.instance.request_async(req)
 
         if cb.perform_rpc.HasField("error"):
             raise RpcError._from_proto(cb.perform_rpc.error)
@@ -448,15 +423,7 @@ class LocalParticipant(Participant):
         req.set_local_metadata.local_participant_handle = self._ffi_handle.handle
         req.set_local_metadata.metadata = metadata
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            await queue.wait_for(
-                lambda e: e.set_local_metadata.async_id
-                == resp.set_local_metadata.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        await FfiClient.instance.request_async(req)
 
     async def set_name(self, name: str) -> None:
         """
@@ -471,14 +438,7 @@ class LocalParticipant(Participant):
         req.set_local_name.local_participant_handle = self._ffi_handle.handle
         req.set_local_name.name = name
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            await queue.wait_for(
-                lambda e: e.set_local_name.async_id == resp.set_local_name.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        await FfiClient.instance.request_async(req)
 
     async def set_attributes(self, attributes: dict[str, str]) -> None:
         """
@@ -501,15 +461,7 @@ class LocalParticipant(Participant):
             entry.key = key
             entry.value = value
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            await queue.wait_for(
-                lambda e: e.set_local_attributes.async_id
-                == resp.set_local_attributes.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        await FfiClient.instance.request_async(req)
 
     async def publish_track(
         self, track: LocalTrack, options: TrackPublishOptions = TrackPublishOptions()
@@ -532,25 +484,23 @@ class LocalParticipant(Participant):
         req.publish_track.local_participant_handle = self._ffi_handle.handle
         req.publish_track.options.CopyFrom(options)
 
-        queue = self._room_queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.publish_track.async_id == resp.publish_track.async_id
-            )
+        fut = asyncio.get_event_loop().create_future()
 
+        def on_callback(cb: proto_ffi.FfiEvent) -> None:
+            # runs before the room handles the next event (e.g. local_track_published)
             if cb.publish_track.error:
-                raise PublishTrackError(cb.publish_track.error)
+                if not fut.done():
+                    fut.set_exception(PublishTrackError(cb.publish_track.error))
+                return
 
             track_publication = LocalTrackPublication(cb.publish_track.publication)
             track_publication.track = track
             track._info.sid = track_publication.sid
             self._track_publications[track_publication.sid] = track_publication
+            if not fut.done():
+                fut.set_result(track_publication)
 
-            queue.task_done()
-            return track_publication
-        finally:
-            self._room_queue.unsubscribe(queue)
+        return await self._request_ordered(req, on_callback, fut)
 
     async def unpublish_track(self, track_sid: str) -> None:
         """
@@ -565,22 +515,53 @@ class LocalParticipant(Participant):
         req = proto_ffi.FfiRequest()
         req.unpublish_track.local_participant_handle = self._ffi_handle.handle
         req.unpublish_track.track_sid = track_sid
+        req.unpublish_track.stop_on_unpublish = True
 
-        queue = self._room_queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.unpublish_track.async_id == resp.unpublish_track.async_id
-            )
+        fut = asyncio.get_event_loop().create_future()
 
+        def on_callback(cb: proto_ffi.FfiEvent) -> None:
             if cb.unpublish_track.error:
-                raise UnpublishTrackError(cb.unpublish_track.error)
+                if not fut.done():
+                    fut.set_exception(UnpublishTrackError(cb.unpublish_track.error))
+                return
+
+            publication = self._track_publications.pop(track_sid, None)
+            if publication is not None:
+                publication.track = None
+            if not fut.done():
+                fut.set_result(None)
+
+        await self._request_ordered(req, on_callback, fut)
 
-            publication = self._track_publications.pop(track_sid)
-            publication.track = None
-            queue.task_done()
+    async def _request_ordered(
+        self,
+        req: proto_ffi.FfiRequest,
+        on_callback: Callable[[proto_ffi.FfiEvent], None],
+        fut: asyncio.Future[Any],
+    ) -> Any:
+        """Send a request whose callback must be handled in order with the room events.
+
+        The callback is routed to the room's queue before it can arrive, and
+        `on_callback` is run by the room's listen task, so the room events that
+        follow it see its effects.
+        """
+        resp = FfiClient.instance.request_routed(req, self._ffi_queue)
+        which = req.WhichOneof("message")
+        async_id = getattr(resp, which).async_id  # type: ignore
+        # the listen task runs on this loop, it can't see the callback before this
+        self._ordered_callbacks[async_id] = on_callback
+        try:
+            return await fut
         finally:
-            self._room_queue.unsubscribe(queue)
+            FfiClient.instance.queue.unroute(self._ffi_queue, async_id)
+            self._ordered_callbacks.pop(async_id, None)
+
+    def _on_ordered_callback(self, event: proto_ffi.FfiEvent) -> None:
+        which = event.WhichOneof("message")
+        async_id = getattr(event, which).async_id  # type: ignore
+        on_callback = self._ordered_callbacks.pop(async_id, None)
+        if on_callback is not None:
+            on_callback(event)
 
     def __repr__(self) -> str:
         return f"rtc.LocalParticipant(sid={self.sid}, identity={self.identity}, name={self.name})"
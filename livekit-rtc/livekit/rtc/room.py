@@ -14,20 +14,19 @@
 from __future__ import annotations
 
 import asyncio
-import ctypes
 import logging
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Literal, Optional, cast, Mapping
+from typing import Callable, Dict, Literal, Optional, Tuple, Union, cast, Mapping
 
 from .event_emitter import EventEmitter
 from ._ffi_client import FfiClient, FfiHandle
+from ._marshal import from_ffi
 from ._proto import ffi_pb2 as proto_ffi
 from ._proto import participant_pb2 as proto_participant
 from ._proto import room_pb2 as proto_room
 from ._proto.room_pb2 import ConnectionState
-from ._proto.track_pb2 import TrackKind
+from ._proto.track_pb2 import TrackKind, TrackSource
 from ._proto.rpc_pb2 import RpcMethodInvocationEvent
-from ._utils import BroadcastQueue
 from .e2ee import E2EEManager, E2EEOptions
 from .participant import LocalParticipant, Participant, RemoteParticipant
 from .track import RemoteAudioTrack, RemoteVideoTrack
@@ -62,6 +61,7 @@ EventTypes = Literal[
     "disconnected",
     "reconnecting",
     "reconnected",
+    "room_events_coalesced",
 ]
 
 
@@ -113,11 +113,64 @@ class SipDTMF:
     """Participant who sent the DTMF digit. None when sent by a server SDK."""
 
 
+@dataclass
+class CoalescedRoomEvents:
+    """High-frequency room events merged over a coalescing window, see
+    `Room.set_event_coalescing`."""
+
+    active_speakers: list[Participant] | None = None
+    """Latest active speakers, None if they didn't change during the window."""
+    connection_quality: Dict[Participant, proto_room.ConnectionQuality.ValueType] = (
+        field(default_factory=dict)
+    )
+    """Latest connection quality of each participant whose quality changed."""
+    changed_attributes: Dict[Participant, Dict[str, str]] = field(default_factory=dict)
+    """Attributes changed during the window for each participant, latest value per key."""
+    folded: int = 0
+    """Number of raw events merged into this batch."""
+
+
 class ConnectError(Exception):
     def __init__(self, message: str):
         self.message = message
 
 
+class _RoomIndex:
+    """Secondary indexes of the participants and track publications of a room"""
+
+    def __init__(self) -> None:
+        self.participants: Dict[str, Participant] = {}
+        """Participants by SID"""
+        self.publications: Dict[str, Tuple[TrackPublication, Participant]] = {}
+        """Publications and their participant by track SID"""
+        self.by_source: Dict[Tuple[str, TrackSource.ValueType], TrackPublication] = {}
+        """Publications by participant identity and track source"""
+
+    def add_participant(self, participant: Participant) -> None:
+        self.participants[participant.sid] = participant
+        for publication in participant.track_publications.values():
+            self.add_publication(publication, participant)
+
+    def remove_participant(self, participant: Participant) -> None:
+        self.participants.pop(participant.sid, None)
+        for publication in participant.track_publications.values():
+            self.remove_publication(publication, participant)
+
+    def add_publication(
+        self, publication: TrackPublication, participant: Participant
+    ) -> None:
+        self.publications[publication.sid] = (publication, participant)
+        self.by_source[(participant.identity, publication.source)] = publication
+
+    def remove_publication(
+        self, publication: TrackPublication, participant: Participant
+    ) -> None:
+        self.publications.pop(publication.sid, None)
+        key = (participant.identity, publication.source)
+        if self.by_source.get(key) is publication:
+            del self.by_source[key]
+
+
 class Room(EventEmitter[EventTypes]):
     def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
         """Initializes a new Room instance.
@@ -129,11 +182,14 @@ class Room(EventEmitter[EventTypes]):
 
         self._ffi_handle: Optional[FfiHandle] = None
         self._loop = loop or asyncio.get_event_loop()
-        self._room_queue = BroadcastQueue[proto_ffi.FfiEvent]()
         self._info = proto_room.RoomInfo()
         self._rpc_invocation_tasks: set[asyncio.Task] = set()
 
         self._remote_participants: Dict[str, RemoteParticipant] = {}
+        self._index = _RoomIndex()
+        self._coalescing_window = 0.0
+        self._coalesced: CoalescedRoomEvents | None = None
+        self._coalesce_timer: asyncio.TimerHandle | None = None
         self._connection_state = ConnectionState.CONN_DISCONNECTED
         self._first_sid_future = asyncio.Future[str]()
         self._local_participant: LocalParticipant | None = None
@@ -185,6 +241,65 @@ class Room(EventEmitter[EventTypes]):
         """
         return self._remote_participants
 
+    def get_participant_by_sid(self, sid: str) -> Optional[Participant]:
+        """Gets a local or remote participant by its SID.
+
+        Returns:
+            Optional[Participant]: The participant, or None if it isn't in the room.
+        """
+        return self._index.participants.get(sid)
+
+    def get_track_publication(self, track_sid: str) -> Optional[TrackPublication]:
+        """Gets the publication of a local or remote track by its SID.
+
+        Returns:
+            Optional[TrackPublication]: The publication, or None if it isn't published.
+        """
+        entry = self._index.publications.get(track_sid)
+        return entry[0] if entry else None
+
+    def get_track_participant(self, track_sid: str) -> Optional[Participant]:
+        """Gets the participant publishing the track with the given SID.
+
+        Returns:
+            Optional[Participant]: The participant, or None if the track isn't
+            published.
+        """
+        entry = self._index.publications.get(track_sid)
+        return entry[1] if entry else None
+
+    def get_publication_by_source(
+        self, participant: Union[Participant, str], source: TrackSource.ValueType
+    ) -> Optional[TrackPublication]:
+        """Gets the publication of a participant for a given source (e.g. microphone).
+
+        Parameters:
+            participant (Union[Participant, str]): The participant or its identity.
+            source (TrackSource): The source of the track.
+
+        Returns:
+            Optional[TrackPublication]: The publication, or None if the participant
+            doesn't publish a track from this source.
+        """
+        if isinstance(participant, Participant):
+            participant = participant.identity
+        return self._index.by_source.get((participant, source))
+
+    def set_event_coalescing(self, window: float) -> None:
+        """Coalesces the high-frequency events of large rooms.
+
+        When enabled, "active_speakers_changed", "connection_quality_changed" and
+        "participant_attributes_changed" are no longer emitted one by one. The events
+        received during `window` seconds are merged into a single
+        "room_events_coalesced" event holding the latest state per participant.
+
+        Parameters:
+            window (float): Coalescing window in seconds, 0 to emit every event.
+        """
+        self._coalescing_window = window
+        if window <= 0:
+            self._flush_coalesced()
+
     @property
     def name(self) -> str:
         """Gets the name of the room.
@@ -233,6 +348,12 @@ class Room(EventEmitter[EventTypes]):
         Returns:
             Callable: The registered callback function.
 
+        The callback can be a coroutine function: it is then scheduled on the event
+        loop of the room instead of being awaited, so it doesn't delay the next
+        events. At most 16 async callbacks of an event run at the same time, the
+        others wait for a free slot, see `set_async_limits`. The async callbacks
+        still running or waiting when the room is disconnected are cancelled.
+
         Available events:
             - **"participant_connected"**: Called when a new participant joins the room.
                 - Arguments: `participant` (RemoteParticipant)
@@ -288,6 +409,9 @@ class Room(EventEmitter[EventTypes]):
                 - Arguments: None
             - **"reconnected"**: Called when the room has successfully reconnected.
                 - Arguments: None
+            - **"room_events_coalesced"**: Called at the end of each coalescing window, see
+              `set_event_coalescing`.
+                - Arguments: `events` (CoalescedRoomEvents)
 
         Example:
             ```python
@@ -295,6 +419,10 @@ class Room(EventEmitter[EventTypes]):
                 print(f"Participant connected: {participant.identity}")
 
             room.on("participant_connected", on_participant_connected)
+
+            @room.on("data_received")
+            async def on_data_received(data_packet):
+                await process(data_packet.data)
             ```
         """
         return super().on(event, callback)
@@ -361,20 +489,13 @@ class Room(EventEmitter[EventTypes]):
         # subscribe before connecting so we don't miss any events
         self._ffi_queue = FfiClient.instance.queue.subscribe(self._loop)
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.connect.async_id == resp.connect.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req)
 
         if cb.connect.error:
             FfiClient.instance.queue.unsubscribe(self._ffi_queue)
             raise ConnectError(cb.connect.error)
 
-        self._ffi_handle = FfiHandle(cb.connect.result.room.handle.id)
+        self._ffi_handle = FfiHandle(cb.connect.result.room.handle.id, "room")
 
         self._e2ee_manager = E2EEManager(self._ffi_handle.handle, options.e2ee)
 
@@ -382,7 +503,13 @@ class Room(EventEmitter[EventTypes]):
         self._connection_state = ConnectionState.CONN_CONNECTED
 
         self._local_participant = LocalParticipant(
-            self._room_queue, cb.connect.result.local_participant
+            cb.connect.result.local_participant, self._ffi_queue
+        )
+
+        # only receive the events of this room and of its local participant
+        FfiClient.instance.queue.route(self._ffi_queue, self._ffi_handle.handle)
+        FfiClient.instance.queue.route(
+            self._ffi_queue, self._local_participant._ffi_handle.handle
         )
 
         for pt in cb.connect.result.participants:
@@ -392,6 +519,9 @@ class Room(EventEmitter[EventTypes]):
             for owned_publication_info in pt.publications:
                 publication = RemoteTrackPublication(owned_publication_info)
                 rp._track_publications[publication.sid] = publication
+                self._index.add_publication(publication, rp)
+
+        self._index.add_participant(self._local_participant)
 
         # start listening to room events
         self._task = self._loop.create_task(self._listen_task())
@@ -405,23 +535,23 @@ class Room(EventEmitter[EventTypes]):
 
         req = proto_ffi.FfiRequest()
         req.disconnect.room_handle = self._ffi_handle.handle  # type: ignore
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            await queue.wait_for(
-                lambda e: e.disconnect.async_id == resp.disconnect.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        await FfiClient.instance.request_async(req)
         await self._task
         FfiClient.instance.queue.unsubscribe(self._ffi_queue)
 
     async def _listen_task(self) -> None:
-        # listen to incoming room events
+        # listen to incoming room events, only the events of this room, of its local
+        # participant and the callbacks that must be ordered with them are routed here
         while True:
             event = await self._ffi_queue.get()
-            if event.WhichOneof("message") == "rpc_method_invocation":
+            which = event.WhichOneof("message")
+            if which == "rpc_method_invocation":
                 self._on_rpc_method_invocation(event.rpc_method_invocation)
+            elif which in ("publish_track", "unpublish_track"):
+                try:
+                    self._local_participant._on_ordered_callback(event)  # type: ignore
+                except Exception:
+                    logging.exception("error handling the %s callback", which)
             elif event.room_event.room_handle == self._ffi_handle.handle:  # type: ignore
                 if event.room_event.HasField("eos"):
                     break
@@ -435,13 +565,12 @@ class Room(EventEmitter[EventTypes]):
                         event.room_event,
                     )
 
-            # wait for the subscribers to process the event
-            # before processing the next one
-            self._room_queue.put_nowait(event)
-            await self._room_queue.join()
+        self._flush_coalesced()
+        self._index = _RoomIndex()
 
         # Clean up any pending RPC invocation tasks
         await self._drain_rpc_invocation_tasks()
+        await self._cancel_async_handlers()
 
     def _on_rpc_method_invocation(self, rpc_invocation: RpcMethodInvocationEvent):
         if self._local_participant is None:
@@ -474,16 +603,21 @@ class Room(EventEmitter[EventTypes]):
         elif which == "participant_disconnected":
             identity = event.participant_disconnected.participant_identity
             rparticipant = self._remote_participants.pop(identity)
+            self._index.remove_participant(rparticipant)
             self.emit("participant_disconnected", rparticipant)
         elif which == "local_track_published":
             sid = event.local_track_published.track_sid
             lpublication = self.local_participant.track_publications[sid]
+            self._index.add_publication(lpublication, self.local_participant)
             track = lpublication.track
             self.emit("local_track_published", lpublication, track)
         elif which == "local_track_unpublished":
             sid = event.local_track_unpublished.publication_sid
-            lpublication = self.local_participant.track_publications[sid]
-            self.emit("local_track_unpublished", lpublication)
+            # the unpublish callback has already removed the publication from the
+            # local participant, the index still has it
+            publication, _ = self._index.publications[sid]
+            self._index.remove_publication(publication, self.local_participant)
+            self.emit("local_track_unpublished", publication)
         elif which == "local_track_subscribed":
             sid = event.local_track_subscribed.track_sid
             lpublication = self.local_participant.track_publications[sid]
@@ -495,6 +629,7 @@ class Room(EventEmitter[EventTypes]):
             ]
             rpublication = RemoteTrackPublication(event.track_published.publication)
             rparticipant._track_publications[rpublication.sid] = rpublication
+            self._index.add_publication(rpublication, rparticipant)
             self.emit("track_published", rpublication, rparticipant)
         elif which == "track_unpublished":
             rparticipant = self._remote_participants[
@@ -503,6 +638,7 @@ class Room(EventEmitter[EventTypes]):
             rpublication = rparticipant._track_publications.pop(
                 event.track_unpublished.publication_sid
             )
+            self._index.remove_publication(rpublication, rparticipant)
             self.emit("track_unpublished", rpublication, rparticipant)
         elif which == "track_subscribed":
             owned_track_info = event.track_subscribed.track
@@ -574,7 +710,10 @@ class Room(EventEmitter[EventTypes]):
                 assert isinstance(participant, Participant)
                 speakers.append(participant)
 
-            self.emit("active_speakers_changed", speakers)
+            if self._coalescing_window > 0:
+                self._coalesce().active_speakers = speakers
+            else:
+                self.emit("active_speakers_changed", speakers)
         elif which == "room_metadata_changed":
             old_metadata = self.metadata
             self._info.metadata = event.room_metadata_changed.metadata
@@ -619,20 +758,24 @@ class Room(EventEmitter[EventTypes]):
             participant._info.attributes.update(
                 (entry.key, entry.value) for entry in attributes
             )
-            self.emit(
-                "participant_attributes_changed",
-                changed_attributes,
-                participant,
-            )
+            if self._coalescing_window > 0:
+                changed = self._coalesce().changed_attributes
+                changed.setdefault(participant, {}).update(changed_attributes)
+            else:
+                self.emit(
+                    "participant_attributes_changed",
+                    changed_attributes,
+                    participant,
+                )
         elif which == "connection_quality_changed":
             identity = event.connection_quality_changed.participant_identity
             # TODO: pass participant identity
             participant = self._retrieve_participant(identity)
-            self.emit(
-                "connection_quality_changed",
-                participant,
-                event.connection_quality_changed.quality,
-            )
+            quality = event.connection_quality_changed.quality
+            if self._coalescing_window > 0 and participant is not None:
+                self._coalesce().connection_quality[participant] = quality
+            else:
+                self.emit("connection_quality_changed", participant, quality)
         elif which == "transcription_received":
             transcription = event.transcription_received
             segments = [
@@ -657,13 +800,8 @@ class Room(EventEmitter[EventTypes]):
             if which_val == "user":
                 owned_buffer_info = packet.user.data
                 buffer_info = owned_buffer_info.data
-                native_data = ctypes.cast(
-                    buffer_info.data_ptr,
-                    ctypes.POINTER(ctypes.c_byte * buffer_info.data_len),
-                ).contents
-
-                data = bytes(native_data)
-                FfiHandle(owned_buffer_info.handle.id)
+                data = from_ffi(buffer_info.data_ptr, buffer_info.data_len)
+                FfiHandle(owned_buffer_info.handle.id, "data_buffer")
                 rparticipant = cast(
                     RemoteParticipant,
                     self._retrieve_remote_participant(packet.participant_identity),
@@ -710,6 +848,26 @@ class Room(EventEmitter[EventTypes]):
         elif which == "reconnected":
             self.emit("reconnected")
 
+    def _coalesce(self) -> CoalescedRoomEvents:
+        """Batch of the current coalescing window, the window starts with its first
+        event"""
+        if self._coalesced is None:
+            self._coalesced = CoalescedRoomEvents()
+            self._coalesce_timer = self._loop.call_later(
+                self._coalescing_window, self._flush_coalesced
+            )
+        self._coalesced.folded += 1
+        return self._coalesced
+
+    def _flush_coalesced(self) -> None:
+        if self._coalesce_timer is not None:
+            self._coalesce_timer.cancel()
+            self._coalesce_timer = None
+
+        events, self._coalesced = self._coalesced, None
+        if events is not None:
+            self.emit("room_events_coalesced", events)
+
     async def _drain_rpc_invocation_tasks(self) -> None:
         if self._rpc_invocation_tasks:
             for task in self._rpc_invocation_tasks:
@@ -737,6 +895,7 @@ class Room(EventEmitter[EventTypes]):
 
         participant = RemoteParticipant(owned_info)
         self._remote_participants[participant.identity] = participant
+        self._index.add_participant(participant)
         return participant
 
     def __repr__(self) -> str:
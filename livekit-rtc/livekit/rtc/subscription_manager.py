@@ -0,0 +1,228 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Set
+
+from ._proto.track_pb2 import TrackKind
+from .participant import Participant, RemoteParticipant
+from .room import CoalescedRoomEvents, Room
+from .track_publication import RemoteTrackPublication
+
+
+class SubscriptionManager:
+    """Keeps the room subscribed to the audio of the most active speakers only.
+
+    The audio tracks of the `max_speakers` most recent active speakers are subscribed,
+    plus the tracks of the pinned participants. A subscribed speaker keeps its slot for
+    `hold_time` seconds after it stops speaking, so that speakers taking turns don't
+    make the subscriptions flap.
+
+    Subscription changes are collected for `batch_interval` seconds and sent together,
+    a change reverted within the interval sends no request at all.
+
+    The room should be connected with `RoomOptions(auto_subscribe=False)`, the manager
+    takes over the subscription of every remote audio track.
+    """
+
+    def __init__(
+        self,
+        room: Room,
+        max_speakers: int = 3,
+        hold_time: float = 2.0,
+        batch_interval: float = 0.1,
+    ) -> None:
+        self._room = room
+        self._loop = room._loop
+        self._max_speakers = max_speakers
+        self._hold_time = hold_time
+        self._batch_interval = batch_interval
+
+        self._pinned: Set[str] = set()
+        self._speaking: List[str] = []
+        self._last_active: Dict[str, float] = {}
+        self._selected: Set[str] = set()
+        # subscription state requested for each audio track SID
+        self._requested: Dict[str, bool] = {}
+        self._pending: Dict[str, bool] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._update_handle: Optional[asyncio.TimerHandle] = None
+        self._requests_sent = 0
+
+        room.on("active_speakers_changed", self._on_active_speakers_changed)
+        room.on("room_events_coalesced", self._on_room_events_coalesced)
+        room.on("track_published", self._on_track_changed)
+        room.on("track_unpublished", self._on_track_unpublished)
+        room.on("participant_disconnected", self._on_participant_disconnected)
+
+        self._update()
+
+    def close(self) -> None:
+        self._room.off("active_speakers_changed", self._on_active_speakers_changed)
+        self._room.off("room_events_coalesced", self._on_room_events_coalesced)
+        self._room.off("track_published", self._on_track_changed)
+        self._room.off("track_unpublished", self._on_track_unpublished)
+        self._room.off("participant_disconnected", self._on_participant_disconnected)
+        for handle in (self._flush_handle, self._update_handle):
+            if handle is not None:
+                handle.cancel()
+
+    @property
+    def selected_speakers(self) -> Set[str]:
+        """Identities of the speakers currently holding a slot"""
+        return set(self._selected)
+
+    @property
+    def pinned(self) -> Set[str]:
+        """Identities of the participants always subscribed"""
+        return set(self._pinned)
+
+    @property
+    def requests_sent(self) -> int:
+        """Number of subscription requests sent to the server"""
+        return self._requests_sent
+
+    def pin(self, identity: str) -> None:
+        """Always subscribe to the audio of a participant, in addition to the speakers"""
+        self._pinned.add(identity)
+        self._update()
+
+    def unpin(self, identity: str) -> None:
+        self._pinned.discard(identity)
+        self._update()
+
+    def flush(self) -> None:
+        """Send the pending subscription changes now"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, {}
+        for sid, subscribed in pending.items():
+            if self._requested.get(sid) == subscribed:
+                continue  # reverted during the batch interval
+
+            publication = self._room.get_track_publication(sid)
+            if not isinstance(publication, RemoteTrackPublication):
+                self._requested.pop(sid, None)
+                continue
+
+            publication.set_subscribed(subscribed)
+            self._requested[sid] = subscribed
+            self._requests_sent += 1
+
+    def _on_active_speakers_changed(self, speakers: List[Participant]) -> None:
+        self._set_speakers(speakers)
+
+    def _on_room_events_coalesced(self, events: CoalescedRoomEvents) -> None:
+        if events.active_speakers is not None:
+            self._set_speakers(events.active_speakers)
+
+    def _set_speakers(self, speakers: List[Participant]) -> None:
+        now = time.monotonic()
+        self._speaking = [
+            p.identity for p in speakers if isinstance(p, RemoteParticipant)
+        ]
+        for identity in self._speaking:
+            self._last_active[identity] = now
+        self._update()
+
+    def _on_track_changed(self, *_) -> None:
+        self._update()
+
+    def _on_track_unpublished(
+        self, publication: RemoteTrackPublication, participant: RemoteParticipant
+    ) -> None:
+        self._requested.pop(publication.sid, None)
+        self._pending.pop(publication.sid, None)
+        self._update()
+
+    def _on_participant_disconnected(self, participant: RemoteParticipant) -> None:
+        self._last_active.pop(participant.identity, None)
+        self._selected.discard(participant.identity)
+        for publication in _audio_publications(participant):
+            self._requested.pop(publication.sid, None)
+            self._pending.pop(publication.sid, None)
+        self._update()
+
+    def _rank(self, identity: str) -> tuple:
+        if identity in self._speaking:
+            return (0, self._speaking.index(identity))
+        return (1, -self._last_active[identity])
+
+    def _update(self) -> None:
+        if self._update_handle is not None:
+            self._update_handle.cancel()
+            self._update_handle = None
+
+        now = time.monotonic()
+        participants = self._room.remote_participants
+        candidates = [
+            identity
+            for identity in self._last_active
+            if identity in participants and identity not in self._pinned
+        ]
+        ranked = sorted(candidates, key=self._rank)
+        top = set(ranked[: self._max_speakers])
+
+        # hysteresis: a speaker keeps its slot until it has been quiet for hold_time
+        selected = set()
+        next_expiry: Optional[float] = None
+        for identity in self._selected:
+            if identity not in candidates:
+                continue
+            if identity in top:
+                selected.add(identity)
+                continue
+
+            expiry = self._last_active[identity] + self._hold_time
+            if now < expiry:
+                selected.add(identity)
+                next_expiry = (
+                    expiry if next_expiry is None else min(next_expiry, expiry)
+                )
+
+        for identity in ranked:
+            if len(selected) >= self._max_speakers:
+                break
+            selected.add(identity)
+
+        self._selected = selected
+        if next_expiry is not None and selected != top:
+            # a better ranked speaker is waiting for a slot
+            self._update_handle = self._loop.call_later(next_expiry - now, self._update)
+
+        wanted = selected | self._pinned
+        for identity, participant in participants.items():
+            for publication in _audio_publications(participant):
+                self._requested.setdefault(publication.sid, publication.subscribed)
+                self._request(publication.sid, identity in wanted)
+
+    def _request(self, sid: str, subscribed: bool) -> None:
+        if self._pending.get(sid, self._requested.get(sid)) == subscribed:
+            return
+
+        self._pending[sid] = subscribed
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self._batch_interval, self.flush)
+
+
+def _audio_publications(participant: Participant) -> List[RemoteTrackPublication]:
+    return [
+        publication
+        for publication in participant.track_publications.values()
+        if publication.kind == TrackKind.KIND_AUDIO
+        and isinstance(publication, RemoteTrackPublication)
+    ]
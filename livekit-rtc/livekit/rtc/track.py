@@ -26,7 +26,7 @@ if TYPE_CHECKING:
 class Track:
     def __init__(self, owned_info: proto_track.OwnedTrack):
         self._info = owned_info.info
-        self._ffi_handle = FfiHandle(owned_info.handle.id)
+        self._ffi_handle = FfiHandle(owned_info.handle.id, "track")
 
     @property
     def sid(self) -> str:
@@ -52,14 +52,7 @@ class Track:
         req = proto_ffi.FfiRequest()
         req.get_stats.track_handle = self._ffi_handle.handle
 
-        queue = FfiClient.instance.queue.subscribe()
-        try:
-            resp = FfiClient.instance.request(req)
-            cb: proto_ffi.FfiEvent = await queue.wait_for(
-                lambda e: e.get_stats.async_id == resp.get_stats.async_id
-            )
-        finally:
-            FfiClient.instance.queue.unsubscribe(queue)
+        cb: proto_ffi.FfiEvent = await FfiClient.instance.request_async(req)
 
         if cb.get_stats.error:
             raise Exception(cb.get_stats.error)
@@ -26,7 +26,7 @@ class TrackPublication:
     def __init__(self, owned_info: proto_track.OwnedTrackPublication):
         self._info = owned_info.info
         self.track: Optional[Track] = None
-        self._ffi_handle = FfiHandle(owned_info.handle.id)
+        self._ffi_handle = FfiHandle(owned_info.handle.id, "track_publication")
 
     @property
     def sid(self) -> str:
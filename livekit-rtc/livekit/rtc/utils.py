@@ -77,8 +77,8 @@ def combine_audio_frames(buffer: AudioFrame | list[AudioFrame]) -> AudioFrame:
         data[offset : offset + len(frame_data)] = frame_data
         offset += len(frame_data)
 
-    return AudioFrame(
-        data=data,
+    return AudioFrame._wrap(
+        data,
         sample_rate=sample_rate,
         num_channels=num_channels,
         samples_per_channel=total_samples_per_channel,
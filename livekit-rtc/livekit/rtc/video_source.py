@@ -27,7 +27,7 @@ class VideoSource:
 
         resp = FfiClient.instance.request(req)
         self._info = resp.new_video_source.source
-        self._ffi_handle = FfiHandle(self._info.handle.id)
+        self._ffi_handle = FfiHandle(self._info.handle.id, "video_source")
 
     def capture_frame(
         self,
@@ -61,7 +61,8 @@ class VideoStream:
         else:
             stream = self._create_owned_stream()
 
-        self._ffi_handle = FfiHandle(stream.handle.id)
+        self._ffi_handle = FfiHandle(stream.handle.id, "video_stream")
+        FfiClient.instance.queue.route(self._ffi_queue, self._ffi_handle.handle)
         self._info = stream.info
 
         self._task = self._loop.create_task(self._run())
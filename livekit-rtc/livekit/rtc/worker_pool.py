@@ -0,0 +1,532 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs rooms in a pool of worker processes to use more than one core.
+
+Each worker process has its own FfiClient and native library instance. Media frames
+are exchanged between the supervisor and the workers through shared-memory ring
+buffers, without pickling them.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import struct
+import threading
+from dataclasses import dataclass, field
+from multiprocessing import connection, shared_memory
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from .audio_frame import AudioFrame
+from .log import logger
+from .video_frame import VideoFrame
+
+_HEADER_SIZE = 64  # write position, read position and end-of-stream flag
+_RECORD = struct.Struct("<IIIIII")  # size, kind, payload size, 3 frame fields
+
+_KIND_PADDING = 0
+_KIND_AUDIO = 1
+_KIND_VIDEO = 2
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class SharedFrameRing:
+    """Single-producer, single-consumer ring buffer of frames in shared memory.
+
+    The process creating the ring owns the shared memory segment, which is released
+    when the ring is closed or garbage collected. Pickling the ring (e.g. as part of a
+    RoomJob) only sends its name, the receiving process attaches to the same segment.
+    Writing and reading a frame copies its data once.
+    """
+
+    def __init__(self, capacity: int = 4 * 1024 * 1024) -> None:
+        """
+        Args:
+            capacity (int): Size in bytes of the buffer holding the frames.
+        """
+        capacity = _align(capacity)
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + capacity)
+        buf = shm.buf
+        assert buf is not None
+        buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        self._init(shm, capacity, owner=True)
+
+    @classmethod
+    def _attach(cls, name: str, capacity: int) -> "SharedFrameRing":
+        ring = cls.__new__(cls)
+        ring._init(shared_memory.SharedMemory(name=name), capacity, owner=False)
+        return ring
+
+    def _init(
+        self, shm: shared_memory.SharedMemory, capacity: int, owner: bool
+    ) -> None:
+        buf = shm.buf
+        assert buf is not None
+        self._shm = shm
+        self._capacity = capacity
+        self._owner = owner
+        self._positions = buf[:24].cast("Q")
+        self._data = buf[_HEADER_SIZE : _HEADER_SIZE + capacity]
+
+    def __reduce__(self):
+        return SharedFrameRing._attach, (self._shm.name, self._capacity)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def eos(self) -> bool:
+        """Whether the producer closed the stream and every frame was read"""
+        return bool(self._positions[2]) and self._positions[0] == self._positions[1]
+
+    def end_stream(self) -> None:
+        """Signal the consumer that no more frames will be written"""
+        self._positions[2] = 1
+
+    def write(self, frame: Union[AudioFrame, VideoFrame]) -> bool:
+        """Copy `frame` into the ring.
+
+        Returns:
+            bool: False if the ring doesn't have enough free space for the frame.
+
+        Raises:
+            ValueError: If the frame is larger than the ring.
+        """
+        if isinstance(frame, AudioFrame):
+            kind = _KIND_AUDIO
+            fields = (frame.sample_rate, frame.num_channels, frame.samples_per_channel)
+            payload = frame.data.cast("B")
+        else:
+            kind = _KIND_VIDEO
+            fields = (frame.width, frame.height, frame.type)
+            payload = frame.data.cast("B")
+
+        size = _align(_RECORD.size + payload.nbytes)
+        if size > self._capacity:
+            raise ValueError("frame is larger than the ring buffer")
+
+        write_pos, read_pos = self._positions[0], self._positions[1]
+        offset = write_pos % self._capacity
+        tail = self._capacity - offset
+        padding = tail if tail < size else 0
+        if write_pos + padding + size - read_pos > self._capacity:
+            return False
+
+        if padding:
+            # the frame doesn't fit before the end of the buffer, wrap around
+            if tail >= _RECORD.size:
+                _RECORD.pack_into(self._data, offset, tail, _KIND_PADDING, 0, 0, 0, 0)
+            offset = 0
+
+        _RECORD.pack_into(self._data, offset, size, kind, payload.nbytes, *fields)
+        start = offset + _RECORD.size
+        self._data[start : start + payload.nbytes] = payload
+        # publish the frame only once it is fully written
+        self._positions[0] = write_pos + padding + size
+        return True
+
+    def read(self) -> Optional[Union[AudioFrame, VideoFrame]]:
+        """Pop the oldest frame, or return None if the ring is empty"""
+        write_pos, read_pos = self._positions[0], self._positions[1]
+        if read_pos == write_pos:
+            return None
+
+        offset = read_pos % self._capacity
+        tail = self._capacity - offset
+        if tail < _RECORD.size:
+            read_pos += tail
+            offset = 0
+
+        size, kind, nbytes, a, b, c = _RECORD.unpack_from(self._data, offset)
+        if kind == _KIND_PADDING:
+            read_pos += size
+            offset = 0
+            size, kind, nbytes, a, b, c = _RECORD.unpack_from(self._data, 0)
+
+        start = offset + _RECORD.size
+        payload = self._data[start : start + nbytes]
+        frame: Union[AudioFrame, VideoFrame]
+        if kind == _KIND_AUDIO:
+            frame = AudioFrame(payload, a, b, c)
+        else:
+            frame = VideoFrame(a, b, c, payload)  # type: ignore
+
+        payload.release()
+        self._positions[1] = read_pos + size
+        return frame
+
+    async def write_async(
+        self, frame: Union[AudioFrame, VideoFrame], poll_interval: float = 0.002
+    ) -> None:
+        """Write `frame`, waiting for the consumer to free enough space"""
+        while not self.write(frame):
+            await asyncio.sleep(poll_interval)
+
+    async def read_async(
+        self, poll_interval: float = 0.002
+    ) -> Optional[Union[AudioFrame, VideoFrame]]:
+        """Wait for the next frame, or return None once the stream ended"""
+        while True:
+            frame = self.read()
+            if frame is not None:
+                return frame
+            if self.eos:
+                return None
+            await asyncio.sleep(poll_interval)
+
+    def close(self) -> None:
+        """Release the mapping, and the segment itself if this process created it"""
+        if self._shm.buf is None:
+            return
+
+        self._positions.release()
+        self._data.release()
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __del__(self) -> None:
+        if hasattr(self, "_shm"):
+            self.close()
+
+
+@dataclass
+class RoomJob:
+    """A room assigned to a worker process, passed to the pool entrypoint"""
+
+    job_id: int
+    url: str
+    token: str
+    media_in: SharedFrameRing
+    """Frames sent by the supervisor to the worker"""
+    media_out: SharedFrameRing
+    """Frames sent by the worker to the supervisor"""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class RoomJobHandle:
+    """Supervisor side of a RoomJob"""
+
+    def __init__(self, job: RoomJob, worker: int) -> None:
+        self._job = job
+        self._worker = worker
+        self._future: concurrent.futures.Future[None] = concurrent.futures.Future()
+
+    @property
+    def job_id(self) -> int:
+        return self._job.job_id
+
+    @property
+    def worker(self) -> int:
+        """Index of the worker process running the job"""
+        return self._worker
+
+    @property
+    def media_in(self) -> SharedFrameRing:
+        """Ring to write the frames sent to the worker"""
+        return self._job.media_in
+
+    @property
+    def media_out(self) -> SharedFrameRing:
+        """Ring to read the frames sent by the worker"""
+        return self._job.media_out
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    async def wait(self) -> None:
+        """Wait for the entrypoint to return in the worker.
+
+        Raises:
+            RuntimeError: If the entrypoint raised an exception, or the worker process
+                exited before it returned.
+        """
+        await asyncio.wrap_future(self._future)
+
+    def close(self) -> None:
+        """Release the shared memory of the job.
+
+        The pool forgets the job once it is done, call `close` after reading the
+        remaining frames of `media_out`. Otherwise the shared memory is released when
+        the handle is garbage collected.
+        """
+        self._job.media_in.close()
+        self._job.media_out.close()
+
+
+class RoomWorkerPool:
+    """Starts worker processes and assigns rooms to them.
+
+    The entrypoint is called in a worker process with the RoomJob of every room
+    assigned to it, and typically connects a `Room` to `job.url`. It must be a
+    module-level coroutine function so that it can be sent to the workers.
+
+    ```python
+    async def entrypoint(job: rtc.RoomJob) -> None:
+        room = rtc.Room()
+        await room.connect(job.url, job.token)
+        ...
+        await job.media_out.write_async(frame)
+
+    with rtc.RoomWorkerPool(entrypoint) as pool:
+        handle = pool.submit(url, token)
+        frame = await handle.media_out.read_async()
+    ```
+    """
+
+    def __init__(
+        self,
+        entrypoint: Callable[[RoomJob], Awaitable[None]],
+        num_workers: Optional[int] = None,
+        ring_capacity: int = 4 * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            entrypoint (Callable[[RoomJob], Awaitable[None]]): Coroutine function
+                running a room in a worker process.
+            num_workers (Optional[int]): Number of worker processes, defaults to the
+                number of CPUs.
+            ring_capacity (int): Size in bytes of each shared-memory ring buffer.
+        """
+        self._entrypoint = entrypoint
+        self._num_workers = num_workers or os.cpu_count() or 1
+        self._ring_capacity = ring_capacity
+        # the native library must not be inherited through fork
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+        self._workers: List[Any] = []
+        self._job_queues: List[Any] = []
+        self._load: List[int] = []
+        self._dead: Set[int] = set()
+        # the running jobs, a job is forgotten once its result arrives
+        self._handles: Dict[int, RoomJobHandle] = {}
+        self._results: List[Any] = []
+        self._stop: Any = None
+        self._collector: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker processes"""
+        if self._workers:
+            return
+
+        for i in range(self._num_workers):
+            jobs = self._ctx.Queue()
+            # a pipe per worker, so that the collector sees it close if the worker dies
+            results, results_writer = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._entrypoint, jobs, results_writer),
+                name=f"livekit_room_worker_{i}",
+                daemon=True,
+            )
+            process.start()
+            results_writer.close()
+            self._workers.append(process)
+            self._job_queues.append(jobs)
+            self._results.append(results)
+            self._load.append(0)
+
+        self._stop = self._ctx.Pipe(duplex=False)
+
+        self._collector = threading.Thread(
+            target=self._collect, name="livekit_room_pool", daemon=True
+        )
+        self._collector.start()
+
+    def submit(
+        self, url: str, token: str, metadata: Optional[Dict[str, Any]] = None
+    ) -> RoomJobHandle:
+        """Assign a room to the least busy worker"""
+        if not self._workers:
+            raise RuntimeError("the pool is not started")
+
+        job = RoomJob(
+            job_id=next(self._job_ids),
+            url=url,
+            token=token,
+            media_in=SharedFrameRing(self._ring_capacity),
+            media_out=SharedFrameRing(self._ring_capacity),
+            metadata=metadata or {},
+        )
+        with self._lock:
+            workers = [i for i in range(self._num_workers) if i not in self._dead]
+            if not workers:
+                job.media_in.close()
+                job.media_out.close()
+                raise RuntimeError("every worker process of the pool exited")
+            worker = min(workers, key=self._load.__getitem__)
+            self._load[worker] += 1
+            handle = self._handles[job.job_id] = RoomJobHandle(job, worker)
+
+        self._job_queues[worker].put(job)
+        return handle
+
+    def load(self) -> List[int]:
+        """Number of running jobs per worker"""
+        with self._lock:
+            return list(self._load)
+
+    def _collect(self) -> None:
+        stop = self._stop[0]
+        results = {conn: i for i, conn in enumerate(self._results)}
+        sentinels = {process.sentinel: i for i, process in enumerate(self._workers)}
+        while results or sentinels:
+            ready = connection.wait([stop, *results, *sentinels])
+            if stop in ready:
+                return
+
+            for conn in [conn for conn in results if conn in ready]:
+                try:
+                    job_id, error = conn.recv()
+                except EOFError:
+                    del results[conn]
+                    continue
+                self._complete(job_id, error)
+
+            for sentinel in [sentinel for sentinel in sentinels if sentinel in ready]:
+                self._on_worker_exit(sentinels.pop(sentinel))
+
+    def _complete(self, job_id: int, error: Optional[str]) -> None:
+        with self._lock:
+            handle = self._handles.pop(job_id, None)
+            if handle is None:
+                return
+            self._load[handle.worker] -= 1
+
+        if error is None:
+            handle._future.set_result(None)
+        else:
+            handle._future.set_exception(RuntimeError(error))
+
+    def _on_worker_exit(self, worker: int) -> None:
+        # the results sent before the worker exited are still in its pipe
+        results = self._results[worker]
+        try:
+            while results.poll():
+                self._complete(*results.recv())
+        except (EOFError, OSError):
+            pass
+
+        process = self._workers[worker]
+        process.join()  # the sentinel is ready, it doesn't block
+        exitcode = process.exitcode
+        with self._lock:
+            self._dead.add(worker)
+            job_ids = [h.job_id for h in self._handles.values() if h.worker == worker]
+        if job_ids:
+            logger.error(
+                "room worker %d exited with code %s, failing %d jobs",
+                worker,
+                exitcode,
+                len(job_ids),
+            )
+        for job_id in job_ids:
+            self._complete(job_id, f"the worker process exited with code {exitcode}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Wait for the running jobs, stop the workers and release the shared memory
+        of the jobs still running"""
+        for jobs in self._job_queues:
+            jobs.put(None)
+        for process in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        if self._collector is not None:
+            self._stop[1].send(None)
+            self._collector.join()
+
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+        for handle in handles:
+            if not handle.done():
+                handle._future.cancel()
+            handle.close()
+
+        for results in self._results:
+            results.close()
+        if self._stop is not None:
+            self._stop[0].close()
+            self._stop[1].close()
+
+        self._workers.clear()
+        self._job_queues.clear()
+        self._results.clear()
+        self._load.clear()
+        self._dead.clear()
+        self._stop = None
+        self._collector = None
+
+    def __enter__(self) -> "RoomWorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _worker_main(
+    entrypoint: Callable[[RoomJob], Awaitable[None]], jobs: Any, results: Any
+) -> None:
+    asyncio.run(_worker_loop(entrypoint, jobs, results))
+
+
+async def _worker_loop(
+    entrypoint: Callable[[RoomJob], Awaitable[None]], jobs: Any, results: Any
+) -> None:
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task[None]] = set()
+    while True:
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:
+            break
+
+        task = asyncio.create_task(_run_job(entrypoint, job, results))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_job(
+    entrypoint: Callable[[RoomJob], Awaitable[None]], job: RoomJob, results: Any
+) -> None:
+    error = None
+    try:
+        await entrypoint(job)
+    except Exception as e:
+        logger.exception("room job %d failed", job.job_id)
+        error = repr(e)
+    finally:
+        job.media_out.end_stream()
+        job.media_in.close()
+        job.media_out.close()
+        results.send((job.job_id, error))
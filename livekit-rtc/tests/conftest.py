@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: timing benchmark, only run with LIVEKIT_BENCHMARKS=1"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    benchmarks_env = os.environ.get("LIVEKIT_BENCHMARKS", "").strip().lower()
+    if benchmarks_env in ("true", "1"):
+        return
+
+    skip = pytest.mark.skip(reason="benchmark, set LIVEKIT_BENCHMARKS=1 to run it")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
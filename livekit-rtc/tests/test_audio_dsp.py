@@ -0,0 +1,121 @@
+import array
+import time
+
+import pytest
+
+from livekit import rtc
+
+np = pytest.importorskip("numpy")
+
+
+def _frame(samples, num_channels=1):
+    return rtc.AudioFrame.from_ndarray(
+        np.asarray(samples, dtype=np.int16).reshape(-1, num_channels), 48000
+    )
+
+
+def test_apply_gain():
+    frame = _frame([100, -100, 20000, -20000, 32767])
+    out = rtc.apply_gain(frame, 2.0)
+    assert out is not frame
+    assert out.to_ndarray().ravel().tolist() == [200, -200, 32767, -32768, 32767]
+
+    half = rtc.apply_gain(frame, 0.5, out=frame)
+    assert half is frame
+    assert frame.to_ndarray().ravel().tolist() == [50, -50, 10000, -10000, 16384]
+
+    with pytest.raises(ValueError):
+        rtc.apply_gain(frame, 1.0, out=rtc.AudioFrame.create(48000, 2, 5))
+
+
+def test_mix_audio_frames():
+    a = _frame([30000, -30000, 1, 0], num_channels=2)
+    b = _frame([30000, -30000, 2, 0], num_channels=2)
+    c = _frame([-30000, 30000, 3, -1], num_channels=2)
+
+    # saturates the final sum only, not the intermediate ones
+    mixed = rtc.mix_audio_frames([a, b, c])
+    assert mixed.to_ndarray().ravel().tolist() == [30000, -30000, 6, -1]
+
+    rtc.mix_audio_frames([a, b], out=a)
+    assert a.to_ndarray().ravel().tolist() == [32767, -32768, 3, 0]
+
+    with pytest.raises(ValueError):
+        rtc.mix_audio_frames([a, _frame([1, 2, 3, 4])])
+    with pytest.raises(ValueError):
+        rtc.mix_audio_frames([])
+
+
+def test_channel_mixing():
+    mono = _frame([1, -2, 32767])
+    stereo = rtc.upmix_to_stereo(mono)
+    assert stereo.num_channels == 2
+    assert stereo.to_ndarray().tolist() == [[1, 1], [-2, -2], [32767, 32767]]
+
+    stereo = _frame([32767, 32767, -32768, -32768, 3, -4], num_channels=2)
+    out = rtc.AudioFrame.create(48000, 1, 3)
+    assert rtc.downmix_to_mono(stereo, out=out) is out
+    assert out.to_ndarray().ravel().tolist() == [32767, -32768, -1]
+
+    with pytest.raises(ValueError):
+        rtc.upmix_to_stereo(stereo)
+
+
+def _naive_gain(data, gain):
+    out = array.array("h", bytes(len(data)))
+    for i, sample in enumerate(array.array("h", bytes(data))):
+        out[i] = max(-32768, min(32767, round(sample * gain)))
+    return out
+
+
+def _naive_mix(frames):
+    inputs = [array.array("h", bytes(f.data)) for f in frames]
+    out = array.array("h", bytes(len(inputs[0]) * 2))
+    for i in range(len(out)):
+        out[i] = max(-32768, min(32767, sum(samples[i] for samples in inputs)))
+    return out
+
+
+def _naive_downmix(frame):
+    samples = array.array("h", bytes(frame.data))
+    n = frame.num_channels
+    return array.array(
+        "h", (sum(samples[i : i + n]) // n for i in range(0, len(samples), n))
+    )
+
+
+@pytest.mark.benchmark
+def test_dsp_benchmark():
+    rng = np.random.default_rng(0)
+    # 1 second of 48kHz stereo per participant
+    frames = [
+        rtc.AudioFrame.from_ndarray(
+            rng.integers(-20000, 20000, (48000, 2), dtype=np.int16), 48000
+        )
+        for _ in range(4)
+    ]
+    mono = rtc.AudioFrame.create(48000, 1, 48000)
+
+    def bench(fn, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn()
+        return (time.perf_counter() - start) / repeat, result
+
+    # each vectorized function must match and beat its pure-Python equivalent
+    cases = [
+        (
+            lambda: _naive_gain(frames[0].data.cast("B"), 1.5),
+            lambda: rtc.apply_gain(frames[0], 1.5),
+        ),
+        (lambda: _naive_mix(frames), lambda: rtc.mix_audio_frames(frames)),
+        (
+            lambda: _naive_downmix(frames[0]),
+            lambda: rtc.downmix_to_mono(frames[0], out=mono),
+        ),
+    ]
+    for naive, vectorized in cases:
+        naive_time, expected = bench(naive, 1)
+        fast_time, out = bench(vectorized, 50)
+        assert out.to_ndarray().ravel().tolist() == expected.tolist()
+        assert fast_time < naive_time
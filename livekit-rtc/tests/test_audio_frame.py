@@ -0,0 +1,154 @@
+import array
+import ctypes
+import gc
+import sys
+
+import pytest
+
+from livekit.rtc import AudioFrame, _ffi_client
+from livekit.rtc._proto import audio_frame_pb2 as proto_audio
+
+
+def test_from_buffer_shares_memory():
+    samples = array.array("h", [1, 2, 3, 4])
+    frame = AudioFrame.from_buffer(samples, 48000, 2, 2)
+    assert not frame.owns_data
+
+    samples[0] = 100
+    assert frame.data[0] == 100
+    frame.data[1] = -5
+    assert samples[1] == -5
+
+    # the FFI reads the caller's memory directly
+    address, _ = samples.buffer_info()
+    assert frame._proto_info().data_ptr == address
+
+
+def test_from_buffer_format():
+    # ctypes reports the native byte order explicitly, e.g. "<h"
+    native = (ctypes.c_int16 * 2)(1, 2)
+    assert list(AudioFrame.from_buffer(native, 48000, 1, 2).data) == [1, 2]
+
+    floats = array.array("f", [0.5, -0.5])
+    with pytest.raises(ValueError, match="format"):
+        AudioFrame.from_buffer(floats, 48000, 1, 2)
+
+    swapped = (ctypes.c_int16.__ctype_be__ * 2)(1, 2)
+    if sys.byteorder == "little":
+        with pytest.raises(ValueError, match="format"):
+            AudioFrame.from_buffer(swapped, 48000, 1, 2)
+
+
+def test_from_buffer_read_only():
+    data = bytes(array.array("h", [7, -7]))
+    view = memoryview(bytearray(data)).toreadonly()
+    frame = AudioFrame.from_buffer(view, 16000, 1, 2)
+    assert frame.data.readonly
+    assert list(frame.data) == [7, -7]
+
+    info = frame._proto_info()
+    assert ctypes.string_at(info.data_ptr, 4) == data
+
+    with pytest.raises(ValueError):
+        AudioFrame.from_buffer(view, 16000, 1, 3)
+    with pytest.raises(ValueError):
+        AudioFrame.from_buffer(memoryview(bytearray(8))[::2], 16000, 1, 2)
+
+
+def test_copying_constructor():
+    samples = array.array("h", [1, 2])
+    frame = AudioFrame(samples, 48000, 1, 2)
+    assert frame.owns_data
+    samples[0] = 9
+    assert frame.data[0] == 1
+
+
+def test_native_backed_frame(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(_ffi_client, "_drop_handle", dropped.append)
+    monkeypatch.setattr(_ffi_client, "_releaser", _ffi_client._HandleReleaser())
+
+    native = (ctypes.c_int16 * 4)(1, 2, 3, 4)
+    owned = proto_audio.OwnedAudioFrameBuffer()
+    owned.handle.id = 42
+    owned.info.data_ptr = ctypes.addressof(native)
+    owned.info.num_channels = 2
+    owned.info.samples_per_channel = 2
+    owned.info.sample_rate = 48000
+
+    frame = AudioFrame._from_owned_info(owned, borrow=True)
+    assert not frame.owns_data
+    copy = frame.copy()
+    native[0] = 10
+    assert frame.data[0] == 10
+    assert copy.owns_data and copy.data[0] == 1
+
+    # the native buffer can't be released while views of it are alive
+    view = frame.data
+    with pytest.raises(BufferError):
+        frame.release()
+    assert dropped == []
+    assert frame.data[0] == 10 and view[1] == 2
+
+    del view
+    frame.release()
+    assert dropped == [42]
+    assert frame.samples_per_channel == 0 and len(frame.data) == 0
+
+
+def test_native_backed_view_outlives_frame(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(_ffi_client, "_drop_handle", dropped.append)
+    monkeypatch.setattr(_ffi_client, "_releaser", _ffi_client._HandleReleaser())
+
+    native = (ctypes.c_int16 * 2)(5, 6)
+    owned = proto_audio.OwnedAudioFrameBuffer()
+    owned.handle.id = 1234
+    owned.info.data_ptr = ctypes.addressof(native)
+    owned.info.num_channels = 1
+    owned.info.samples_per_channel = 2
+    owned.info.sample_rate = 48000
+
+    frame = AudioFrame._from_owned_info(owned, borrow=True)
+    view = frame.data
+    del frame
+    gc.collect()
+    _ffi_client._releaser.flush()
+    assert dropped == []  # the view keeps the native buffer alive
+    assert list(view) == [5, 6]
+
+    del view
+    gc.collect()
+    _ffi_client._releaser.flush()
+    assert dropped == [1234]
+
+
+def test_ndarray_conversions():
+    np = pytest.importorskip("numpy")
+
+    interleaved = np.array([[1, -1], [2, -2], [3, -3]], dtype=np.int16)
+    frame = AudioFrame.from_ndarray(interleaved, 48000)
+    assert (frame.num_channels, frame.samples_per_channel) == (2, 3)
+    assert not frame.owns_data  # shared with the array
+
+    view = frame.to_ndarray()
+    assert np.shares_memory(view, interleaved)
+    assert view.shape == (3, 2)
+    assert frame.to_ndarray(layout="planar").tolist() == [[1, 2, 3], [-1, -2, -3]]
+
+    floats = frame.to_ndarray(dtype=np.float32, layout="planar")
+    assert floats.dtype == np.float32 and floats.flags.c_contiguous
+    assert floats[1, 2] == -3 / 32768
+
+    planar = np.array([[0.5, -1.5], [0.25, 1.0]], dtype=np.float32)
+    frame = AudioFrame.from_ndarray(planar, 16000, layout="planar")
+    assert frame.owns_data
+    assert list(frame.data) == [16384, 8192, -32768, 32767]
+
+    mono = AudioFrame.from_ndarray(np.zeros(4, dtype=np.int16), 16000, copy=True)
+    assert (mono.num_channels, mono.owns_data) == (1, True)
+
+    with pytest.raises(ValueError):
+        AudioFrame.from_ndarray(np.zeros(4, dtype=np.int32), 16000)
+    with pytest.raises(ValueError):
+        frame.to_ndarray(layout="stacked")  # type: ignore
@@ -0,0 +1,60 @@
+import asyncio
+import gc
+
+from livekit import rtc
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import FfiClient
+
+
+def test_audio_frame_pool():
+    pool = rtc.AudioFramePool(max_frames_per_format=1)
+
+    a = pool.acquire(48000, 1, 480)
+    b = pool.acquire(48000, 1, 480)
+    assert a is not b
+    assert pool.stats().misses == 2
+
+    a.data[0] = 1234
+    pool.release(a)
+    pool.release(a)  # released twice, ignored
+    pool.release(b)  # the pool is full
+    stats = pool.stats()
+    assert (stats.returned, stats.discarded, stats.pooled) == (2, 1, 1)
+
+    # another format doesn't reuse the frame
+    other = pool.acquire(48000, 2, 480)
+    assert other.num_channels == 2
+
+    recycled = pool.acquire(48000, 1, 480, zeroed=True)
+    assert recycled is a
+    assert recycled.data[0] == 0
+    stats = pool.stats()
+    assert (stats.hits, stats.misses, stats.pooled) == (1, 3, 0)
+    assert stats.hit_rate == 0.25
+
+    # frames that don't come from the pool are left alone
+    pool.release(rtc.AudioFrame.create(48000, 1, 480))
+    assert pool.stats().returned == 2
+
+
+def test_capture_returns_frame_to_pool(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    backend = rtc.FakeFfiBackend([])
+    backend.install()
+    pool = rtc.AudioFramePool()
+
+    async def run():
+        source = rtc.AudioSource(48000, 1)
+        for _ in range(10):
+            frame = pool.acquire(48000, 1, 480)
+            await source.capture_frame(frame)
+
+    asyncio.run(run())
+
+    stats = pool.stats()
+    assert (stats.hits, stats.misses, stats.pooled) == (9, 1, 1)
+    assert backend.stats().audio_frames_captured == 10
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
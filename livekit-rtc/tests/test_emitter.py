@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 from livekit.rtc import EventEmitter
 from typing import Literal
 import pytest
@@ -102,3 +105,121 @@ def test_throw():
     emitter.emit("error")
 
     assert len(calls) == 2
+
+
+def test_once_args():
+    EventTypes = Literal["whatever"]
+
+    emitter = EventEmitter[EventTypes]()
+
+    calls = []
+
+    @emitter.once("whatever")
+    def on_whatever(first):
+        calls.append(first)
+
+    emitter.emit("whatever", 1, 2)
+    emitter.emit("whatever", 3, 4)
+
+    assert calls == [1]
+
+
+@pytest.mark.benchmark
+def test_emit_benchmark():
+    EventTypes = Literal["whatever"]
+
+    num_emits = 10000
+    for num_listeners in (1, 10, 100):
+        emitter = EventEmitter[EventTypes]()
+        for _ in range(num_listeners):
+            emitter.on("whatever", lambda speakers: None)
+
+        start = time.perf_counter()
+        for _ in range(num_emits):
+            emitter.emit("whatever", [], 1)
+        elapsed = time.perf_counter() - start
+
+        print(f"{num_listeners} listeners: {num_emits / elapsed:.0f} emits/s")
+        # a generous floor, dispatching takes about a microsecond per listener
+        assert num_emits * num_listeners / elapsed > 100_000
+
+
+def test_async_handlers():
+    EventTypes = Literal["whatever"]
+
+    async def run():
+        emitter = EventEmitter[EventTypes]()
+        emitter.set_async_limits("whatever", concurrency=2, queue_size=3)
+
+        running = []
+        calls = []
+
+        @emitter.on("whatever")
+        async def on_whatever(value):
+            running.append(value)
+            assert len(running) <= 2
+            await asyncio.sleep(0.01)
+            running.remove(value)
+            calls.append(value)
+
+        for i in range(6):
+            emitter.emit("whatever", i)
+
+        # 2 handlers start right away, 3 wait and the last one is dropped
+        stats = emitter.event_stats()["whatever"]
+        assert stats.queue_depth == 3
+        assert stats.dropped == 1
+
+        while len(calls) < 5:
+            await asyncio.sleep(0.01)
+
+        assert calls == [0, 1, 2, 3, 4]
+        stats = emitter.event_stats()["whatever"]
+        assert stats.completed == 5
+        assert stats.max_queue_depth == 3
+        assert stats.max_latency >= 0.01
+
+        # handlers taking a free slot don't count towards the queue size
+        emitter = EventEmitter[EventTypes]()
+        emitter.set_async_limits("whatever", concurrency=16, queue_size=2)
+        started = []
+
+        @emitter.on("whatever")
+        async def on_started(value):
+            started.append(value)
+
+        for i in range(5):
+            emitter.emit("whatever", i)
+        await asyncio.sleep(0)
+        assert started == [0, 1, 2, 3, 4]
+        assert emitter.event_stats()["whatever"].dropped == 0
+
+        # closing cancels the running handlers and discards the waiting ones
+        emitter = EventEmitter[EventTypes]()
+        emitter.set_async_limits("whatever", concurrency=1)
+        cancelled = []
+
+        @emitter.on("whatever")
+        async def on_blocked(value):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(value)
+                raise
+
+        for i in range(3):
+            emitter.emit("whatever", i)
+        await asyncio.sleep(0)
+        await emitter._cancel_async_handlers()
+        assert cancelled == [0]
+        stats = emitter.event_stats()["whatever"]
+        assert (stats.running, stats.queue_depth) == (0, 0)
+
+        # the slots are free again
+        emitter.emit("whatever", 3)
+        await asyncio.sleep(0)
+        assert emitter.event_stats()["whatever"].running == 1
+        await emitter._cancel_async_handlers()
+        assert cancelled == [0, 3]
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+import ctypes
+import gc
+from types import SimpleNamespace
+
+from livekit.rtc import AudioFrame, EventRecorder, EventReplayer, read_events
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import FfiClient
+from livekit.rtc._proto import ffi_pb2 as proto_ffi
+
+
+def test_record_and_replay(tmp_path, monkeypatch):
+    # record without a native library, the recorder only needs the event tap
+    client = SimpleNamespace(_event_tap=None)
+    monkeypatch.setattr(FfiClient, "_instance", client)
+    path = str(tmp_path / "session.lkev")
+
+    samples = (ctypes.c_int16 * 4)(1, -2, 3, -4)
+    frame_event = proto_ffi.FfiEvent()
+    stream_event = frame_event.audio_stream_event
+    stream_event.stream_handle = 7
+    stream_event.frame_received.frame.handle.id = 99
+    info = stream_event.frame_received.frame.info
+    info.data_ptr = ctypes.addressof(samples)
+    info.num_channels = 2
+    info.samples_per_channel = 2
+    info.sample_rate = 48000
+
+    eos_event = proto_ffi.FfiEvent()
+    eos_event.audio_stream_event.stream_handle = 7
+    eos_event.audio_stream_event.eos.SetInParent()
+
+    with EventRecorder(path) as recorder:
+        client._event_tap(frame_event.SerializePartialToString())
+        client._event_tap(eos_event.SerializePartialToString())
+    assert client._event_tap is None
+    assert recorder.events == 2
+
+    recorded = list(read_events(path))
+    assert recorded[0].buffer == bytes(samples)
+    assert recorded[1].buffer == b""
+
+    replayed = []
+    replayer = EventReplayer(path, speed=None, handle_map={7: 12})
+    assert replayer.replay(replayed.append) == 2
+
+    event = proto_ffi.FfiEvent()
+    event.ParseFromString(replayed[0])
+    assert event.audio_stream_event.stream_handle == 12
+    owned = event.audio_stream_event.frame_received.frame
+    assert owned.info.data_ptr != ctypes.addressof(samples)
+    assert replayer.buffered == 1
+
+    # like a native buffer, the replayed one is freed once the frame releases it
+    frame = AudioFrame._from_owned_info(owned)
+    assert list(frame.data) == [1, -2, 3, -4]
+    gc.collect()
+    _ffi_client._releaser.flush()
+    assert replayer.buffered == 0
+
+    # the buffers of frames nobody consumes are bounded by dropping frame events
+    replayer = EventReplayer(path, speed=None, max_buffers=2)
+    replayed = []
+    for _ in range(3):
+        replayer.replay(replayed.append)
+    assert len(replayed) == 5  # the third frame event is dropped
+    assert (replayer.buffered, replayer.dropped) == (2, 1)
+
+    # the buffers outlive the replayer, until their frames release them
+    replayer.close()
+    assert replayer.buffered == 2
+    frames = []
+    for data in replayed:
+        event = proto_ffi.FfiEvent()
+        event.ParseFromString(data)
+        if event.audio_stream_event.HasField("frame_received"):
+            owned = event.audio_stream_event.frame_received.frame
+            frames.append(AudioFrame._from_owned_info(owned))
+    assert [list(frame.data) for frame in frames] == [[1, -2, 3, -4]] * 2
+    del frames
+    gc.collect()
+    _ffi_client._releaser.flush()
+    assert replayer.buffered == 0
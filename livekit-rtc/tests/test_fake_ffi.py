@@ -0,0 +1,176 @@
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+
+from livekit import rtc
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import FfiClient
+from livekit.rtc._proto import ffi_pb2 as proto_ffi
+
+
+def test_fake_room(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    backend = rtc.FakeFfiBackend(
+        [rtc.FakeParticipant("alice"), rtc.FakeParticipant("bob", video_tracks=1)],
+        speed=10.0,
+    )
+    backend.install()
+
+    async def run():
+        room = rtc.Room()
+        subscribed = []
+        room.on("track_subscribed", lambda track, *_: subscribed.append(track))
+        await room.connect("ws://fake", "token")
+        await asyncio.sleep(0.01)
+
+        assert set(room.remote_participants) == {"alice", "bob"}
+        assert len(subscribed) == 3
+
+        audio = next(t for t in subscribed if isinstance(t, rtc.RemoteAudioTrack))
+        stream = rtc.AudioStream(audio)
+        frames = 0
+        async for event in stream:
+            assert event.frame.samples_per_channel == 480
+            frames += 1
+            if frames == 10:
+                break
+        await stream.aclose()
+
+        cancelled = asyncio.Event()
+
+        @room.on("local_track_published")
+        async def on_published(publication, track):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        source = rtc.AudioSource(48000, 1)
+        track = rtc.LocalAudioTrack.create_audio_track("mic", source)
+        publication = await room.local_participant.publish_track(track)
+        assert room.local_participant.track_publications[publication.sid] is publication
+        await source.capture_frame(rtc.AudioFrame.create(48000, 1, 480))
+
+        # the async handlers still running are cancelled with the room
+        await room.disconnect()
+        assert cancelled.is_set()
+
+    asyncio.run(run())
+
+    stats = backend.stats()
+    assert stats.audio_frames_sent >= 10
+    assert stats.audio_frames_captured == 1
+    assert stats.requests["connect"] == 1
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
+
+
+@pytest.mark.benchmark
+def test_fake_stream_benchmark(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    participants = [rtc.FakeParticipant(f"p{i}") for i in range(8)]
+    backend = rtc.FakeFfiBackend(participants, speed=20.0)
+    backend.install()
+
+    async def run():
+        room = rtc.Room()
+        await room.connect("ws://fake", "token")
+        await asyncio.sleep(0.01)
+
+        received = 0
+
+        async def consume(participant: rtc.RemoteParticipant):
+            nonlocal received
+            stream = rtc.AudioStream.from_participant(
+                participant=participant, track_source=rtc.TrackSource.SOURCE_MICROPHONE
+            )
+            async for _ in stream:
+                received += 1
+
+        tasks = [
+            asyncio.create_task(consume(p)) for p in room.remote_participants.values()
+        ]
+        start = time.perf_counter()
+        await asyncio.sleep(0.5)
+        elapsed = time.perf_counter() - start
+        for task in tasks:
+            task.cancel()
+        await room.disconnect()
+        return received, elapsed
+
+    received, elapsed = asyncio.run(run())
+    sent = backend.stats().audio_frames_sent
+    print(
+        f"{len(participants)} audio streams: {received / elapsed:.0f} frames/s "
+        f"received, {sent - received} frames behind"
+    )
+    # the consumers keep up with the frames the backend sends
+    assert received > sent * 0.5
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
+
+
+def test_incomplete_backend():
+    class NoDrop(rtc.FfiBackend):
+        def initialize(self, on_event):
+            pass
+
+        def request(self, data):
+            return 0, b""
+
+    with pytest.raises(TypeError):
+        NoDrop()
+
+    # the fake backend names the requests it doesn't simulate
+    req = proto_ffi.FfiRequest()
+    req.set_local_metadata.local_participant_handle = 1
+    with pytest.raises(RuntimeError, match="set_local_metadata"):
+        rtc.FakeFfiBackend().request(req.SerializePartialToString())
+
+
+class _ImmediateBackend(rtc.FakeFfiBackend):
+    """Delivers the events from another thread before the request returns, like a
+    native callback racing the caller"""
+
+    def _emit(self, *events):
+        data = [event.SerializeToString() for event in events]
+        thread = threading.Thread(target=lambda: [self._on_event(d) for d in data])
+        thread.start()
+        thread.join(0.1)
+
+
+def test_publish_callback_before_route(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    backend = _ImmediateBackend([])
+    backend.install()
+
+    async def run():
+        room = rtc.Room()
+        published = []
+        room.on("local_track_published", lambda pub, track: published.append(pub))
+        await room.connect("ws://fake", "token")
+
+        source = rtc.AudioSource(48000, 1)
+        track = rtc.LocalAudioTrack.create_audio_track("mic", source)
+        publication = await room.local_participant.publish_track(track)
+        await asyncio.sleep(0.05)
+
+        # the callback is handled before the local_track_published that follows it
+        assert published == [publication]
+        assert room.get_track_publication(publication.sid) is publication
+
+        await room.disconnect()
+
+    asyncio.run(run())
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
@@ -0,0 +1,46 @@
+import gc
+import sys
+
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import FfiHandle, _HandleReleaser
+
+
+def test_handle_release(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(_ffi_client, "_drop_handle", dropped.append)
+    releaser = _HandleReleaser()
+    monkeypatch.setattr(_ffi_client, "_releaser", releaser)
+
+    with FfiHandle(1, "room") as room:
+        frame = FfiHandle(2, "audio_frame")
+        FfiHandle(3, "audio_frame")
+        gc.collect()
+
+        stats = releaser.stats()
+        assert stats.live_by_kind == {"room": 1, "audio_frame": 1}
+
+    assert room.disposed
+    del frame
+    gc.collect()
+
+    releaser.flush()
+    assert sorted(dropped) == [1, 2, 3]
+
+    stats = releaser.stats()
+    assert stats.live == 0
+    assert stats.pending_release == 0
+    assert stats.released == 3
+
+
+def test_release_during_shutdown(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(_ffi_client, "_drop_handle", dropped.append)
+    releaser = _HandleReleaser()
+    monkeypatch.setattr(_ffi_client, "_releaser", releaser)
+    monkeypatch.setattr(sys, "is_finalizing", lambda: True)
+
+    # no thread can be started anymore, the handle is dropped right away
+    FfiHandle(1, "audio_frame")
+    gc.collect()
+    assert dropped == [1]
+    assert releaser._thread is None
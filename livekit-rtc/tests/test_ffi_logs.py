@@ -0,0 +1,43 @@
+import logging
+
+from livekit.rtc._ffi_client import _LogForwarder
+from livekit.rtc._proto import ffi_pb2 as proto_ffi
+
+
+def _records():
+    logs = proto_ffi.LogBatch()
+    for level, target in (
+        (proto_ffi.LogLevel.LOG_ERROR, "livekit"),
+        (proto_ffi.LogLevel.LOG_INFO, "livekit"),
+        (proto_ffi.LogLevel.LOG_DEBUG, "libwebrtc"),
+        (proto_ffi.LogLevel.LOG_TRACE, "livekit"),
+    ):
+        record = logs.records.add()
+        record.level = level
+        record.target = target
+        record.message = proto_ffi.LogLevel.Name(level)
+    return logs.records
+
+
+def test_log_forwarding(caplog):
+    forwarder = _LogForwarder()
+
+    with caplog.at_level(logging.DEBUG, logger="livekit"):
+        forwarder.forward(_records())
+    # rtc debug logs and trace logs are dropped by default
+    assert [r.message.split(" - ")[1] for r in caplog.records] == [
+        "LOG_ERROR",
+        "LOG_INFO",
+    ]
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="livekit"):
+        assert forwarder.enabled()
+        forwarder.forward(_records())
+    assert [r.message.split(" - ")[1] for r in caplog.records] == ["LOG_ERROR"]
+
+    caplog.clear()
+    with caplog.at_level(logging.CRITICAL, logger="livekit"):
+        assert not forwarder.enabled()
+        forwarder.forward(_records())
+    assert not caplog.records
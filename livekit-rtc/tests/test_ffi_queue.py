@@ -0,0 +1,373 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import (
+    FfiQueue,
+    _keep_unclaimed,
+    _peek_event,
+    _release_unclaimed,
+    _routing_key,
+)
+from livekit.rtc._proto import ffi_pb2 as proto_ffi
+
+
+def test_routing():
+    async def run():
+        ffi_queue = FfiQueue[str]()
+
+        catch_all = ffi_queue.subscribe()
+        routed = ffi_queue.subscribe()
+        ffi_queue.route(routed, 1)
+
+        ffi_queue.put("first", 1)
+        ffi_queue.put("second", 2)
+        ffi_queue.put("unkeyed")
+        await asyncio.sleep(0)
+
+        assert routed.qsize() == 1
+        assert routed.get_nowait() == "first"
+        assert catch_all.qsize() == 3
+
+        ffi_queue.unsubscribe(routed)
+        ffi_queue.put("third", 1)
+        await asyncio.sleep(0)
+        assert routed.empty()
+
+    asyncio.run(run())
+
+
+def test_unclaimed_async_callback():
+    async def run():
+        ffi_queue = FfiQueue[str]()
+
+        # the callback can arrive before its waiter subscribes
+        ffi_queue.put("done", 42, retain=True)
+        ffi_queue.put("media", 43)
+
+        waiter = ffi_queue.subscribe(key=42)
+        assert (await waiter.get()) == "done"
+
+        late = ffi_queue.subscribe(key=43)
+        await asyncio.sleep(0)
+        assert late.empty()
+
+    asyncio.run(run())
+
+
+def test_async_callbacks():
+    async def run():
+        ffi_queue = FfiQueue[str]()
+
+        fut = ffi_queue.wait_callback(1, "publish_data")
+        cancelled = ffi_queue.wait_callback(2, "publish_data")
+        stats = ffi_queue.async_stats()
+        assert stats.outstanding == 2
+        assert stats.outstanding_by_type == {"publish_data": 2}
+
+        ffi_queue.put("done", 1, retain=True)
+        assert (await fut) == "done"
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        # the late callback of a cancelled request isn't held
+        ffi_queue.put("late", 2, retain=True)
+        assert ffi_queue.unclaimed_stats().held == 0
+
+        # early callbacks are claimed when the request registers
+        ffi_queue.put("early", 3, retain=True)
+        assert (await ffi_queue.wait_callback(3, "get_stats")) == "early"
+
+        stats = ffi_queue.async_stats()
+        assert stats.outstanding == 0
+        assert stats.peak_outstanding == 2
+        assert stats.completed == 2
+        assert stats.cancelled == 1
+
+    asyncio.run(run())
+
+
+def test_batched_handoff():
+    async def run():
+        ffi_queue = FfiQueue[int]()
+        queue = ffi_queue.subscribe()
+
+        # the loop is busy, so the items are drained in a single wakeup
+        for i in range(10):
+            ffi_queue.put(i)
+        await asyncio.sleep(0)
+
+        assert [queue.get_nowait() for _ in range(10)] == list(range(10))
+
+        stats = ffi_queue.handoff_stats()
+        assert stats.batches == 1
+        assert stats.items == 10
+        assert stats.max_batch_size == 10
+        assert stats.batch_sizes == {16: 1}
+
+    asyncio.run(run())
+
+
+def test_lazy_items():
+    async def run():
+        ffi_queue = FfiQueue[str]()
+        queue = ffi_queue.subscribe(key=1)
+        built = []
+
+        def build(value: str):
+            built.append(value)
+            return value
+
+        ffi_queue.put_lazy(lambda: build("routed"), 1)
+        ffi_queue.put_lazy(lambda: build("skipped"), 2)
+        assert (await queue.get()) == "routed"
+        assert built == ["routed"]
+
+    asyncio.run(run())
+
+
+def test_peek_event():
+    room_event = proto_ffi.FfiEvent()
+    room_event.room_event.room_handle = 12
+    room_event.room_event.connection_state_changed.state = 1
+
+    audio_event = proto_ffi.FfiEvent()
+    audio_event.audio_stream_event.stream_handle = 300
+    audio_event.audio_stream_event.eos.SetInParent()
+
+    callback = proto_ffi.FfiEvent()
+    callback.publish_data.async_id = 2**40
+    callback.publish_data.error = "failed"
+
+    rpc_event = proto_ffi.FfiEvent()
+    rpc_event.rpc_method_invocation.local_participant_handle = 5
+    rpc_event.rpc_method_invocation.payload = "payload"
+
+    logs = proto_ffi.FfiEvent()
+    logs.logs.records.add().message = "message"
+
+    for event in (room_event, audio_event, callback, rpc_event, logs):
+        which, key = _peek_event(event.SerializePartialToString())
+        assert which == event.WhichOneof("message")
+        assert key == _routing_key(event)[0]
+
+
+def test_sharded_routing():
+    async def run():
+        ffi_queue = FfiQueue[str](sharded=True)
+        catch_all = ffi_queue.subscribe()
+
+        # events published before the handle is routed are held for it
+        ffi_queue.put("early", 1)
+        ffi_queue.put("unkeyed")
+        ffi_queue.route(catch_all, 1)
+        ffi_queue.put("late", 1)
+        ffi_queue.put("other", 2)
+
+        assert (await catch_all.get()) == "unkeyed"
+        assert (await catch_all.get()) == "early"
+        assert (await catch_all.get()) == "late"
+        await asyncio.sleep(0)
+        assert catch_all.empty()
+
+    asyncio.run(run())
+
+
+def _run_shards(sharded: bool, num_threads: int, num_rooms: int, num_events: int):
+    ffi_queue = FfiQueue[int](sharded=sharded)
+    ready = threading.Barrier(num_threads + 1)
+    done = threading.Barrier(num_threads + 1)
+
+    def shard(keys: list[int]):
+        async def consume(key: int):
+            queue = ffi_queue.subscribe()
+            if sharded:
+                ffi_queue.route(queue, key)
+            received = 0
+            while received < num_events:
+                # without sharding every room filters the events of the other rooms
+                if await queue.get() == key:
+                    received += 1
+
+        async def run():
+            tasks = [asyncio.create_task(consume(key)) for key in keys]
+            await asyncio.sleep(0.01)
+            ready.wait()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        done.wait()
+
+    threads = []
+    for i in range(num_threads):
+        keys = list(range(i * num_rooms + 1, (i + 1) * num_rooms + 1))
+        threads.append(threading.Thread(target=shard, args=(keys,)))
+        threads[-1].start()
+
+    ready.wait()
+    start = time.perf_counter()
+    all_keys = range(1, num_threads * num_rooms + 1)
+    for _ in range(num_events):
+        for key in all_keys:
+            ffi_queue.put(key, key)
+    done.wait()
+    elapsed = time.perf_counter() - start
+
+    for t in threads:
+        t.join()
+    return elapsed
+
+
+@pytest.mark.benchmark
+def test_sharding_benchmark():
+    # a single thread publishes every event, like the native FFI thread, so the
+    # throughput is bound by the publisher and doesn't grow with the loop threads:
+    # what sharding saves is the fan-out, broadcasting posts every event to every
+    # loop, which filters out the events of the rooms it doesn't host
+    num_rooms = 4
+    num_events = 500
+
+    throughput: dict[tuple[bool, int], float] = {}
+    for num_threads in (1, 2, 4):
+        total = num_threads * num_rooms * num_events
+        for sharded in (False, True):
+            elapsed = _run_shards(sharded, num_threads, num_rooms, num_events)
+            throughput[sharded, num_threads] = total / elapsed
+            mode = "sharded" if sharded else "broadcast"
+            print(
+                f"{num_threads} loop threads, {mode}: "
+                f"{total / elapsed:.0f} events/s ({elapsed * 1000:.1f} ms)"
+            )
+
+    for num_threads in (2, 4):
+        assert throughput[True, num_threads] > throughput[False, num_threads]
+        # the cost of an event doesn't depend on the number of loops when sharded
+        assert throughput[True, num_threads] > 0.5 * throughput[True, 1]
+    assert throughput[False, 4] < 0.5 * throughput[False, 1]
+
+
+def test_bounded_subscribers():
+    async def run():
+        ffi_queue = FfiQueue[int]()
+        oldest = ffi_queue.subscribe(key=1, capacity=2, overflow="drop_oldest")
+        newest = ffi_queue.subscribe(key=1, capacity=2, overflow="drop_newest")
+
+        for i in range(5):
+            ffi_queue.put(i, 1)
+        await asyncio.sleep(0)
+
+        assert [oldest.get_nowait() for _ in range(2)] == [3, 4]
+        assert [newest.get_nowait() for _ in range(2)] == [0, 1]
+
+        for stats in ffi_queue.subscriber_stats():
+            assert stats.size == 0
+            assert stats.high_water_mark <= 5
+            assert stats.dropped == 3
+
+    asyncio.run(run())
+
+
+def test_blocking_subscriber():
+    async def run():
+        ffi_queue = FfiQueue[int]()
+        queue = ffi_queue.subscribe(key=1, capacity=1, overflow="block")
+
+        # the native thread waits for the consumer instead of dropping the items
+        producer = threading.Thread(
+            target=lambda: [ffi_queue.put(i, 1) for i in range(3)]
+        )
+        producer.start()
+        assert [await queue.get() for _ in range(3)] == [0, 1, 2]
+        producer.join()
+
+        stats = queue.stats()
+        assert stats.dropped == 0
+        assert stats.high_water_mark == 1
+
+    asyncio.run(run())
+
+
+def test_blocked_producer_doesnt_stall_consumer():
+    async def run():
+        ffi_queue = FfiQueue[int]()
+        queue = ffi_queue.subscribe(
+            key=1, capacity=1, overflow="block", block_timeout=2.0
+        )
+
+        ffi_queue.put(0, 1)
+        producer = threading.Thread(target=ffi_queue.put, args=(1, 1))
+        producer.start()
+        await asyncio.sleep(0.05)  # the producer waits for room in the queue
+
+        # the consumer can still use the FfiQueue and drain while the producer waits
+        start = time.monotonic()
+        other = ffi_queue.subscribe(key=2)
+        ffi_queue.route(other, 3)
+        fut = ffi_queue.wait_callback(4, "test")
+        stall = time.monotonic() - start
+        received = [await asyncio.wait_for(queue.get(), 1.0) for _ in range(2)]
+        assert received == [0, 1]
+        producer.join()
+
+        assert stall < 0.5
+        stats = queue.stats()
+        assert stats.dropped == 0
+        assert stats.blocked_time < 1.0
+        fut.cancel()
+
+    asyncio.run(run())
+
+
+def test_unclaimed_eviction(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(_ffi_client, "_drop_handle", dropped.append)
+    monkeypatch.setattr(_ffi_client, "_releaser", _ffi_client._HandleReleaser())
+
+    async def run():
+        ffi_queue = FfiQueue[proto_ffi.FfiEvent](
+            sharded=True, keep=_keep_unclaimed, on_evict=_release_unclaimed
+        )
+        connected = proto_ffi.FfiEvent()
+        connected.room_event.room_handle = 5
+        connected.room_event.participant_connected.SetInParent()
+        ffi_queue.put(connected, 5)
+
+        for i in range(70):
+            frame = proto_ffi.FfiEvent()
+            frame.audio_stream_event.stream_handle = 5
+            frame.audio_stream_event.frame_received.frame.handle.id = 100 + i
+            ffi_queue.put(frame, 5)
+
+        # the oldest frames are discarded and their buffers released, not the
+        # lifecycle event published before them
+        stats = ffi_queue.unclaimed_stats()
+        assert (stats.held, stats.keys, stats.evicted) == (64, 1, 7)
+        _ffi_client._releaser.flush()
+        assert dropped == list(range(100, 107))
+
+        queue = ffi_queue.subscribe(key=5)
+        await asyncio.sleep(0)
+        first = queue.get_nowait()
+        assert first.room_event.HasField("participant_connected")
+        assert (
+            queue.get_nowait().audio_stream_event.frame_received.frame.handle.id == 107
+        )
+
+        # the kept events are bounded too, per key and with the oldest keys
+        monkeypatch.setattr(_ffi_client, "_MAX_KEPT_UNCLAIMED_PER_KEY", 100)
+        monkeypatch.setattr(_ffi_client, "_MAX_UNCLAIMED", 2)
+        for _ in range(110):
+            ffi_queue.put(connected, 6)
+        stats = ffi_queue.unclaimed_stats()
+        assert (stats.held, stats.keys, stats.evicted) == (100, 1, 17)
+
+        ffi_queue.put(connected, 7)
+        ffi_queue.put(connected, 8)
+        stats = ffi_queue.unclaimed_stats()
+        assert (stats.held, stats.keys, stats.evicted) == (2, 2, 117)
+
+    asyncio.run(run())
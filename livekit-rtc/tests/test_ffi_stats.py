@@ -0,0 +1,21 @@
+from livekit.rtc._ffi_client import _FfiRecorder
+
+
+def test_ffi_recorder():
+    recorder = _FfiRecorder()
+    recorder.record_request("publish_data", 0.0003, 120, 12)
+    recorder.record_request("publish_data", 0.0001, 80, 12)
+    recorder.record_event("room_event", 64)
+    recorder.record_event(None, 8)
+
+    stats = recorder.snapshot(reset=True)
+    publish = stats.requests["publish_data"]
+    assert publish.count == 2
+    assert publish.max_time == 0.0003
+    assert publish.latency_us == {512: 1, 128: 1}
+    assert (publish.bytes_in, publish.bytes_out) == (200, 24)
+    assert stats.events == {"room_event": 1, "unknown": 1}
+    assert stats.event_bytes == 72
+
+    stats = recorder.snapshot(reset=False)
+    assert not stats.requests and not stats.events
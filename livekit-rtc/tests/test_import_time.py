@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# cold `import livekit.rtc` must stay below this budget
+IMPORT_BUDGET_MS = float(os.environ.get("LIVEKIT_IMPORT_BUDGET_MS", "50"))
+
+_MEASURE = """
+import sys, time
+start = time.perf_counter()
+import livekit.rtc
+elapsed = time.perf_counter() - start
+heavy = ["google.protobuf", "livekit.rtc._ffi_client", "livekit.rtc.room"]
+print(elapsed * 1000, ",".join(m for m in heavy if m in sys.modules))
+"""
+
+
+def _run(code: str) -> str:
+    env = dict(os.environ, LIVEKIT_LIB_PATH="/nonexistent/liblivekit_ffi.so")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True
+    )
+    return out.stdout.decode().strip()
+
+
+def _measure() -> tuple[float, str]:
+    elapsed, loaded = (_run(_MEASURE).split(" ") + [""])[:2]
+    return float(elapsed), loaded
+
+
+def test_lazy_imports():
+    _, loaded = _measure()
+    assert loaded == "", f"eagerly imported: {loaded}"
+
+
+@pytest.mark.benchmark
+def test_import_time_budget():
+    samples = [_measure()[0] for _ in range(3)]
+    print(f"import livekit.rtc: {min(samples):.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    assert min(samples) < IMPORT_BUDGET_MS
+
+
+def test_lazy_native_library():
+    # the native library is only loaded by the first FfiClient.instance
+    code = "from livekit.rtc import AudioFrame, Room; print(Room.__name__)"
+    assert _run(code) == "Room"
@@ -0,0 +1,67 @@
+import asyncio
+import gc
+
+from livekit import rtc
+from livekit.rtc import _ffi_client
+from livekit.rtc._ffi_client import FfiClient
+
+
+def test_event_coalescing(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    backend = rtc.FakeFfiBackend(
+        [rtc.FakeParticipant("alice"), rtc.FakeParticipant("bob")],
+        active_speakers_interval=0.05,
+    )
+    backend.install()
+
+    async def run():
+        room = rtc.Room()
+        room.set_event_coalescing(0.5)
+        batches: list[rtc.CoalescedRoomEvents] = []
+        single = []
+        room.on("room_events_coalesced", batches.append)
+        room.on("active_speakers_changed", single.append)
+        room.on("participant_attributes_changed", lambda *args: single.append(args))
+        room.on("connection_quality_changed", lambda *args: single.append(args))
+        await room.connect("ws://fake", "token")
+
+        backend.set_participant_attributes("alice", {"a": "1"})
+        backend.set_participant_attributes("alice", {"a": "2", "b": "1"})
+        backend.set_connection_quality("bob", rtc.ConnectionQuality.QUALITY_POOR)
+        backend.set_connection_quality("bob", rtc.ConnectionQuality.QUALITY_GOOD)
+        await asyncio.sleep(0.2)
+        assert batches == []  # the window isn't over
+
+        # the timer flushes a single batch with the latest state per participant
+        await asyncio.sleep(0.45)
+        assert single == []
+        assert len(batches) == 1
+        batch = batches[0]
+        alice = room.remote_participants["alice"]
+        bob = room.remote_participants["bob"]
+        assert batch.changed_attributes == {alice: {"a": "2", "b": "1"}}
+        assert batch.connection_quality == {bob: rtc.ConnectionQuality.QUALITY_GOOD}
+        assert batch.active_speakers is not None and len(batch.active_speakers) == 1
+        speaker_events = batch.folded - 4
+        assert speaker_events >= 5
+        assert dict(alice.attributes) == {"a": "2", "b": "1"}
+
+        # disabling coalescing flushes the pending batch right away
+        await asyncio.sleep(0.12)
+        room.set_event_coalescing(0)
+        assert len(batches) == 2 and batches[1].active_speakers is not None
+        await asyncio.sleep(0.12)
+        assert len(batches) == 2
+        assert len(single) >= 1
+
+        # the end of the room flushes the pending batch too
+        room.set_event_coalescing(10.0)
+        await asyncio.sleep(0.12)
+        await room.disconnect()
+        assert len(batches) == 3 and batches[2].folded >= 1
+
+    asyncio.run(run())
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
@@ -0,0 +1,132 @@
+import asyncio
+import gc
+from types import SimpleNamespace
+
+from livekit import rtc
+from livekit.rtc import TrackSource, _ffi_client
+from livekit.rtc._ffi_client import FfiClient
+from livekit.rtc.room import _RoomIndex
+
+
+def _participant(sid: str, identity: str, *publications):
+    return SimpleNamespace(
+        sid=sid,
+        identity=identity,
+        track_publications={p.sid: p for p in publications},
+    )
+
+
+def test_room_index():
+    index = _RoomIndex()
+    mic = SimpleNamespace(sid="TR_mic", source=TrackSource.SOURCE_MICROPHONE)
+    alice = _participant("PA_alice", "alice", mic)
+    index.add_participant(alice)
+
+    assert index.participants["PA_alice"] is alice
+    assert index.publications["TR_mic"] == (mic, alice)
+    assert index.by_source[("alice", TrackSource.SOURCE_MICROPHONE)] is mic
+
+    camera = SimpleNamespace(sid="TR_cam", source=TrackSource.SOURCE_CAMERA)
+    alice.track_publications[camera.sid] = camera
+    index.add_publication(camera, alice)
+    index.remove_publication(mic, alice)
+    assert "TR_mic" not in index.publications
+    assert ("alice", TrackSource.SOURCE_MICROPHONE) not in index.by_source
+
+    index.remove_participant(alice)
+    assert not index.participants
+    assert not index.publications
+    assert not index.by_source
+
+
+def test_room_lookups(monkeypatch):
+    monkeypatch.setattr(FfiClient, "_instance", None)
+    backend = rtc.FakeFfiBackend([rtc.FakeParticipant("alice")])
+    backend.install()
+    mic = TrackSource.SOURCE_MICROPHONE
+
+    async def run():
+        room = rtc.Room()
+        events: list[str] = []
+        for name in (
+            "participant_connected",
+            "participant_disconnected",
+            "track_published",
+            "track_unpublished",
+            "local_track_published",
+            "local_track_unpublished",
+        ):
+            room.on(name, lambda *_, name=name: events.append(name))
+        await room.connect("ws://fake", "token")
+        local = room.local_participant
+        alice = room.remote_participants["alice"]
+        assert room.get_participant_by_sid(local.sid) is local
+        assert room.get_participant_by_sid(alice.sid) is alice
+
+        # a participant joins with a track, then publishes and unpublishes another
+        backend.connect_participant(rtc.FakeParticipant("bob"))
+        await asyncio.sleep(0.05)
+        bob = room.remote_participants["bob"]
+        assert room.get_participant_by_sid(bob.sid) is bob
+        (bob_mic,) = bob.track_publications.values()
+        assert room.get_track_publication(bob_mic.sid) is bob_mic
+        assert room.get_track_participant(bob_mic.sid) is bob
+        assert room.get_publication_by_source("bob", mic) is bob_mic
+
+        (camera_sid,) = backend.publish_remote_track("bob", rtc.TrackKind.KIND_VIDEO)
+        await asyncio.sleep(0.05)
+        camera = room.get_track_publication(camera_sid)
+        assert camera is bob.track_publications[camera_sid]
+        assert room.get_publication_by_source(bob, TrackSource.SOURCE_CAMERA) is camera
+
+        backend.unpublish_remote_track("bob", camera_sid)
+        await asyncio.sleep(0.05)
+        assert room.get_track_publication(camera_sid) is None
+        assert room.get_publication_by_source(bob, TrackSource.SOURCE_CAMERA) is None
+
+        # the participant leaves with its remaining track
+        backend.disconnect_participant("bob")
+        await asyncio.sleep(0.05)
+        assert "bob" not in room.remote_participants
+        assert room.get_participant_by_sid(bob.sid) is None
+        assert room.get_track_publication(bob_mic.sid) is None
+        assert room.get_publication_by_source("bob", mic) is None
+
+        # a local track is published and unpublished
+        source = rtc.AudioSource(48000, 1)
+        track = rtc.LocalAudioTrack.create_audio_track("mic", source)
+        options = rtc.TrackPublishOptions(source=mic)
+        publication = await local.publish_track(track, options)
+        await asyncio.sleep(0.05)
+        assert room.get_track_publication(publication.sid) is publication
+        assert room.get_track_participant(publication.sid) is local
+        assert room.get_publication_by_source(local, mic) is publication
+
+        await local.unpublish_track(publication.sid)
+        await asyncio.sleep(0.05)
+        assert publication.sid not in local.track_publications
+        assert room.get_track_publication(publication.sid) is None
+        assert room.get_publication_by_source(local, mic) is None
+
+        assert events == [
+            "participant_connected",
+            "track_published",
+            "track_published",
+            "track_unpublished",
+            "participant_disconnected",
+            "local_track_published",
+            "local_track_unpublished",
+        ]
+
+        # nothing is left after disconnecting
+        alice_mic = next(iter(alice.track_publications.values()))
+        await room.disconnect()
+        assert room.get_participant_by_sid(alice.sid) is None
+        assert room.get_participant_by_sid(local.sid) is None
+        assert room.get_track_publication(alice_mic.sid) is None
+
+    asyncio.run(run())
+
+    gc.collect()
+    _ffi_client._releaser.flush()
+    backend.dispose()
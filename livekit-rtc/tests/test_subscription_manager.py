@@ -0,0 +1,80 @@
+import asyncio
+
+from livekit.rtc import EventEmitter, SubscriptionManager, TrackKind
+from livekit.rtc._proto import track_pb2 as proto_track
+from livekit.rtc.participant import RemoteParticipant
+from livekit.rtc.track_publication import RemoteTrackPublication
+
+
+class _Publication(RemoteTrackPublication):
+    def __init__(self, sid: str, requests: list):
+        self._info = proto_track.TrackPublicationInfo(
+            sid=sid, kind=TrackKind.KIND_AUDIO
+        )
+        self.track = None
+        self.subscribed = False
+        self._requests = requests
+
+    def set_subscribed(self, subscribed: bool):
+        self._requests.append((self.sid, subscribed))
+        self.subscribed = subscribed
+
+
+class _Participant(RemoteParticipant):
+    def __init__(self, identity: str, publication: _Publication):
+        self._identity = identity
+        self._track_publications = {publication.sid: publication}
+
+    @property
+    def identity(self) -> str:
+        return self._identity
+
+
+class _Room(EventEmitter):
+    def __init__(self, participants):
+        super().__init__()
+        self._loop = asyncio.get_event_loop()
+        self.remote_participants = {p.identity: p for p in participants}
+
+    def get_track_publication(self, sid):
+        for p in self.remote_participants.values():
+            if sid in p.track_publications:
+                return p.track_publications[sid]
+
+
+def test_subscription_manager():
+    async def run():
+        requests: list = []
+        participants = {
+            name: _Participant(name, _Publication(f"TR_{name}", requests))
+            for name in ("a", "b", "c", "d")
+        }
+        room = _Room(participants.values())
+        manager = SubscriptionManager(
+            room,  # type: ignore
+            max_speakers=2,
+            hold_time=0.05,
+            batch_interval=0.01,
+        )
+        manager.pin("d")
+
+        room.emit("active_speakers_changed", [participants["a"]])
+        room.emit("active_speakers_changed", [participants["b"], participants["a"]])
+        await asyncio.sleep(0.02)
+        assert manager.selected_speakers == {"a", "b"}
+        assert sorted(requests) == [("TR_a", True), ("TR_b", True), ("TR_d", True)]
+
+        # "c" waits until "a" has been quiet for hold_time
+        requests.clear()
+        room.emit("active_speakers_changed", [participants["c"], participants["b"]])
+        await asyncio.sleep(0.02)
+        assert manager.selected_speakers == {"a", "b"}
+        assert requests == []
+
+        await asyncio.sleep(0.06)
+        assert manager.selected_speakers == {"b", "c"}
+        assert sorted(requests) == [("TR_a", False), ("TR_c", True)]
+        assert manager.requests_sent == 5
+        manager.close()
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import asyncio
+import os
+
+import pytest
+
+from livekit.rtc import (
+    AudioFrame,
+    RoomJob,
+    RoomWorkerPool,
+    SharedFrameRing,
+    VideoBufferType,
+    VideoFrame,
+)
+
+
+def test_shared_frame_ring():
+    ring = SharedFrameRing(capacity=2048)
+    try:
+        audio = AudioFrame.create(48000, 1, 480)
+        audio.data[0] = 42
+        video = VideoFrame(4, 4, VideoBufferType.RGBA, bytes(range(64)))
+
+        assert ring.read() is None
+        assert ring.write(audio)
+        assert ring.write(video)
+        assert not ring.write(audio)  # full
+
+        frame = ring.read()
+        assert isinstance(frame, AudioFrame)
+        assert frame.samples_per_channel == 480 and frame.data[0] == 42
+
+        # wraps around the end of the buffer
+        for _ in range(10):
+            assert ring.write(audio)
+            assert isinstance(ring.read(), VideoFrame)
+            assert ring.write(video)
+            assert ring.read().data == audio.data  # type: ignore
+    finally:
+        ring.close()
+
+
+async def _echo(job: RoomJob) -> None:
+    # stands in for a room: sends back every frame received from the supervisor
+    for _ in range(job.metadata["frames"]):
+        frame = await job.media_in.read_async()
+        await job.media_out.write_async(frame)  # type: ignore
+
+
+def test_room_worker_pool():
+    async def run():
+        with RoomWorkerPool(_echo, num_workers=2) as pool:
+            handles = [
+                pool.submit("ws://localhost", "token", {"frames": 3}) for _ in range(4)
+            ]
+            assert sorted(pool.load()) == [2, 2]
+
+            frame = AudioFrame.create(16000, 1, 160)
+            for handle in handles:
+                for _ in range(3):
+                    await handle.media_in.write_async(frame)
+
+            for handle in handles:
+                for _ in range(3):
+                    echo = await handle.media_out.read_async()
+                    assert echo is not None and echo.data == frame.data
+                assert (await handle.media_out.read_async()) is None
+                await handle.wait()
+
+            assert pool.load() == [0, 0]
+
+    asyncio.run(run())
+
+
+async def _crash(job: RoomJob) -> None:
+    if job.metadata.get("crash"):
+        os._exit(3)
+
+
+def test_worker_exit_fails_jobs():
+    async def run():
+        with RoomWorkerPool(_crash, num_workers=1) as pool:
+            done = pool.submit("ws://localhost", "token")
+            await asyncio.wait_for(done.wait(), 30)
+            assert pool._handles == {}  # forgotten once done
+
+            crashed = pool.submit("ws://localhost", "token", {"crash": True})
+            with pytest.raises(RuntimeError, match="exited with code 3"):
+                await asyncio.wait_for(crashed.wait(), 30)
+            assert pool.load() == [0]
+
+            with pytest.raises(RuntimeError):
+                pool.submit("ws://localhost", "token")
+
+        # the shared memory of a job is released with its handle
+        name = done.media_out.name
+        done.close()
+        with pytest.raises(FileNotFoundError):
+            SharedFrameRing._attach(name, 1024)
+
+    asyncio.run(run())